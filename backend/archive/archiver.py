@@ -0,0 +1,160 @@
+"""
+古い行をアーカイブテーブルへ移す(manage.py archive)
+
+1バッチ = 1トランザクション:
+
+    SELECT id, user_id FROM tasks WHERE <対象> AND id > <前のバッチの最後> ORDER BY id LIMIT n
+    (対象のユーザーの変更カウンターをロック)
+    WITH moved AS (
+        DELETE FROM tasks WHERE id IN (
+            SELECT id FROM tasks WHERE <対象> AND id IN (<候補>) FOR UPDATE SKIP LOCKED
+        ) RETURNING <カラム>
+    )
+    INSERT INTO tasks_archive (<カラム>, archived_at) SELECT <カラム>, now FROM moved RETURNING id, user_id
+
+ロックするのはそのバッチの行だけで、編集中の行(ロック中)は待たずに飛ばして次回に回す。
+id の昇順に進むため、主キーのインデックスを1回なめるだけで終わる。
+
+移した行は通常のAPIと差分同期からは消えるため、削除と同じく削除ログ(Tombstone)を記録して
+変更を配信する(差分同期のクライアントは取得済みの行を消す)。アーカイブした行は
+?include_archived=true の一覧と詳細の取得で読める(読み取り専用)。
+保存(変更カウンター → 行)とロックの順を揃えるため、行を移す前にカウンターをロックする。
+一覧のキャッシュと検証子は、行を移したユーザーごとに無効化する。
+"""
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from backend_app import response_cache
+from backend_app.conditional import mark_deleted
+from schedules.models import Schedule
+from sync.events import publish_change
+from sync.models import ChangeCounter, record_deletions
+from tasks.models import Task
+from .models import ArchivedSchedule, ArchivedTask
+
+
+class Archive:
+    """元のモデル・アーカイブのモデル・日数の設定名・対象の条件(cutoff -> Q)"""
+
+    def __init__(self, model, archive_model, days_setting, condition):
+        self.model = model
+        self.archive_model = archive_model
+        self.days_setting = days_setting
+        self.condition = condition
+
+    def cutoff(self, days=None):
+        """この日時より古い行が対象"""
+        if days is None:
+            days = getattr(settings, self.days_setting)
+        return timezone.now() - timedelta(days=days)
+
+    def columns(self):
+        """元のテーブルから移すカラム"""
+        return [
+            field.column for field in self.archive_model._meta.concrete_fields
+            if field.name != 'archived_at'
+        ]
+
+
+ARCHIVES = {
+    'tasks': Archive(
+        Task, ArchivedTask, 'ARCHIVE_TASKS_AFTER_DAYS',
+        lambda cutoff: Q(done=True, updated_at__lt=cutoff),
+    ),
+    'schedules': Archive(
+        Schedule, ArchivedSchedule, 'ARCHIVE_SCHEDULES_AFTER_DAYS',
+        lambda cutoff: Q(date__lt=cutoff),
+    ),
+}
+
+
+def _candidates(archive, cutoff, after_id, batch_size):
+    """次のバッチの対象の (id, user_id) のリスト(ロックしない)"""
+    return list(
+        archive.model.objects
+        .filter(archive.condition(cutoff), pk__gt=after_id)
+        .order_by('pk')
+        .values_list('pk', 'user_id')[:batch_size]
+    )
+
+
+def _lock_counters(user_ids):
+    """ユーザーの変更カウンターを user_id 順にロックする(トランザクション内で呼ぶ)"""
+    list(
+        ChangeCounter.objects.select_for_update()
+        .filter(user_id__in=user_ids).order_by('user_id').values_list('pk', flat=True)
+    )
+
+
+def _move_batch(archive, cutoff, ids, archived_at):
+    """ids のうち今も対象の行を移し、移した行の (id, user_id) のリストを返す(トランザクション内で呼ぶ)"""
+    candidates = (
+        archive.model.objects
+        .filter(archive.condition(cutoff), pk__in=ids)
+        .values('pk')
+        .select_for_update(skip_locked=True)
+    )
+    candidates_sql, params = candidates.query.sql_with_params()
+    table = archive.model._meta.db_table
+    archive_table = archive.archive_model._meta.db_table
+    columns = ', '.join(archive.columns())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'WITH moved AS ('
+            f'DELETE FROM {table} WHERE id IN ({candidates_sql}) RETURNING {columns}'
+            f') '
+            f'INSERT INTO {archive_table} ({columns}, archived_at) '
+            f'SELECT {columns}, %s FROM moved '
+            f'RETURNING id, user_id',
+            [*params, archived_at],
+        )
+        return cursor.fetchall()
+
+
+def _record_archived(archive, rows):
+    """移した行の削除ログを記録して配信し、ユーザーごとの一覧のキャッシュと検証子を無効化する"""
+    by_user = defaultdict(list)
+    for pk, user_id in sorted(rows):
+        by_user[user_id].append(archive.model(pk=pk, user_id=user_id))
+    for user_id, instances in by_user.items():
+        for instance, seq in zip(instances, record_deletions(instances)):
+            publish_change(instance, 'deleted', seq)
+        mark_deleted(archive.model, user_id)
+        response_cache.invalidate(archive.model, user_id)
+
+
+def archive_rows(archive, cutoff, batch_size=None, pause=0):
+    """
+    cutoff より古い対象の行をすべて移し、移した行数を返す
+
+    pause はバッチ間の待ち時間(秒)。レプリケーションやI/Oに余裕を持たせる
+    """
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    archived_at = timezone.now()
+    after_id = 0
+    moved = 0
+    while True:
+        candidates = _candidates(archive, cutoff, after_id, batch_size)
+        if candidates:
+            with transaction.atomic():
+                _lock_counters({user_id for _, user_id in candidates})
+                rows = _move_batch(archive, cutoff, [pk for pk, _ in candidates], archived_at)
+                _record_archived(archive, rows)
+            moved += len(rows)
+        if len(candidates) < batch_size:
+            return moved
+        after_id = max(pk for pk, _ in candidates)
+        if pause:
+            time.sleep(pause)
+
+
+def vacuum(archive):
+    """移した後の元のテーブルを VACUUM (ANALYZE) する(トランザクション外で呼ぶ)"""
+    with connection.cursor() as cursor:
+        cursor.execute(f'VACUUM (ANALYZE) {archive.model._meta.db_table}')
@@ -0,0 +1,46 @@
+"""
+アーカイブした行の詳細(読み取り専用)
+
+?include_archived=true の一覧に含まれる行は、詳細でも同じ id で読めるようにする。
+詳細のビューは元のテーブルに行が無い場合だけここを呼ぶため、通常の取得・更新のクエリは増えない。
+アーカイブした行の更新・削除は 409 を返す(If-Match の有無によらない)。
+"""
+from rest_framework import status
+from rest_framework.response import Response
+
+from backend_app.conditional import object_validators
+from backend_app.sparse_fields import fields_validators, requested_fields
+
+
+def archived_detail_response(request, archive_model, serializer_class, pk):
+    """
+    元のテーブルに無い pk の行の詳細のレスポンス
+
+    アーカイブにあれば GET は行を返し、PUT / DELETE は 409。どちらにも無ければ 404
+    """
+    try:
+        obj = archive_model.objects.get(user=request.user, pk=pk)
+    except archive_model.DoesNotExist:
+        return Response(status=status.HTTP_404_NOT_FOUND)
+    if request.method not in ('GET', 'HEAD'):
+        return Response({'detail': 'Archived rows are read-only'}, status=status.HTTP_409_CONFLICT)
+
+    fields = requested_fields(request, serializer_class)
+    validators = fields_validators(object_validators(obj), fields)
+    response = validators.not_modified(request)
+    if response is None:
+        response = Response(serializer_class(obj, fields=fields).data)
+    return validators.apply(response)
+
+
+def archived_update_response(request, archive_model, response, pk):
+    """
+    更新(PUT)できなかった場合のレスポンス
+
+    response(404 / 412)の行がアーカイブにあれば 409 に置き換える
+    """
+    if response.status_code not in (status.HTTP_404_NOT_FOUND, status.HTTP_412_PRECONDITION_FAILED):
+        return response
+    if archive_model.objects.filter(user=request.user, pk=pk).exists():
+        return Response({'detail': 'Archived rows are read-only'}, status=status.HTTP_409_CONFLICT)
+    return response
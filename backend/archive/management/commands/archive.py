@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from archive.archiver import ARCHIVES, archive_rows, vacuum
+
+
+class Command(BaseCommand):
+    help = '完了した古いタスクと過去のスケジュールをアーカイブテーブルへ移す(cronなどで定期実行する)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'kinds', nargs='*',
+            help=f"移す種類({' / '.join(ARCHIVES)}。省略時はすべて)",
+        )
+        parser.add_argument('--days', type=int, help='この日数より古い行を移す(省略時は ARCHIVE_*_AFTER_DAYS)')
+        parser.add_argument('--batch-size', type=int, help='1トランザクションで移す行数(省略時は ARCHIVE_BATCH_SIZE)')
+        parser.add_argument('--pause', type=float, default=0, help='バッチ間の待ち時間(秒)')
+        parser.add_argument('--vacuum', action='store_true', help='移した後に元のテーブルを VACUUM (ANALYZE) する')
+
+    def handle(self, *args, kinds, days, batch_size, pause, **options):
+        unknown = sorted(set(kinds) - set(ARCHIVES))
+        if unknown:
+            raise CommandError(f"Unknown kind(s): {', '.join(unknown)}")
+        for kind in kinds or ARCHIVES:
+            archive = ARCHIVES[kind]
+            moved = archive_rows(archive, archive.cutoff(days), batch_size, pause)
+            self.stdout.write(f'{kind}: {moved} row(s) archived')
+            if options['vacuum'] and moved:
+                vacuum(archive)
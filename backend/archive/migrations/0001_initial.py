@@ -0,0 +1,95 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleWithArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255, verbose_name='タイトル')),
+                ('memo', models.CharField(blank=True, max_length=255, null=True, verbose_name='メモ')),
+                ('location', models.CharField(max_length=255, verbose_name='場所')),
+                ('date', models.DateTimeField(verbose_name='時間')),
+                ('created_at', models.DateTimeField(verbose_name='作成日')),
+                ('updated_at', models.DateTimeField(verbose_name='更新日')),
+                ('change_seq', models.BigIntegerField(default=0, verbose_name='変更番号')),
+                ('archived_at', models.DateTimeField(null=True, verbose_name='アーカイブ日時')),
+            ],
+            options={
+                'db_table': 'schedules_with_archive',
+                'ordering': ['-created_at'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskWithArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255, verbose_name='タイトル')),
+                ('detail', models.TextField(blank=True, null=True, verbose_name='詳細')),
+                ('done', models.BooleanField(default=False, verbose_name='完了状態')),
+                ('created_at', models.DateTimeField(verbose_name='作成日時')),
+                ('updated_at', models.DateTimeField(verbose_name='更新日時')),
+                ('change_seq', models.BigIntegerField(default=0, verbose_name='変更番号')),
+                ('archived_at', models.DateTimeField(null=True, verbose_name='アーカイブ日時')),
+            ],
+            options={
+                'db_table': 'tasks_with_archive',
+                'ordering': ['-created_at'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedSchedule',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255, verbose_name='タイトル')),
+                ('memo', models.CharField(blank=True, max_length=255, null=True, verbose_name='メモ')),
+                ('location', models.CharField(max_length=255, verbose_name='場所')),
+                ('date', models.DateTimeField(verbose_name='時間')),
+                ('created_at', models.DateTimeField(verbose_name='作成日')),
+                ('updated_at', models.DateTimeField(verbose_name='更新日')),
+                ('change_seq', models.BigIntegerField(default=0, verbose_name='変更番号')),
+                ('archived_at', models.DateTimeField(verbose_name='アーカイブ日時')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='ユーザー')),
+            ],
+            options={
+                'verbose_name': 'アーカイブしたスケジュール',
+                'verbose_name_plural': 'アーカイブしたスケジュール',
+                'db_table': 'schedules_archive',
+                'indexes': [models.Index(fields=['user', '-created_at'], name='schedules_a_user_id_5fa43f_idx'), models.Index(fields=['user', 'date'], name='schedules_a_user_id_b57c4f_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255, verbose_name='タイトル')),
+                ('detail', models.TextField(blank=True, null=True, verbose_name='詳細')),
+                ('done', models.BooleanField(default=False, verbose_name='完了状態')),
+                ('created_at', models.DateTimeField(verbose_name='作成日時')),
+                ('updated_at', models.DateTimeField(verbose_name='更新日時')),
+                ('change_seq', models.BigIntegerField(default=0, verbose_name='変更番号')),
+                ('archived_at', models.DateTimeField(verbose_name='アーカイブ日時')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='ユーザー')),
+            ],
+            options={
+                'verbose_name': 'アーカイブしたタスク',
+                'verbose_name_plural': 'アーカイブしたタスク',
+                'db_table': 'tasks_archive',
+                'indexes': [models.Index(fields=['user', '-created_at'], name='tasks_archi_user_id_89e203_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+TASK_COLUMNS = 'id, user_id, title, detail, done, created_at, updated_at, change_seq'
+SCHEDULE_COLUMNS = 'id, user_id, title, memo, location, date, created_at, updated_at, change_seq'
+
+
+def _view_sql(view, table, columns):
+    # 各テーブルの (user_id, ...) インデックスを使えるよう、絞り込みと並べ替えは UNION ALL の内側に渡される
+    return f"""
+        CREATE VIEW {view} AS
+        SELECT {columns}, NULL::timestamp with time zone AS archived_at FROM {table}
+        UNION ALL
+        SELECT {columns}, archived_at FROM {table}_archive
+    """
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archive', '0001_initial'),
+        ('tasks', '0004_task_tasks_open_user_created_idx'),
+        ('schedules', '0004_schedule_search_vector_and_more'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            _view_sql('tasks_with_archive', 'tasks', TASK_COLUMNS),
+            'DROP VIEW tasks_with_archive',
+        ),
+        migrations.RunSQL(
+            _view_sql('schedules_with_archive', 'schedules', SCHEDULE_COLUMNS),
+            'DROP VIEW schedules_with_archive',
+        ),
+    ]
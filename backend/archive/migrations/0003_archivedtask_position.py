@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+TASK_COLUMNS = 'id, user_id, title, detail, done, created_at, updated_at, change_seq'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archive', '0002_with_archive_views'),
+        ('tasks', '0005_task_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedtask',
+            name='position',
+            field=models.CharField(blank=True, db_collation='C', max_length=255, verbose_name='並び順'),
+        ),
+        # ビューの列を増やすため作り直す(CREATE OR REPLACE VIEW では archived_at の前に足せない)
+        migrations.RunSQL(
+            f"""
+            DROP VIEW tasks_with_archive;
+            CREATE VIEW tasks_with_archive AS
+            SELECT {TASK_COLUMNS}, position, NULL::timestamp with time zone AS archived_at FROM tasks
+            UNION ALL
+            SELECT {TASK_COLUMNS}, position, archived_at FROM tasks_archive
+            """,
+            f"""
+            DROP VIEW tasks_with_archive;
+            CREATE VIEW tasks_with_archive AS
+            SELECT {TASK_COLUMNS}, NULL::timestamp with time zone AS archived_at FROM tasks
+            UNION ALL
+            SELECT {TASK_COLUMNS}, archived_at FROM tasks_archive
+            """,
+        ),
+    ]
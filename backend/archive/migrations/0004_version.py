@@ -0,0 +1,45 @@
+from django.db import migrations, models
+
+TASK_COLUMNS = 'id, user_id, title, detail, done, created_at, updated_at, change_seq, position'
+SCHEDULE_COLUMNS = 'id, user_id, title, memo, location, date, created_at, updated_at, change_seq'
+
+
+def _view_sql(view, table, columns):
+    # ビューの列を増やすため作り直す(CREATE OR REPLACE VIEW では archived_at の前に足せない)
+    return f"""
+        DROP VIEW {view};
+        CREATE VIEW {view} AS
+        SELECT {columns}, NULL::timestamp with time zone AS archived_at FROM {table}
+        UNION ALL
+        SELECT {columns}, archived_at FROM {table}_archive
+    """
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archive', '0003_archivedtask_position'),
+        ('tasks', '0007_task_version'),
+        ('schedules', '0005_schedule_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedschedule',
+            name='version',
+            field=models.PositiveIntegerField(default=1, verbose_name='バージョン'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='version',
+            field=models.PositiveIntegerField(default=1, verbose_name='バージョン'),
+        ),
+        migrations.RunSQL(
+            _view_sql('tasks_with_archive', 'tasks', f'{TASK_COLUMNS}, version'),
+            _view_sql('tasks_with_archive', 'tasks', TASK_COLUMNS),
+        ),
+        migrations.RunSQL(
+            _view_sql('schedules_with_archive', 'schedules', f'{SCHEDULE_COLUMNS}, version'),
+            _view_sql('schedules_with_archive', 'schedules', SCHEDULE_COLUMNS),
+        ),
+    ]
@@ -0,0 +1,94 @@
+"""
+アーカイブ(完了した古いタスク・過去のスケジュールの退避先)
+
+tasks / schedules から移した行を tasks_archive / schedules_archive に id をそのまま保持する。
+移すのは manage.py archive(archive/archiver.py)で、通常のAPIは元のテーブルだけを読む
+(詳細は元のテーブルに無い場合だけアーカイブを読み取り専用で返す。archive/detail.py)。
+?include_archived=true の一覧は、元のテーブルとアーカイブを UNION ALL したビュー
+(*WithArchive、managed = False)を読む。
+"""
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class TaskColumns(models.Model):
+    """tasks と同じカラム(全文検索用の生成カラムを除く)"""
+    id = models.BigIntegerField(primary_key=True, verbose_name='ID')
+    title = models.CharField(max_length=255, verbose_name='タイトル')
+    detail = models.TextField(blank=True, null=True, verbose_name='詳細')
+    done = models.BooleanField(default=False, verbose_name='完了状態')
+    created_at = models.DateTimeField(verbose_name='作成日時')
+    updated_at = models.DateTimeField(verbose_name='更新日時')
+    change_seq = models.BigIntegerField(default=0, verbose_name='変更番号')
+    version = models.PositiveIntegerField(default=1, verbose_name='バージョン')
+    position = models.CharField(max_length=255, db_collation='C', blank=True, verbose_name='並び順')
+
+    class Meta:
+        abstract = True
+
+
+class ScheduleColumns(models.Model):
+    """schedules と同じカラム(全文検索用の生成カラムを除く)"""
+    id = models.BigIntegerField(primary_key=True, verbose_name='ID')
+    title = models.CharField(max_length=255, verbose_name='タイトル')
+    memo = models.CharField(max_length=255, blank=True, null=True, verbose_name='メモ')
+    location = models.CharField(max_length=255, verbose_name='場所')
+    date = models.DateTimeField(verbose_name='時間')
+    created_at = models.DateTimeField(verbose_name='作成日')
+    updated_at = models.DateTimeField(verbose_name='更新日')
+    change_seq = models.BigIntegerField(default=0, verbose_name='変更番号')
+    version = models.PositiveIntegerField(default=1, verbose_name='バージョン')
+
+    class Meta:
+        abstract = True
+
+
+class ArchivedTask(TaskColumns):
+    """アーカイブしたタスク"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', verbose_name='ユーザー')
+    archived_at = models.DateTimeField(verbose_name='アーカイブ日時')
+
+    class Meta:
+        db_table = 'tasks_archive'
+        verbose_name = 'アーカイブしたタスク'
+        verbose_name_plural = 'アーカイブしたタスク'
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
+
+
+class ArchivedSchedule(ScheduleColumns):
+    """アーカイブしたスケジュール"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', verbose_name='ユーザー')
+    archived_at = models.DateTimeField(verbose_name='アーカイブ日時')
+
+    class Meta:
+        db_table = 'schedules_archive'
+        verbose_name = 'アーカイブしたスケジュール'
+        verbose_name_plural = 'アーカイブしたスケジュール'
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['user', 'date']),
+        ]
+
+
+class TaskWithArchive(TaskColumns):
+    """タスクとアーカイブしたタスク(ビュー。archived_at はアーカイブした行のみ)"""
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+', verbose_name='ユーザー')
+    archived_at = models.DateTimeField(null=True, verbose_name='アーカイブ日時')
+
+    class Meta:
+        managed = False
+        db_table = 'tasks_with_archive'
+        ordering = ['-created_at']
+
+
+class ScheduleWithArchive(ScheduleColumns):
+    """スケジュールとアーカイブしたスケジュール(ビュー。archived_at はアーカイブした行のみ)"""
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+', verbose_name='ユーザー')
+    archived_at = models.DateTimeField(null=True, verbose_name='アーカイブ日時')
+
+    class Meta:
+        managed = False
+        db_table = 'schedules_with_archive'
+        ordering = ['-created_at']
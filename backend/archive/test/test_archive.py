@@ -0,0 +1,151 @@
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.utils import timezone
+from archive.models import ArchivedSchedule, ArchivedTask
+from schedules.models import Schedule
+from sync.models import Tombstone
+from tasks.models import Task
+
+def titles(res):
+    assert res.status_code == 200
+    data = res.data if hasattr(res, 'data') else res.json()
+    return [item['title'] for item in data]
+
+@pytest.fixture
+def tasks(test_user):
+    old = timezone.now() - timedelta(days=60)
+    for title, done in [('Old open', False), ('Old done 1', True), ('Old done 2', True), ('Recent done', True)]:
+        Task.objects.create(user=test_user, title=title, done=done)
+    Task.objects.exclude(title='Recent done').update(updated_at=old)
+
+@pytest.fixture
+def schedules(test_user):
+    now = timezone.now()
+    Schedule.objects.create(user=test_user, title='Past', location='A', date=now - timedelta(days=60))
+    Schedule.objects.create(user=test_user, title='Upcoming', location='B', date=now + timedelta(days=1))
+
+@pytest.mark.django_db
+def test_archive_moves_old_done_tasks(authenticated_client, tasks):
+    """完了して日数が過ぎたタスクだけを id を保ったまま移し、通常の一覧から外す"""
+    ids = dict(Task.objects.values_list('title', 'id'))
+    assert titles(authenticated_client.get('/api/tasks/')) == ['Recent done', 'Old done 2', 'Old done 1', 'Old open']
+
+    call_command('archive', 'tasks', '--batch-size', '1')
+
+    assert set(Task.objects.values_list('title', flat=True)) == {'Old open', 'Recent done'}
+    archived = ArchivedTask.objects.order_by('id')
+    assert [(task.id, task.title) for task in archived] == [(ids['Old done 1'], 'Old done 1'), (ids['Old done 2'], 'Old done 2')]
+    assert all(task.archived_at is not None for task in archived)
+    # 差分同期から消えるため、削除と同じく削除ログを残す
+    assert sorted(Tombstone.objects.values_list('kind', 'object_id')) == [
+        ('tasks.task', ids['Old done 1']), ('tasks.task', ids['Old done 2'])
+    ]
+    # 一覧のキャッシュは無効化される
+    assert titles(authenticated_client.get('/api/tasks/')) == ['Recent done', 'Old open']
+
+@pytest.mark.django_db
+def test_include_archived_task_list(authenticated_client, tasks):
+    """?include_archived=true ではアーカイブしたタスクも同じ形式・同じ並びで返す"""
+    before = authenticated_client.get('/api/tasks/')
+    call_command('archive', 'tasks')
+
+    res = authenticated_client.get('/api/tasks/?include_archived=true')
+    assert res.data == before.data
+    assert titles(authenticated_client.get('/api/tasks/?include_archived=true&done=false')) == ['Old open']
+
+    # ページングもアーカイブをまたいで続く
+    res = authenticated_client.get('/api/tasks/?include_archived=true&page_size=2')
+    assert titles(res) == ['Recent done', 'Old done 2']
+    res = authenticated_client.get(res['Link'].split('<')[1].split('>')[0])
+    assert titles(res) == ['Old done 1', 'Old open']
+
+    res = authenticated_client.get('/api/tasks/?include_archived=maybe')
+    assert res.status_code == 400
+
+@pytest.mark.django_db
+def test_include_archived_list_is_invalidated(authenticated_client, tasks):
+    """アーカイブを含む一覧のキャッシュも、タスクの変更で無効化される"""
+    res = authenticated_client.get('/api/tasks/?include_archived=true')
+    etag = res['ETag']
+    res = authenticated_client.get('/api/tasks/?include_archived=true')
+    assert res['X-Cache'] == 'HIT'
+
+    Task.objects.create(user=Task.objects.first().user, title='New')
+    res = authenticated_client.get('/api/tasks/?include_archived=true', HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    assert titles(res)[0] == 'New'
+
+@pytest.mark.django_db
+def test_async_include_archived(jwt_client, tasks):
+    """非同期版の一覧も ?include_archived= を受け付ける"""
+    call_command('archive', 'tasks')
+    sync_res = jwt_client.get('/api/tasks/?include_archived=true')
+    async_res = jwt_client.get('/api/async/tasks/?include_archived=true')
+    assert async_res.status_code == 200
+    assert async_res.content == sync_res.content
+    assert len(async_res.json()) == 4
+
+@pytest.mark.django_db
+def test_archive_is_synced_as_deletion(authenticated_client, tasks):
+    """差分同期のクライアントはアーカイブした行を削除として受け取る"""
+    ids = dict(Task.objects.values_list('title', 'id'))
+    token = authenticated_client.get('/api/sync/').data['token']
+    call_command('archive', 'tasks')
+
+    data = authenticated_client.get(f'/api/sync/?since={token}').data
+    assert sorted(data['tasks']['deleted']) == [ids['Old done 1'], ids['Old done 2']]
+    assert data['tasks']['changed'] == []
+
+@pytest.mark.django_db
+def test_archived_task_detail_is_read_only(authenticated_client, jwt_client, tasks):
+    """アーカイブした行は一覧と同じ id の詳細で読め、更新・削除は 409"""
+    task = Task.objects.get(title='Old done 1')
+    before = authenticated_client.get(f'/api/tasks/{task.id}/')
+    call_command('archive', 'tasks')
+
+    for client, url in [(authenticated_client, f'/api/tasks/{task.id}/'), (jwt_client, f'/api/async/tasks/{task.id}/')]:
+        res = client.get(url)
+        assert res.status_code == 200
+        assert res.json() == before.json()
+        assert res['ETag'] == before['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=before['ETag']).status_code == 304
+
+        assert client.put(url, {'title': 'Edited'}, format='json').status_code == 409
+        assert client.put(url, {'title': 'Edited'}, format='json', HTTP_IF_MATCH=before['ETag']).status_code == 409
+        assert client.delete(url).status_code == 409
+
+    assert ArchivedTask.objects.get(pk=task.id).title == 'Old done 1'
+    missing = max(ArchivedTask.objects.values_list('id', flat=True)) + 100
+    assert authenticated_client.get(f'/api/tasks/{missing}/').status_code == 404
+    assert authenticated_client.put(f'/api/tasks/{missing}/', {'title': 'x'}, format='json').status_code == 404
+    assert jwt_client.delete(f'/api/async/tasks/{missing}/').status_code == 404
+
+@pytest.mark.django_db
+def test_archive_past_schedules(authenticated_client, schedules):
+    """過去のスケジュールを移し、一覧と月間サマリーは ?include_archived=true で含める"""
+    past = Schedule.objects.get(title='Past')
+    month = timezone.localtime(past.date).strftime('%Y-%m')
+
+    call_command('archive', 'schedules')
+
+    assert list(Schedule.objects.values_list('title', flat=True)) == ['Upcoming']
+    assert ArchivedSchedule.objects.get().id == past.id
+    assert titles(authenticated_client.get('/api/schedules/')) == ['Upcoming']
+    assert titles(authenticated_client.get('/api/schedules/?include_archived=true')) == ['Upcoming', 'Past']
+    # 詳細は読み取り専用
+    assert authenticated_client.get(f'/api/schedules/{past.id}/').data['title'] == 'Past'
+    assert authenticated_client.delete(f'/api/schedules/{past.id}/').status_code == 409
+
+    res = authenticated_client.get(f'/api/schedules/summary/?month={month}')
+    assert res.data['days'] == []
+    res = authenticated_client.get(f'/api/schedules/summary/?month={month}&include_archived=true')
+    assert [day['count'] for day in res.data['days']] == [1]
+
+@pytest.mark.django_db
+def test_archive_days_option(tasks):
+    """--days で対象の日数を変えられる(既定は ARCHIVE_TASKS_AFTER_DAYS)"""
+    call_command('archive', 'tasks', '--days', '90')
+    assert not ArchivedTask.objects.exists()
+    call_command('archive', 'tasks', '--days', '0')
+    assert ArchivedTask.objects.count() == 3
@@ -3,6 +3,9 @@ ASGI config for backend_app project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+変更イベントのストリーム(/api/sync/events/)は接続を保持し続けるため、
+ASGIサーバーで起動する(例: uvicorn backend_app.asgi:application)。
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,24 @@
+"""
+非同期版CRUDのURL(/api/async/)
+
+同期版(/api/tasks/ など)と同じリクエスト・レスポンスで、ASGIサーバー上ではイベントループで処理される。
+"""
+from archive.models import ScheduleWithArchive, TaskWithArchive
+from backend_app.async_views import AsyncCrudViews
+from bookmarks.models import Bookmark
+from bookmarks.serializers import BookmarkSerializer
+from django.urls import include, path
+from schedules.filters import filter_by_date
+from schedules.models import Schedule
+from schedules.serializers import ScheduleSerializer
+from tasks.filters import filter_by_done
+from tasks.models import Task
+from tasks.serializers import TaskSerializer
+
+app_name = 'async'
+
+urlpatterns = [
+    path('tasks/', include(AsyncCrudViews(Task, TaskSerializer, filter_by_done, TaskWithArchive).urls('task'))),
+    path('schedules/', include(AsyncCrudViews(Schedule, ScheduleSerializer, filter_by_date, ScheduleWithArchive).urls('schedule'))),
+    path('bookmarks/', include(AsyncCrudViews(Bookmark, BookmarkSerializer).urls('bookmark'))),
+]
@@ -0,0 +1,220 @@
+"""
+CRUDの非同期(ASGIネイティブ)版
+
+/api/async/<app>/ で同期版と同じAPIを提供する。
+DRFの @api_view は同期ビューのため、ASGIではリクエストごとにスレッドへ渡される。
+ここでは認証・取得・保存を Django の非同期ORM(aget / acreate / adelete / async for)と
+非同期キャッシュAPIで行い、イベントループ上で処理する。
+更新だけは条件付きの UPDATE ... RETURNING(versioning.py)をスレッドで実行する。
+
+シリアライズは取得済みの行だけを使う(関連の遅延読み込みをしない)ため、
+イベントループ上でそのまま実行できる。
+"""
+from django.http import HttpResponse
+from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from backend_app import response_cache
+from backend_app.conditional import Validators, acollection_validators, if_match_versions, object_validators
+from backend_app.listing import page_serializer
+from backend_app.pagination import NEWEST_FIRST, apaginate, get_ordering, set_next_link
+from backend_app.params import INCLUDE_ARCHIVED_PARAM, bool_param
+from backend_app.projection import project
+from backend_app.sparse_fields import fields_validators, requested_fields
+from backend_app.versioning import aupdate_row, failed_status
+from users.authentication import CachedJWTAuthentication
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    """DRFの Response と同じ形式のJSONレスポンス"""
+    if data is None:
+        return HttpResponse(status=status)
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+async def aserialize_page(request, queryset, serializer_class, fields, ordering=NEWEST_FIRST):
+    """serialize_page の非同期版"""
+    fast = page_serializer(serializer_class, fields, ordering)
+    if fast is not None:
+        page, next_cursor = await apaginate(request, fast.queryset(queryset), fast.cursor, ordering)
+        return fast.serialize(page), next_cursor
+    queryset = project(queryset, serializer_class, ordering.fields, fields)
+    page, next_cursor = await apaginate(request, queryset, ordering=ordering)
+    return list(serializer_class(page, many=True, fields=fields).data), next_cursor
+
+
+async def alist_response(request, queryset, serializer_class, model=None):
+    """list_response の非同期版"""
+    model = model or queryset.model
+    fields = requested_fields(request, serializer_class)
+    ordering = get_ordering(request, queryset.model)
+    key = await response_cache.amake_key(request, model)
+    entry = await response_cache.alookup(key)
+    cache_hit = entry is not None
+
+    if cache_hit:
+        validators = Validators(entry['etag'], entry['last_modified'])
+    else:
+        validators = fields_validators(await acollection_validators(request, queryset, model), fields)
+
+    response = validators.not_modified(request)
+    if response is not None:
+        return response
+
+    if not cache_hit:
+        data, next_cursor = await aserialize_page(request, queryset, serializer_class, fields, ordering)
+        entry = {
+            'etag': validators.etag,
+            'last_modified': validators.last_modified,
+            'data': data,
+            'next_cursor': next_cursor,
+        }
+        await response_cache.astore(key, entry)
+
+    response = set_next_link(request, json_response(entry['data']), entry['next_cursor'])
+    response['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+    return validators.apply(response)
+
+
+class AsyncCrudViews:
+    """
+    ユーザーのコレクションに対する一覧・詳細の非同期ビュー
+
+    filter_queryset(request, queryset) で一覧の絞り込みを追加できる。
+    archive_model(アーカイブを含むビュー)を渡すと、一覧で ?include_archived=true を受け付け、
+    詳細ではアーカイブした行を読み取り専用で返す(archive/detail.py と同じ)
+    """
+
+    authentication = CachedJWTAuthentication()
+
+    def __init__(self, model, serializer_class, filter_queryset=None, archive_model=None):
+        self.model = model
+        self.serializer_class = serializer_class
+        self.filter_queryset = filter_queryset
+        self.archive_model = archive_model
+
+    async def _request(self, request):
+        """認証してDRFの Request に包む(未認証なら None)"""
+        result = await self.authentication.aauthenticate(request)
+        if result is None:
+            return None
+        drf_request = Request(request, parsers=[JSONParser()])
+        drf_request.user, drf_request.auth = result
+        return drf_request
+
+    async def _dispatch(self, request, handler, *args):
+        try:
+            drf_request = await self._request(request)
+            if drf_request is None:
+                raise NotAuthenticated()
+            return await handler(drf_request, *args)
+        except APIException as exc:
+            response = json_response(exc.detail, status=exc.status_code)
+            if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+                response['WWW-Authenticate'] = self.authentication.authenticate_header(request)
+                response.status_code = status.HTTP_401_UNAUTHORIZED
+            return response
+
+    def _not_allowed(self, request):
+        return json_response(
+            {'detail': f'Method "{request.method}" not allowed.'},
+            status=status.HTTP_405_METHOD_NOT_ALLOWED,
+        )
+
+    async def list(self, request):
+        """一覧取得・作成"""
+        return await self._dispatch(request, self._list)
+
+    async def detail(self, request, pk):
+        """詳細取得・更新・削除"""
+        return await self._dispatch(request, self._detail, pk)
+
+    async def _list(self, request):
+        queryset = self.model.objects.filter(user=request.user)
+        if request.method == 'GET':
+            if self.archive_model is not None and bool_param(request, INCLUDE_ARCHIVED_PARAM):
+                queryset = self.archive_model.objects.filter(user=request.user)
+            if self.filter_queryset is not None:
+                queryset = self.filter_queryset(request, queryset)
+            return await alist_response(request, queryset, self.serializer_class, self.model)
+
+        elif request.method == 'POST':
+            serializer = self.serializer_class(data=request.data, context={'request': request})
+            if not serializer.is_valid():
+                return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            instance = await self.model.objects.acreate(user=request.user, **serializer.validated_data)
+            return json_response(self.serializer_class(instance).data, status=status.HTTP_201_CREATED)
+
+        return self._not_allowed(request)
+
+    async def _detail(self, request, pk):
+        queryset = self.model.objects.filter(user=request.user)
+        if request.method == 'PUT':
+            return await self._update(request, queryset, pk)
+
+        fields = None
+        if request.method == 'GET':
+            # 取得のみの場合はシリアライズするカラム(とETagに使うバージョン・更新日時)だけを読む(削除は行全体が必要)
+            fields = requested_fields(request, self.serializer_class)
+            queryset = project(queryset, self.serializer_class, ('updated_at', 'version'), fields)
+        try:
+            instance = await queryset.aget(pk=pk)
+        except self.model.DoesNotExist:
+            return await self._archived(request, pk, fields, json_response(None, status=status.HTTP_404_NOT_FOUND))
+
+        if request.method == 'GET':
+            validators = fields_validators(object_validators(instance), fields)
+            response = validators.not_modified(request)
+            if response is None:
+                response = json_response(self.serializer_class(instance, fields=fields).data)
+            return validators.apply(response)
+
+        elif request.method == 'DELETE':
+            await instance.adelete()
+            return json_response(None, status=status.HTTP_204_NO_CONTENT)
+
+        return self._not_allowed(request)
+
+    async def _update(self, request, queryset, pk):
+        """versioning.update_response の非同期版(事前に読まず UPDATE 1回で更新する)"""
+        serializer = self.serializer_class(data=request.data, partial=True)
+        if not serializer.is_valid():
+            return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        versions = if_match_versions(request)
+        instance = await aupdate_row(queryset, pk, request.user.pk, serializer.validated_data, versions)
+        if instance is None:
+            return await self._archived(request, pk, None, json_response(None, status=failed_status(versions)))
+        return object_validators(instance).apply(json_response(self.serializer_class(instance).data))
+
+    async def _archived(self, request, pk, fields, missing):
+        """
+        元のテーブルに無い pk の行のレスポンス
+
+        アーカイブにあれば GET は行を返し、PUT / DELETE は 409。どちらにも無ければ missing
+        """
+        if self.archive_model is None:
+            return missing
+        try:
+            instance = await self.archive_model.objects.aget(user=request.user, pk=pk, archived_at__isnull=False)
+        except self.archive_model.DoesNotExist:
+            return missing
+        if request.method not in ('GET', 'HEAD'):
+            return json_response({'detail': 'Archived rows are read-only'}, status=status.HTTP_409_CONFLICT)
+        validators = fields_validators(object_validators(instance), fields)
+        response = validators.not_modified(request)
+        if response is None:
+            response = json_response(self.serializer_class(instance, fields=fields).data)
+        return validators.apply(response)
+
+    def urls(self, name):
+        """一覧・詳細のURLパターン"""
+        return [
+            path('', csrf_exempt(self.list), name=f'{name}_list'),
+            path('<int:pk>/', csrf_exempt(self.detail), name=f'{name}_detail'),
+        ]
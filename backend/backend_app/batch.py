@@ -0,0 +1,173 @@
+"""
+一括作成・更新・削除
+
+POST /api/<app>/batch/
+{
+    "create": [{...}, ...],
+    "update": [{"id": 1, ...}, ...],
+    "delete": [2, 3]
+}
+
+既存のシリアライザーを many=True で使って検証し、
+bulk_create / bulk_update / 1回の delete() を1トランザクションで実行する。
+削除ログも行数によらず番号の確保1回と INSERT 1回で記録する。
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from backend_app import response_cache
+from backend_app.metrics import SerializerTimingMixin
+from ranking.models import RankedModel
+from sync.events import publish_change
+from sync.models import bulk_deletion, record_deletions
+
+
+class BulkListSerializer(SerializerTimingMixin, serializers.ListSerializer):
+    """
+    many=True で一括作成・更新を行う ListSerializer
+
+    更新時は instance にユーザーの行のリストを渡し、各要素の id で対応付ける
+    """
+
+    def run_child_validation(self, data):
+        if self.instance is not None:
+            pk = data.get('id') if isinstance(data, dict) else None
+            # True == 1 なので、真偽値で id 1 の行に対応付けない
+            instance = self._instances.get(pk) if _is_id(pk) else None
+            if instance is None:
+                raise ValidationError({'id': 'Not found'})
+            self.child.instance = instance
+            self.child.initial_data = data
+            self._matched.append(instance)
+        return super().run_child_validation(data)
+
+    def to_internal_value(self, data):
+        self._instances = {instance.pk: instance for instance in self.instance or []}
+        self._matched = []
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        user = self.context['request'].user
+        objs = [model(user=user, **attrs) for attrs in validated_data]
+        if issubclass(model, RankedModel):
+            model.assign_positions(objs)
+        model.assign_change_seqs(objs)
+        return model.objects.bulk_create(objs)
+
+    def update(self, instances, validated_data):
+        model = self.child.Meta.model
+        # bulk_update では auto_now も save() も働かないため更新日時を明示する
+        now = timezone.now()
+        fields = {'updated_at'}
+        for instance, attrs in zip(self._matched, validated_data):
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+                fields.add(attr)
+            instance.updated_at = now
+        model.bulk_update_changes(self._matched, fields)
+        return self._matched
+
+
+def _is_id(value):
+    """行の id として使える値か(真偽値は int の派生クラスなので除く)"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _id_errors(ids):
+    """id のリストの項目ごとのエラー(id でない値と、2回目以降に現れた重複)"""
+    seen = set()
+    errors = []
+    for pk in ids:
+        if not _is_id(pk):
+            errors.append({'id': 'Expected an id'})
+        elif pk in seen:
+            errors.append({'id': 'Duplicate id'})
+        else:
+            seen.add(pk)
+            errors.append({})
+    return errors
+
+
+def _list_param(data, name):
+    value = data.get(name, [])
+    if not isinstance(value, list):
+        raise ValidationError({name: 'Expected a list'})
+    return value
+
+
+def batch_response(request, queryset, serializer_class):
+    """ユーザーのコレクションに一括操作を適用し、項目ごとの結果を返す"""
+    if not isinstance(request.data, dict):
+        raise ValidationError({'detail': 'Expected an object'})
+
+    create_items = _list_param(request.data, 'create')
+    update_items = _list_param(request.data, 'update')
+    delete_ids = _list_param(request.data, 'delete')
+    if len(create_items) + len(update_items) + len(delete_ids) > settings.BATCH_MAX_SIZE:
+        raise ValidationError({'detail': f'Up to {settings.BATCH_MAX_SIZE} operations per batch'})
+
+    context = {'request': request}
+    create_serializer = serializer_class(data=create_items, many=True, context=context)
+
+    update_ids = [item.get('id') if isinstance(item, dict) else None for item in update_items]
+    instances = list(queryset.filter(pk__in=[pk for pk in update_ids if _is_id(pk)]))
+    update_serializer = serializer_class(
+        instances, data=update_items, many=True, partial=True, context=context
+    )
+
+    errors = {}
+    if not create_serializer.is_valid():
+        errors['create'] = create_serializer.errors
+    # 同じ行を2回更新すると変更番号とバージョンが行の値と食い違うため、重複した id は受け付けない
+    update_errors = update_serializer.errors if not update_serializer.is_valid() else [{} for _ in update_items]
+    update_errors = [
+        {**error, **id_error} for error, id_error in zip(update_errors, _id_errors(update_ids))
+    ]
+    if any(update_errors):
+        errors['update'] = update_errors
+
+    delete_id_errors = _id_errors(delete_ids)
+    valid_ids = [pk for pk, error in zip(delete_ids, delete_id_errors) if not error]
+    # 削除ログと配信に使うため、削除する行はここで読んでおく(削除後は pk が消える)
+    deleting = list(queryset.filter(pk__in=valid_ids).only('pk', 'user_id'))
+    existing_ids = {instance.pk for instance in deleting}
+    delete_errors = [
+        error or ({} if pk in existing_ids else {'id': 'Not found'})
+        for pk, error in zip(delete_ids, delete_id_errors)
+    ]
+    if any(delete_errors):
+        errors['delete'] = delete_errors
+
+    # 1件でも不正なら何も書き込まない
+    if errors:
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        created = create_serializer.save()
+        updated = update_serializer.save()
+        if delete_ids:
+            # 行ごとの削除ログは記録せず、まとめて記録する
+            with bulk_deletion():
+                queryset.filter(pk__in=delete_ids).delete()
+            deleted_seqs = record_deletions(deleting)
+        else:
+            deleted_seqs = []
+
+        for instance in [*created, *updated]:
+            publish_change(instance, 'saved', instance.change_seq)
+        for instance, seq in zip(deleting, deleted_seqs):
+            publish_change(instance, 'deleted', seq)
+
+    # bulk_create / bulk_update はシグナルを送らないため明示的に無効化する
+    response_cache.invalidate(queryset.model, request.user.pk)
+
+    return Response({
+        'created': create_serializer.data,
+        'updated': update_serializer.data,
+        'deleted': delete_ids,
+    })
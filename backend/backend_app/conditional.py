@@ -0,0 +1,160 @@
+"""
+条件付きGET(ETag / Last-Modified)
+
+一覧はユーザーごとの「件数・最終更新日時・最終削除日時」から、
+詳細は行の version カラムから検証子を作る。
+クライアントの検証子と一致した場合はシリアライズせずに 304 を返す。
+詳細のETagは更新時の If-Match にもそのまま使える(versioning.py)。
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Subquery
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, quote_etag
+
+from sync.models import ChangeTrackedModel
+
+
+class Validators:
+    """ETag と Last-Modified の組"""
+
+    def __init__(self, etag, last_modified):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def not_modified(self, request):
+        """GET/HEADでクライアントの検証子が一致すれば 304 レスポンスを返す"""
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        response = get_conditional_response(
+            request,
+            etag=self.etag,
+            last_modified=int(self.last_modified.timestamp()) if self.last_modified else None,
+        )
+        if response is None:
+            return None
+        return self.apply(response)
+
+    def apply(self, response):
+        """レスポンスに検証子を設定"""
+        response['ETag'] = self.etag
+        if self.last_modified:
+            response['Last-Modified'] = http_date(self.last_modified.timestamp())
+        return response
+
+
+def make_etag(*parts):
+    """任意の値から強いETagを作る"""
+    raw = ':'.join(str(part) for part in parts)
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def _deleted_at_key(model, user_id):
+    return f'deleted_at:{model._meta.label_lower}:{user_id}'
+
+
+def mark_deleted(model, user_id):
+    """ユーザーのコレクションで削除があったことを記録"""
+    cache.set(_deleted_at_key(model, user_id), timezone.now(), None)
+
+
+def last_deleted_at(model, user_id):
+    """
+    ユーザーのコレクションの最終削除日時
+
+    記録が無い場合(再起動直後など)は削除の有無が分からないため、
+    現在時刻を記録して返す。古い検証子は一度だけ不一致になる。
+    """
+    key = _deleted_at_key(model, user_id)
+    now = timezone.now()
+    if cache.add(key, now, None):
+        return now
+    return cache.get(key, now)
+
+
+async def alast_deleted_at(model, user_id):
+    """last_deleted_at の非同期版"""
+    key = _deleted_at_key(model, user_id)
+    now = timezone.now()
+    if await cache.aadd(key, now, None):
+        return now
+    return await cache.aget(key, now)
+
+
+def _collection_aggregates(model, user_id):
+    aggregates = {'count': Count('id'), 'last_updated': Max('updated_at')}
+    if issubclass(model, ChangeTrackedModel):
+        # 絞り込み(?done=false など)から外れた行は max(updated_at) を動かさないため、
+        # Last-Modified にはユーザーの直近の変更(変更番号が最大の行の更新日時)も含める
+        last_changed = (
+            model._default_manager.filter(user_id=user_id)
+            .order_by('-change_seq').values('updated_at')[:1]
+        )
+        aggregates['last_changed'] = Greatest(Max('updated_at'), Subquery(last_changed))
+    return aggregates
+
+
+def _build_collection_validators(model, stats, deleted_at):
+    last_modified = max(filter(None, [stats['last_updated'], stats.get('last_changed'), deleted_at]))
+    etag = make_etag(
+        model._meta.label_lower,
+        stats['count'],
+        stats['last_updated'] and stats['last_updated'].isoformat(),
+        deleted_at.isoformat(),
+    )
+    return Validators(etag, last_modified)
+
+
+def collection_validators(request, queryset, model=None):
+    """一覧の検証子を集計クエリ1回で計算(model は削除日時を記録するモデル。既定は queryset.model)"""
+    model = model or queryset.model
+    stats = queryset.aggregate(**_collection_aggregates(model, request.user.pk))
+    deleted_at = last_deleted_at(model, request.user.pk)
+    return _build_collection_validators(model, stats, deleted_at)
+
+
+async def acollection_validators(request, queryset, model=None):
+    """collection_validators の非同期版"""
+    model = model or queryset.model
+    stats = await queryset.aaggregate(**_collection_aggregates(model, request.user.pk))
+    deleted_at = await alast_deleted_at(model, request.user.pk)
+    return _build_collection_validators(model, stats, deleted_at)
+
+
+# If-Match: * (行が存在すればバージョンを問わない)
+ANY_VERSION = object()
+
+
+def version_etag(version):
+    """行のバージョンの強いETag("3" のように番号をそのまま使う)"""
+    return quote_etag(str(version))
+
+
+def if_match_versions(request):
+    """
+    If-Match ヘッダーのバージョンの集合
+
+    ヘッダーが無ければ None、* なら ANY_VERSION。
+    弱いETagやバージョンでないETag(?fields= 付きの詳細のETagなど)は
+    強い比較で一致しないため含めない(空の集合ならどの行とも一致しない)
+    """
+    header = request.META.get('HTTP_IF_MATCH')
+    if header is None:
+        return None
+    etags = parse_etags(header)
+    if etags == ['*']:
+        return ANY_VERSION
+    versions = set()
+    for etag in etags:
+        value = etag[1:-1]
+        if not etag.startswith('W/') and value.isascii() and value.isdigit():
+            versions.add(int(value))
+    return versions
+
+
+def object_validators(obj):
+    """詳細の検証子を行のバージョンと更新日時から計算"""
+    return Validators(version_etag(obj.version), obj.updated_at)
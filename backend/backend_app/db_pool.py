@@ -0,0 +1,49 @@
+"""
+DB接続の統計
+
+GET /api/db-pool/ (管理ユーザーのみ)
+
+プールを使う場合(DB_CONN_MODE=pool)は psycopg_pool の統計から
+使用中・待機中の接続数と、接続の取得待ち時間を返す。
+値はプロセスごと(ワーカーごと)で、起動時からの累計を含む。
+"""
+from django.conf import settings
+from django.db import connections
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+
+def stats(alias='default'):
+    """接続方式と、プールの場合はその統計"""
+    connection = connections[alias]
+    result = {'mode': settings.DB_CONN_MODE}
+    pool = connection.pool
+    if pool is None:
+        return result
+
+    raw = pool.get_stats()
+    requests_num = raw.get('requests_num', 0)
+    wait_ms = raw.get('requests_wait_ms', 0)
+    result.update({
+        'size': raw.get('pool_size', 0),
+        'min_size': raw.get('pool_min', 0),
+        'max_size': raw.get('pool_max', 0),
+        'in_use': raw.get('pool_size', 0) - raw.get('pool_available', 0),
+        'idle': raw.get('pool_available', 0),
+        'waiting': raw.get('requests_waiting', 0),
+        'requests': requests_num,
+        'wait_ms_total': wait_ms,
+        'wait_ms_avg': round(wait_ms / requests_num, 3) if requests_num else 0,
+        'timeouts': raw.get('requests_errors', 0),
+        'connections_opened': raw.get('connections_num', 0),
+        'connect_ms_total': raw.get('connections_ms', 0),
+    })
+    return result
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def db_pool_stats(request):
+    """DB接続の統計"""
+    return Response(stats())
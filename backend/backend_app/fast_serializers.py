@@ -0,0 +1,114 @@
+"""
+一覧用の高速な読み取り専用シリアライザー
+
+ModelSerializer(many=True) は行ごとにモデルのインスタンスを作り、フィールドごとに
+get_attribute / to_representation を汎用の処理で呼ぶ。数千行の一覧ではこれがCPU時間の大半になる。
+
+ここではシリアライザーのフィールドから
+- values_list() で読むカラム
+- 値の変換が必要なフィールドとその変換関数(文字列・数値・真偽値はそのまま使う)
+を一度だけ求めておき、タプルから直接 dict を作る。出力は元のシリアライザーと同じ。
+モデルのカラムに対応しないフィールドやネストしたシリアライザーがあれば使わない(None)。
+"""
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import ISO_8601, fields as drf_fields
+from rest_framework.settings import api_settings
+
+from backend_app.metrics import serializer_timer
+from backend_app.pagination import NEWEST_FIRST
+
+# DBから読んだ値に対して to_representation が恒等変換になるフィールド
+_PASS_THROUGH = (
+    drf_fields.CharField,
+    drf_fields.IntegerField,
+    drf_fields.BooleanField,
+    drf_fields.ReadOnlyField,
+)
+
+
+def _iso_datetime(tz):
+    """DateTimeField.to_representation(ISO 8601)と同じ変換"""
+    def convert(value):
+        text = value.astimezone(tz).isoformat()
+        if text.endswith('+00:00'):
+            text = text[:-6] + 'Z'
+        return text
+    return convert
+
+
+def _converter_factory(field):
+    """
+    フィールドの変換関数を作る関数(値が None の行には呼ばない)
+
+    日時はリクエストごとのタイムゾーンで変換するため、serialize() のたびに作る
+    """
+    if isinstance(field, drf_fields.DateTimeField):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        if output_format is not None and output_format.lower() == ISO_8601:
+            def factory():
+                tz = getattr(field, 'timezone', None) or field.default_timezone()
+                return _iso_datetime(tz) if tz is not None else field.to_representation
+            return factory
+    return lambda: field.to_representation
+
+
+class FastReadSerializer:
+    """values_list() のタプルをシリアライザーと同じ dict に変換する"""
+
+    def __init__(self, names, columns, factories, ordering=NEWEST_FIRST):
+        self.names = names
+        # カーソルに使うカラムが出力に無ければ後ろに足して読む
+        self.columns = columns + tuple(name for name in ordering.fields if name not in columns)
+        self._cursor_indexes = tuple(self.columns.index(name) for name in ordering.fields)
+        self._factories = factories
+        self._ordering = ordering
+
+    def queryset(self, queryset):
+        """出力するカラムを読む values_list()"""
+        return queryset.values_list(*self.columns)
+
+    def cursor(self, row):
+        """行のページネーション用カーソル(paginate の cursor_of)"""
+        return self._ordering.make_cursor(*(row[index] for index in self._cursor_indexes))
+
+    def serialize(self, rows):
+        """行(タプル)のリストを dict のリストにする"""
+        with serializer_timer():
+            names = self.names
+            converters = [(name, factory()) for name, factory in self._factories]
+            data = []
+            for row in rows:
+                # カーソル用に足したカラムは zip で切り捨てる
+                item = dict(zip(names, row))
+                for name, convert in converters:
+                    value = item[name]
+                    if value is not None:
+                        item[name] = convert(value)
+                data.append(item)
+            return data
+
+
+@lru_cache(maxsize=None)
+def fast_serializer(serializer_class, fields=None, ordering=NEWEST_FIRST):
+    """serializer_class(fields は ?fields= の組、ordering はページの並び順)の高速版。使えない場合は None"""
+    serializer = serializer_class() if fields is None else serializer_class(fields=fields)
+    opts = serializer.Meta.model._meta
+    names, columns, factories = [], [], []
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*' or '.' in field.source:
+            return None
+        try:
+            model_field = opts.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.is_relation:
+            return None
+        names.append(field.field_name)
+        columns.append(model_field.attname)
+        if not isinstance(field, _PASS_THROUGH):
+            factories.append((field.field_name, _converter_factory(field)))
+    return FastReadSerializer(tuple(names), tuple(columns), tuple(factories), ordering)
@@ -0,0 +1,76 @@
+"""
+一覧GETの共通処理
+
+キャッシュ → 条件付きGET → ページネーション → シリアライズ の順に処理する。
+ページはシリアライザーが読むカラムだけを SELECT する(projection.py)。
+対応するシリアライザーは values_list() のタプルから直接シリアライズする(fast_serializers.py)。
+?fields= の指定があれば出力と SELECT をそのフィールドに絞る(sparse_fields.py)。
+?order= で並び順を選べる(pagination.py)。
+キャッシュにヒットした場合はORMもシリアライザーも通らない。
+"""
+from django.conf import settings
+
+from backend_app import response_cache
+from backend_app.conditional import Validators, collection_validators
+from backend_app.fast_serializers import fast_serializer
+from backend_app.pagination import NEWEST_FIRST, get_ordering, paginate, paginated_response
+from backend_app.projection import project
+from backend_app.sparse_fields import fields_validators, requested_fields
+
+
+def page_serializer(serializer_class, fields, ordering=NEWEST_FIRST):
+    """一覧に使う高速版のシリアライザー(無効または使えない場合は None)"""
+    if not settings.FAST_LIST_SERIALIZER:
+        return None
+    return fast_serializer(serializer_class, fields, ordering)
+
+
+def serialize_page(request, queryset, serializer_class, fields, ordering=NEWEST_FIRST):
+    """1ページ分をシリアライズし、(データ, 次ページのカーソル) を返す"""
+    fast = page_serializer(serializer_class, fields, ordering)
+    if fast is not None:
+        page, next_cursor = paginate(request, fast.queryset(queryset), fast.cursor, ordering)
+        return fast.serialize(page), next_cursor
+    # シリアライズするカラム(とカーソルに使うカラム)だけを取得する
+    queryset = project(queryset, serializer_class, ordering.fields, fields)
+    page, next_cursor = paginate(request, queryset, ordering=ordering)
+    return list(serializer_class(page, many=True, fields=fields).data), next_cursor
+
+
+def list_response(request, queryset, serializer_class, model=None):
+    """
+    ユーザーのコレクションを1ページ分返す
+
+    model はキャッシュと検証子の単位になるモデル(既定は queryset.model)。
+    アーカイブを含むビューを読む場合も元のモデルを渡し、その変更で無効化されるようにする
+    """
+    model = model or queryset.model
+    fields = requested_fields(request, serializer_class)
+    ordering = get_ordering(request, queryset.model)
+    key = response_cache.make_key(request, model)
+    entry = response_cache.lookup(key)
+    cache_hit = entry is not None
+
+    if cache_hit:
+        validators = Validators(entry['etag'], entry['last_modified'])
+    else:
+        validators = fields_validators(collection_validators(request, queryset, model), fields)
+
+    # 前回から変更が無ければシリアライズせずに304を返す
+    response = validators.not_modified(request)
+    if response is not None:
+        return response
+
+    if not cache_hit:
+        data, next_cursor = serialize_page(request, queryset, serializer_class, fields, ordering)
+        entry = {
+            'etag': validators.etag,
+            'last_modified': validators.last_modified,
+            'data': data,
+            'next_cursor': next_cursor,
+        }
+        response_cache.store(key, entry)
+
+    response = paginated_response(request, entry['data'], entry['next_cursor'])
+    response['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+    return validators.apply(response)
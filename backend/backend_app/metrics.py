@@ -0,0 +1,227 @@
+"""
+エンドポイントごとの計測値(処理時間・DB時間・クエリ数・シリアライズ時間)
+
+計測はリクエストごとの RequestMetrics に集め(InstrumentationMiddleware が作成)、
+レスポンス後にプロセス内のヒストグラムへ加える。
+GET /metrics でPrometheusのテキスト形式で出力する。
+
+DB時間とクエリ数は全てのDB接続に登録する execute_wrapper で計測する。
+非同期ビューのORM呼び出しは別スレッドで実行されるが、
+contextvars はスレッドへ引き継がれるため同じリクエストに集計される。
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from backend_app import db_pool, response_cache
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RequestMetrics:
+    """1リクエスト分の計測値"""
+
+    def __init__(self):
+        self.db_time = 0.0
+        self.queries = 0
+        self.serializer_time = 0.0
+
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def start_request():
+    """計測を開始し、終了時に end_request へ渡すトークンを返す"""
+    return _current.set(RequestMetrics())
+
+
+def end_request(token):
+    """計測を終了し、このリクエストの計測値を返す"""
+    metrics = _current.get()
+    _current.reset(token)
+    return metrics
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - started
+        metrics.queries += 1
+
+
+def install_query_recorder(connection):
+    """DB接続にクエリ計測を登録(登録済みなら何もしない)"""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+
+# スレッドごとの接続は最初の接続時に登録する
+connection_created.connect(_on_connection_created)
+
+
+def install_query_recorders():
+    """このスレッドの既存のDB接続に登録"""
+    for connection in connections.all(initialized_only=True):
+        install_query_recorder(connection)
+
+
+@contextmanager
+def serializer_timer():
+    """ブロック内の時間をシリアライズ時間として加算"""
+    metrics = _current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.serializer_time += time.perf_counter() - started
+
+
+class SerializerTimingMixin:
+    """シリアライザーの .data の時間を計測する"""
+
+    @property
+    def data(self):
+        with serializer_timer():
+            return super().data
+
+
+class Histogram:
+    """ラベルごとの累積ヒストグラム(Prometheus形式)"""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def collect(self):
+        """ラベルと集計値の組(スナップショット)"""
+        with self._lock:
+            return {
+                labels: {**series, 'buckets': list(series['buckets'])}
+                for labels, series in self._series.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, series in sorted(self.collect().items()):
+            label_text = _format_labels(labels)
+            for bound, count in zip(self.buckets, series['buckets']):
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {series["count"]}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {series["sum"]}')
+            lines.append(f'{self.name}_count{{{label_text}}} {series["count"]}')
+        return lines
+
+
+LABEL_NAMES = ('view', 'method')
+
+request_duration = Histogram(
+    'http_request_duration_seconds', 'Wall time per request.', DURATION_BUCKETS
+)
+db_duration = Histogram(
+    'http_request_db_duration_seconds', 'Time spent in SQL queries per request.', DURATION_BUCKETS
+)
+db_queries = Histogram(
+    'http_request_db_queries', 'Number of SQL queries per request.', QUERY_BUCKETS
+)
+serializer_duration = Histogram(
+    'http_request_serializer_duration_seconds', 'Time spent in serializers per request.', DURATION_BUCKETS
+)
+
+HISTOGRAMS = (request_duration, db_duration, db_queries, serializer_duration)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in zip(LABEL_NAMES, labels))
+
+
+def observe(view, method, duration, metrics):
+    """1リクエスト分の計測値をヒストグラムに加える"""
+    labels = (view, method)
+    request_duration.observe(labels, duration)
+    db_duration.observe(labels, metrics.db_time)
+    db_queries.observe(labels, metrics.queries)
+    serializer_duration.observe(labels, metrics.serializer_time)
+
+
+def reset():
+    """全てのヒストグラムを空にする"""
+    for histogram in HISTOGRAMS:
+        histogram.clear()
+
+
+def _gauge(name, help_text, value, kind='gauge'):
+    return [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {value}']
+
+
+def render():
+    """Prometheusのテキスト形式"""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.render()
+
+    cache_stats = response_cache.stats()
+    lines += _gauge('response_cache_hits_total', 'List response cache hits.', cache_stats['hits'], 'counter')
+    lines += _gauge('response_cache_misses_total', 'List response cache misses.', cache_stats['misses'], 'counter')
+
+    pool_stats = db_pool.stats()
+    if 'in_use' in pool_stats:
+        lines += _gauge('db_pool_connections_in_use', 'Pooled connections in use.', pool_stats['in_use'])
+        lines += _gauge('db_pool_connections_idle', 'Pooled connections idle.', pool_stats['idle'])
+        lines += _gauge('db_pool_requests_waiting', 'Requests waiting for a connection.', pool_stats['waiting'])
+        lines += _gauge(
+            'db_pool_wait_seconds_total', 'Total time spent waiting for a connection.',
+            pool_stats['wait_ms_total'] / 1000, 'counter',
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    GET /metrics
+
+    METRICS_TOKEN を設定した場合は Authorization: Bearer <token> が必要
+    """
+    token = settings.METRICS_TOKEN
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    return HttpResponse(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
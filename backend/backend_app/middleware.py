@@ -0,0 +1,64 @@
+"""
+リクエストの計測
+
+ビュー(URLのルート)とメソッドごとに、処理時間・DB時間・クエリ数・シリアライズ時間を
+ヒストグラムに記録する(backend_app.metrics)。
+
+SERVER_TIMING を有効にすると内訳を Server-Timing ヘッダーで返す。
+"""
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from backend_app import metrics
+
+
+class InstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics.install_query_recorders()
+        token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_metrics = metrics.end_request(token)
+        return self._finish(request, response, time.perf_counter() - started, request_metrics)
+
+    async def __acall__(self, request):
+        token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_metrics = metrics.end_request(token)
+        return self._finish(request, response, time.perf_counter() - started, request_metrics)
+
+    def _finish(self, request, response, duration, request_metrics):
+        match = getattr(request, 'resolver_match', None)
+        # ルートのパターン(/api/tasks/<int:pk>/ など)をラベルにして系列数を抑える
+        view = f'/{match.route}' if match else 'unmatched'
+        if view != '/metrics':
+            metrics.observe(view, request.method, duration, request_metrics)
+
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = ', '.join([
+                f'total;dur={duration * 1000:.1f}',
+                f'db;dur={request_metrics.db_time * 1000:.1f};desc="{request_metrics.queries} queries"',
+                f'serializer;dur={request_metrics.serializer_time * 1000:.1f}',
+            ])
+            # 別オリジン(Next.js)から Resource Timing API で参照できるようにする
+            origin = request.headers.get('Origin')
+            if origin and origin in settings.CORS_ALLOWED_ORIGINS:
+                response['Timing-Allow-Origin'] = origin
+        return response
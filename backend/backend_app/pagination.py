@@ -0,0 +1,186 @@
+"""
+一覧APIのカーソル(キーセット)ページネーション
+
+(user, -created_at) インデックスに沿って `created_at` の降順に並べ、
+同じ作成日時の行は `id` の降順で順序を確定させる。
+?order=position では (user, position, id) インデックスに沿って手動の並び順で返す。
+OFFSETを使わないため、何ページ目でも取得コストは変わらない。
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+CURSOR_PARAM = 'cursor'
+PAGE_SIZE_PARAM = 'page_size'
+ORDER_PARAM = 'order'
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+class KeysetOrdering:
+    """
+    キーセットページネーションの並び順
+
+    key の順に並べ、同じ値の行は id で順序を確定させる。
+    dump / load はカーソルに入れる key の値の変換(JSONにできない値のみ)
+    """
+
+    def __init__(self, key, descending=False, dump=None, load=None):
+        self.key = key
+        self.descending = descending
+        self.fields = (key, 'id')  # カーソルの作成に読むフィールド
+        self._dump = dump
+        self._load = load
+
+    def make_cursor(self, value, pk):
+        """(key の値, id) を不透明なカーソル文字列にする"""
+        if self._dump is not None:
+            value = self._dump(value)
+        payload = json.dumps([value, pk], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def encode_cursor(self, obj):
+        """最後に返した行(モデルのインスタンス)のカーソル"""
+        return self.make_cursor(getattr(obj, self.key), obj.pk)
+
+    def decode_cursor(self, cursor):
+        """カーソル文字列を (key の値, id) に戻す"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if self._load is not None:
+                value = self._load(value)
+            pk = int(pk)
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+            raise ValidationError({CURSOR_PARAM: 'Invalid cursor'})
+
+        if value is None:
+            raise ValidationError({CURSOR_PARAM: 'Invalid cursor'})
+        return value, pk
+
+    def order_by(self, queryset):
+        if self.descending:
+            return queryset.order_by(f'-{self.key}', '-id')
+        return queryset.order_by(self.key, 'id')
+
+    def after(self, queryset, value, pk):
+        """カーソルの行より後ろの行"""
+        op = 'lt' if self.descending else 'gt'
+        # key の範囲でインデックスを絞り、同じ値の行は id で切る
+        return queryset.filter(**{f'{self.key}__{op}e': value}).filter(
+            Q(**{f'{self.key}__{op}': value}) | Q(**{f'id__{op}': pk})
+        )
+
+
+# 既定の並び順(作成日時の新しい順)
+NEWEST_FIRST = KeysetOrdering('created_at', descending=True, dump=_isoformat, load=parse_datetime)
+
+# ?order= で選べる並び順(モデルにそのフィールドがある場合のみ)
+ORDERINGS = {
+    '-created_at': NEWEST_FIRST,
+    # 手動の並び順(ranking アプリ)
+    'position': KeysetOrdering('position'),
+}
+
+CURSOR_FIELDS = NEWEST_FIRST.fields
+
+
+def make_cursor(created_at, pk):
+    """(created_at, id) を不透明なカーソル文字列にする"""
+    return NEWEST_FIRST.make_cursor(created_at, pk)
+
+
+def encode_cursor(obj):
+    """最後に返した行のカーソル"""
+    return NEWEST_FIRST.encode_cursor(obj)
+
+
+def get_ordering(request, model):
+    """?order= の並び順(指定が無ければ作成日時の新しい順)。使えない値は ValidationError"""
+    value = request.query_params.get(ORDER_PARAM)
+    if not value:
+        return NEWEST_FIRST
+    ordering = ORDERINGS.get(value)
+    if ordering is not None:
+        try:
+            model._meta.get_field(ordering.key)
+            return ordering
+        except FieldDoesNotExist:
+            pass
+    raise ValidationError({ORDER_PARAM: 'Unsupported ordering'})
+
+
+def get_page_size(request):
+    """?page_size= を上限付きで解釈する(不正な値はデフォルト)"""
+    try:
+        page_size = int(request.query_params[PAGE_SIZE_PARAM])
+    except (KeyError, ValueError):
+        return settings.LIST_PAGE_SIZE
+    return max(1, min(page_size, settings.LIST_MAX_PAGE_SIZE))
+
+
+def _page_queryset(request, queryset, ordering):
+    """カーソル以降を page_size + 1 件取得するクエリセット"""
+    page_size = get_page_size(request)
+    queryset = ordering.order_by(queryset)
+
+    cursor = request.query_params.get(CURSOR_PARAM)
+    if cursor:
+        queryset = ordering.after(queryset, *ordering.decode_cursor(cursor))
+
+    # 1件多く取得して次ページの有無を判定
+    return queryset[:page_size + 1], page_size
+
+
+def _split_page(rows, page_size, cursor_of):
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, cursor_of(rows[-1])
+    return rows, None
+
+
+def paginate(request, queryset, cursor_of=None, ordering=NEWEST_FIRST):
+    """
+    1ページ分の行と次ページのカーソルを返す
+
+    次ページが無い場合、カーソルは None。
+    モデルのインスタンス以外(values_list() の行など)では cursor_of で行からカーソルを作る
+    """
+    page, page_size = _page_queryset(request, queryset, ordering)
+    return _split_page(list(page), page_size, cursor_of or ordering.encode_cursor)
+
+
+async def apaginate(request, queryset, cursor_of=None, ordering=NEWEST_FIRST):
+    """paginate の非同期版"""
+    page, page_size = _page_queryset(request, queryset, ordering)
+    return _split_page([row async for row in page], page_size, cursor_of or ordering.encode_cursor)
+
+
+def set_next_link(request, response, next_cursor):
+    """次ページがあれば Link / X-Next-Cursor ヘッダーを設定"""
+    if next_cursor:
+        next_url = replace_query_param(
+            request.build_absolute_uri(), CURSOR_PARAM, next_cursor
+        )
+        response['Link'] = f'<{next_url}>; rel="next"'
+        response['X-Next-Cursor'] = next_cursor
+    return response
+
+
+def paginated_response(request, data, next_cursor):
+    """
+    ページのレスポンスを作成
+
+    本文は従来どおり配列のまま返し、次ページは Link ヘッダーで通知する
+    """
+    return set_next_link(request, Response(data), next_cursor)
@@ -0,0 +1,22 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import BooleanField
+
+# 一覧にアーカイブした行も含める(archive アプリ)
+INCLUDE_ARCHIVED_PARAM = 'include_archived'
+
+
+def bool_param(request, name):
+    """
+    真偽値のクエリパラメータ(true / false / 1 / 0 など)
+
+    指定が無ければ None。解釈できない値は ValidationError
+    """
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    value = value.lower()
+    if value in BooleanField.TRUE_VALUES:
+        return True
+    if value in BooleanField.FALSE_VALUES:
+        return False
+    raise ValidationError({name: 'Invalid boolean'})
@@ -0,0 +1,88 @@
+"""
+シリアライザーが使うカラムだけを取得する
+
+ModelSerializer の Meta.fields から select_related / only() の引数を求め、クエリセットに適用する。
+ネストした ModelSerializer(UserSerializer の profile など)は JOIN で同時に取得する。
+モデルのフィールドに対応しない項目(SerializerMethodField やドット区切りの source)がある
+シリアライザーは射影せず、クエリセットをそのまま使う。
+?fields= で出力を絞る場合(sparse_fields.py)は、そのフィールドだけを射影する。
+"""
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+class Projection:
+    """select_related のパスと only() のフィールドの組"""
+
+    def __init__(self, related, fields):
+        self.related = related
+        self.fields = fields
+
+    def apply(self, queryset, extra=()):
+        """クエリセットに射影を適用する(extra は一覧の並び順などシリアライズ以外で読むフィールド)"""
+        if self.related:
+            queryset = queryset.select_related(*self.related)
+        return queryset.only(*self.fields, *extra)
+
+
+def _collect(serializer, prefix, related, fields):
+    """serializer が読むフィールドを related / fields に追加する。射影できなければ False"""
+    opts = serializer.Meta.model._meta
+    fields.append(prefix + opts.pk.name)
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*' or '.' in field.source:
+            return False
+        try:
+            model_field = opts.get_field(field.source)
+        except FieldDoesNotExist:
+            return False
+
+        if isinstance(field, serializers.ModelSerializer):
+            # ネストしたシリアライザーは JOIN して、そのフィールドも射影する
+            if not (model_field.one_to_one or model_field.many_to_one):
+                return False
+            related.append(prefix + field.source)
+            if not _collect(field, f'{prefix}{field.source}__', related, fields):
+                return False
+        elif model_field.concrete and not model_field.many_to_many:
+            fields.append(prefix + model_field.name)
+        else:
+            return False
+    return True
+
+
+@lru_cache(maxsize=None)
+def projection(serializer_class, only_fields=None):
+    """シリアライザーの射影(射影できない場合は None)。only_fields は出力するフィールドの組"""
+    serializer = serializer_class() if only_fields is None else serializer_class(fields=only_fields)
+    related, fields = [], []
+    if not _collect(serializer, '', related, fields):
+        return None
+    return Projection(tuple(related), tuple(dict.fromkeys(fields)))
+
+
+def project(queryset, serializer_class, extra=(), fields=None):
+    """queryset を serializer_class が読むカラム(fields を渡した場合はそのうちの fields)だけの SELECT にする"""
+    proj = projection(serializer_class, fields)
+    if proj is None:
+        return queryset
+    return proj.apply(queryset, extra)
+
+
+def load_related(instance, serializer_class):
+    """
+    serializer_class がネストして読むリレーションが未取得なら、射影したクエリで取り直す
+
+    取得済み(JWT認証で JOIN 済みのユーザーなど)の場合は instance をそのまま返す
+    """
+    proj = projection(serializer_class)
+    if proj is None:
+        return instance
+    opts = instance._meta
+    if all(opts.get_field(path.split('__')[0]).is_cached(instance) for path in proj.related):
+        return instance
+    return proj.apply(type(instance)._default_manager.all()).get(pk=instance.pk)
@@ -0,0 +1,144 @@
+"""
+一覧APIのユーザー別レスポンスキャッシュ
+
+シリアライズ済みの一覧をDjangoのキャッシュフレームワークに保存する。
+キーにはユーザーごとの世代番号を含め、保存・削除シグナルで世代を進めて無効化する。
+(パターン削除ができないキャッシュでも、古いエントリは参照されずに期限切れで消える)
+
+世代番号もキャッシュに置くため、無効化が他のワーカーに伝わるのはキャッシュを
+プロセス間で共有している場合だけ。既定では LocMemCache などプロセス内のキャッシュでは
+使わない(settings.RESPONSE_CACHE_ENABLED)。
+"""
+import hashlib
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+_stats = {'hits': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+
+
+# ワーカー間で共有されないキャッシュ
+_PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def _cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def enabled():
+    """キャッシュを使うか(RESPONSE_CACHE_ENABLED が未設定なら、共有キャッシュの場合だけ)"""
+    if settings.RESPONSE_CACHE_ENABLED is not None:
+        return settings.RESPONSE_CACHE_ENABLED
+    return not isinstance(_cache(), _PROCESS_LOCAL_CACHES)
+
+
+def _generation_key(model, user_id):
+    return f'response_gen:{model._meta.label_lower}:{user_id}'
+
+
+def _generation(model, user_id):
+    """ユーザーのコレクションの現在の世代番号"""
+    cache = _cache()
+    key = _generation_key(model, user_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        generation = cache.get(key)
+    return generation
+
+
+async def _ageneration(model, user_id):
+    """_generation の非同期版"""
+    cache = _cache()
+    key = _generation_key(model, user_id)
+    generation = await cache.aget(key)
+    if generation is None:
+        await cache.aadd(key, uuid.uuid4().hex, None)
+        generation = await cache.aget(key)
+    return generation
+
+
+def _entry_key(request, model, generation):
+    query = request.query_params.urlencode()
+    digest = hashlib.md5(query.encode()).hexdigest()
+    return f'response:{model._meta.label_lower}:{request.user.pk}:{generation}:{digest}'
+
+
+def make_key(request, model):
+    """
+    リクエストに対応するキャッシュキー
+
+    世代番号はこの時点で確定させるため、
+    集計中に更新が入っても古い結果が新しい世代に保存されることはない。
+    キャッシュを使わない場合は None(lookup / store は何もしない)
+    """
+    if not enabled():
+        return None
+    return _entry_key(request, model, _generation(model, request.user.pk))
+
+
+async def amake_key(request, model):
+    """make_key の非同期版"""
+    if not enabled():
+        return None
+    return _entry_key(request, model, await _ageneration(model, request.user.pk))
+
+
+def _count(entry):
+    with _stats_lock:
+        _stats['hits' if entry is not None else 'misses'] += 1
+
+
+def lookup(key):
+    """キャッシュを取得し、ヒット/ミスを記録"""
+    if key is None:
+        return None
+    entry = _cache().get(key)
+    _count(entry)
+    return entry
+
+
+async def alookup(key):
+    """lookup の非同期版"""
+    if key is None:
+        return None
+    entry = await _cache().aget(key)
+    _count(entry)
+    return entry
+
+
+def store(key, entry):
+    """一覧のエントリを保存"""
+    if key is not None:
+        _cache().set(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+
+
+async def astore(key, entry):
+    """store の非同期版"""
+    if key is not None:
+        await _cache().aset(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+
+
+def invalidate(model, user_id):
+    """ユーザーのコレクションの世代を進める"""
+    if not enabled():
+        return
+
+    def bump():
+        _cache().set(_generation_key(model, user_id), uuid.uuid4().hex, None)
+
+    bump()
+    # トランザクション中の保存は、コミット前に読まれた結果が残らないようコミット後にも進める
+    transaction.on_commit(bump)
+
+
+def stats():
+    """ヒット/ミスの件数"""
+    with _stats_lock:
+        return dict(_stats)
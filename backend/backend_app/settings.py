@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 import os
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -41,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
@@ -48,9 +50,16 @@ INSTALLED_APPS = [
     'schedules',
     'bookmarks',
     'users',
+    'dashboard',
+    'sync',
+    'search',
+    'archive',
+    'ranking',
 ]
 
 MIDDLEWARE = [
+    # 他のミドルウェアを含めた処理時間を計測するため先頭に置く
+    'backend_app.middleware.InstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -95,6 +104,57 @@ DATABASES = {
     }
 }
 
+# 接続の使い回し方(環境ごとに DB_CONN_MODE で切り替える)
+#   pool       : psycopg のコネクションプール(スレッド間で共有。ASGIのスレッドごとの接続にも効く)
+#   persistent : CONN_MAX_AGE の間、スレッドごとに接続を保持する(WSGI用。
+#                ASGIではリクエストごとにスレッドが変わるため使い回されない)
+#   none       : リクエストごとに接続・切断する(従来の動作)
+# pool / persistent では、使い回す前に接続が生きているかを確認する(CONN_HEALTH_CHECKS)
+DB_CONN_MODE = os.getenv('DB_CONN_MODE', 'pool')
+
+DATABASES['default']['CONN_HEALTH_CHECKS'] = DB_CONN_MODE in ('pool', 'persistent')
+
+if DB_CONN_MODE == 'pool':
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            # 空きが無い場合に待つ秒数
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+            'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+        },
+    }
+elif DB_CONN_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', '60'))
+
+
+# Cache
+# CACHE_BACKEND / CACHE_LOCATION で Redis などに差し替え可能(デフォルトはプロセス内メモリ)
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'myportal'),
+    },
+    # JWT認証のユーザーキャッシュ(プロセス内・短時間)
+    'auth_users': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'auth-users',
+        'TIMEOUT': int(os.getenv('AUTH_USER_CACHE_TIMEOUT', '30')),
+    },
+}
+
+# 一覧APIのレスポンスキャッシュ
+# 無効化は世代番号をキャッシュに書いて伝えるため、複数ワーカーではプロセス間で共有するキャッシュ
+# (CACHE_BACKEND に Redis / Memcached など)が必要。LocMemCache では他のワーカーが
+# 書き込み後も古い一覧を返し続ける。未設定なら共有キャッシュのときだけ有効にする
+# (1プロセスで動かす場合は RESPONSE_CACHE_ENABLED=True で LocMemCache でも有効にできる)
+RESPONSE_CACHE_ENABLED = {'True': True, 'False': False}.get(os.getenv('RESPONSE_CACHE_ENABLED', ''))
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300'))
+
+AUTH_USER_CACHE_ALIAS = 'auth_users'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -144,16 +204,68 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# 条件付きリクエスト用のヘッダーを許可
+CORS_ALLOW_HEADERS = (
+    *default_headers,
+    'if-none-match',
+    'if-modified-since',
+)
+
+# フロントエンドから参照するレスポンスヘッダー
+CORS_EXPOSE_HEADERS = [
+    'ETag',
+    'Last-Modified',
+    'Link',
+    'X-Next-Cursor',
+    'Server-Timing',
+]
+
 # REST Framework設定
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
 }
 
+# 一覧APIのページネーション設定(?page_size= で変更可能)
+LIST_PAGE_SIZE = int(os.getenv('LIST_PAGE_SIZE', '100'))
+LIST_MAX_PAGE_SIZE = int(os.getenv('LIST_MAX_PAGE_SIZE', '500'))
+
+# 一覧を values_list() から直接 dict にする高速版でシリアライズする(backend_app.fast_serializers)
+FAST_LIST_SERIALIZER = os.getenv('FAST_LIST_SERIALIZER', 'True') == 'True'
+
+# 一括操作APIの1リクエストあたりの上限
+BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', '500'))
+
+# 差分同期APIの1レスポンスあたりの最大件数(種類ごと)
+SYNC_MAX_CHANGES = int(os.getenv('SYNC_MAX_CHANGES', '500'))
+# 削除ログの保持日数(manage.py prune_tombstones がこれより古いものを消す)。
+# これより長く同期していないクライアントは初めから同期し直す
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', '90'))
+
+# 検索APIの1レスポンスあたりの最大件数(?limit= で減らせる)
+SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', '20'))
+
+# アーカイブ(manage.py archive)
+# 完了してから(最終更新から)この日数が過ぎたタスク、この日数より前のスケジュールを移す
+ARCHIVE_TASKS_AFTER_DAYS = int(os.getenv('ARCHIVE_TASKS_AFTER_DAYS', '30'))
+ARCHIVE_SCHEDULES_AFTER_DAYS = int(os.getenv('ARCHIVE_SCHEDULES_AFTER_DAYS', '30'))
+# 1トランザクションで移す行数(行ロックを持つ時間の上限)
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '1000'))
+
+# 手動の並び順(ranking アプリ)。manage.py rebalance_positions はこれより長い順位を詰め直す
+POSITION_REBALANCE_LENGTH = int(os.getenv('POSITION_REBALANCE_LENGTH', '16'))
+
+# 変更イベント(SSE)の設定
+# 複数ワーカー構成ではプロセス間で共有できるブローカーに差し替える
+EVENTS_BROKER = os.getenv('EVENTS_BROKER', 'sync.events.InProcessBroker')
+EVENTS_HISTORY_SIZE = 100
+EVENTS_HEARTBEAT_INTERVAL = 15
+EVENTS_RETRY_MS = 3000
+
 # SimpleJWT設定
 from datetime import timedelta
 
@@ -162,8 +274,21 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    # 最終ログイン日時は users.services.login_google_user で記録する
+    'UPDATE_LAST_LOGIN': False,
 }
 
 # Google OAuth設定
-GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID')
\ No newline at end of file
+GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID')
+GOOGLE_CERTS_URL = os.getenv('GOOGLE_CERTS_URL', 'https://www.googleapis.com/oauth2/v1/certs')
+# 証明書取得のタイムアウト(秒)。google-auth は timeout を渡さずに証明書を取得する
+GOOGLE_CERTS_TIMEOUT = float(os.getenv('GOOGLE_CERTS_TIMEOUT', '10'))
+
+# 検証済みIDトークンの保持時間(秒)
+GOOGLE_TOKEN_CACHE_TIMEOUT = int(os.getenv('GOOGLE_TOKEN_CACHE_TIMEOUT', '60'))
+
+# 計測(backend_app.metrics)
+# SERVER_TIMING: レスポンスに Server-Timing ヘッダー(処理時間・DB時間・シリアライズ時間)を付ける
+# METRICS_TOKEN: 設定すると /metrics に Authorization: Bearer <token> が必要になる
+SERVER_TIMING = os.getenv('SERVER_TIMING', 'False') == 'True'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
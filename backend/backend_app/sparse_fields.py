@@ -0,0 +1,47 @@
+"""
+スパースフィールドセット(?fields=)
+
+GET /api/bookmarks/?fields=id,name,url
+
+指定されたフィールドだけをシリアライズし、SELECT するカラムも同じフィールドに絞る
+(projection.project に fields を渡す)。
+"""
+from rest_framework.exceptions import ValidationError
+
+from backend_app.conditional import Validators, make_etag
+
+FIELDS_PARAM = 'fields'
+
+
+class SparseFieldsMixin:
+    """fields=[...] を受け取り、それ以外のフィールドを出力しないシリアライザー"""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+def requested_fields(request, serializer_class):
+    """
+    ?fields= で指定されたフィールド(Meta.fields の順)を返す。指定が無ければ None
+
+    存在しないフィールドは ValidationError
+    """
+    value = request.query_params.get(FIELDS_PARAM, '')
+    names = {name.strip() for name in value.split(',') if name.strip()}
+    if not names:
+        return None
+    available = serializer_class.Meta.fields
+    unknown = sorted(names - set(available))
+    if unknown:
+        raise ValidationError({FIELDS_PARAM: f"Unknown field(s): {', '.join(unknown)}"})
+    return tuple(name for name in available if name in names)
+
+
+def fields_validators(validators, fields):
+    """フィールドを絞った表現には別のETagを付ける(全フィールドの表現と取り違えないため)"""
+    if fields is None:
+        return validators
+    return Validators(make_etag(validators.etag, *fields), validators.last_modified)
@@ -0,0 +1,20 @@
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+@pytest.mark.django_db
+def test_db_pool_stats_for_admin(authenticated_client, settings):
+    """管理ユーザーだけがプールの統計を取得できる"""
+    assert authenticated_client.get('/api/db-pool/').status_code == 403
+
+    admin = User.objects.create_superuser(username='admin', password='x')
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    res = client.get('/api/db-pool/')
+    assert res.status_code == 200
+    assert res.data['mode'] == settings.DB_CONN_MODE
+    if settings.DB_CONN_MODE == 'pool':
+        # テスト中はこのスレッドが接続を1本使用している
+        assert res.data['in_use'] >= 1
+        assert res.data['in_use'] + res.data['idle'] == res.data['size']
+        assert res.data['requests'] >= 1
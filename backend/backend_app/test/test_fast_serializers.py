@@ -0,0 +1,66 @@
+import pytest
+from django.utils import timezone
+from backend_app import response_cache
+from backend_app.fast_serializers import fast_serializer
+from bookmarks.models import Bookmark
+from bookmarks.serializers import BookmarkSerializer
+from schedules.models import Schedule
+from schedules.serializers import ScheduleSerializer
+from tasks.models import Task
+from tasks.serializers import TaskSerializer
+from users.serializers import UserSerializer
+
+def compare(queryset, serializer_class, fields=None):
+    fast = fast_serializer(serializer_class, fields)
+    expected = serializer_class(list(queryset), many=True, fields=fields).data
+    assert fast.serialize(list(fast.queryset(queryset))) == expected
+    return expected
+
+@pytest.fixture
+def rows(test_user):
+    Task.objects.create(user=test_user, title='Task', detail='Detail', done=True)
+    Task.objects.create(user=test_user, title='タスク')
+    Schedule.objects.create(user=test_user, title='Meeting', location='Tokyo', date='2025-12-01T00:30:00+09:00')
+    Schedule.objects.create(user=test_user, title='Lunch', memo='Memo', location='Osaka', date='2025-12-01T03:00:00Z')
+    Bookmark.objects.create(user=test_user, name='Google', url='https://google.com', iconEmoji='icon', color='#FF0000')
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('model, serializer_class', [
+    (Task, TaskSerializer), (Schedule, ScheduleSerializer), (Bookmark, BookmarkSerializer),
+])
+def test_output_matches_model_serializer(rows, model, serializer_class):
+    """出力(None の値・日時の形式を含む)は ModelSerializer と同じ"""
+    data = compare(model.objects.order_by('id'), serializer_class)
+    assert data
+
+@pytest.mark.django_db
+def test_output_matches_in_other_timezones(rows):
+    """日時は有効なタイムゾーンで変換する(UTCは末尾を Z にする)"""
+    for tz in ['UTC', 'America/New_York']:
+        with timezone.override(tz):
+            data = compare(Schedule.objects.order_by('id'), ScheduleSerializer)
+    assert data[1]['date'] == '2025-11-30T22:00:00-05:00'
+    with timezone.override('UTC'):
+        assert compare(Schedule.objects.order_by('id'), ScheduleSerializer)[1]['date'] == '2025-12-01T03:00:00Z'
+
+@pytest.mark.django_db
+def test_sparse_fields(rows):
+    """?fields= の組でも同じ出力"""
+    data = compare(Task.objects.order_by('id'), TaskSerializer, ('id', 'detail'))
+    assert data[1] == {'id': data[1]['id'], 'detail': None}
+
+@pytest.mark.django_db
+def test_list_endpoint_matches_model_serializer(authenticated_client, test_user, rows, settings):
+    """一覧のレスポンスとカーソルは高速版の有無で変わらない"""
+    responses = []
+    for fast in (True, False):
+        settings.FAST_LIST_SERIALIZER = fast
+        response_cache.invalidate(Schedule, test_user.pk)
+        res = authenticated_client.get('/api/schedules/?page_size=1')
+        assert res['X-Cache'] == 'MISS'
+        responses.append((res.content, res['X-Next-Cursor']))
+    assert responses[0] == responses[1]
+
+def test_unsupported_serializer():
+    """ネストしたシリアライザーは高速版を使わない"""
+    assert fast_serializer(UserSerializer) is None
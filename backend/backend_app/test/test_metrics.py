@@ -0,0 +1,74 @@
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from backend_app import metrics
+from tasks.models import Task
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+
+def series(histogram, view, method='GET'):
+    return histogram.collect()[(view, method)]
+
+@pytest.mark.django_db
+def test_metrics_record_queries_and_serializer_time(authenticated_client, test_user):
+    """ビューごとにクエリ数・DB時間・シリアライズ時間を記録する"""
+    for i in range(3):
+        Task.objects.create(user=test_user, title=f'Task {i}')
+
+    authenticated_client.get('/api/tasks/')
+    authenticated_client.get('/api/tasks/')
+
+    view = '/api/tasks/'
+    assert series(metrics.request_duration, view)['count'] == 2
+    queries = series(metrics.db_queries, view)
+    # 1回目は集計と取得の2クエリ、2回目はキャッシュから返す
+    assert queries['sum'] == 2
+    assert series(metrics.db_duration, view)['sum'] > 0
+    assert series(metrics.serializer_duration, view)['sum'] > 0
+
+    task = Task.objects.first()
+    authenticated_client.get(f'/api/tasks/{task.pk}/')
+    assert series(metrics.request_duration, '/api/tasks/<int:pk>/')['count'] == 1
+
+@pytest.mark.django_db
+def test_metrics_record_async_views(api_client, test_user):
+    """非同期ビューのORM呼び出し(別スレッド)も同じリクエストに集計する"""
+    Task.objects.create(user=test_user, title='Task')
+    token = RefreshToken.for_user(test_user).access_token
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    assert api_client.get('/api/async/tasks/').status_code == 200
+    # ユーザー・集計・取得
+    assert series(metrics.db_queries, '/api/async/tasks/')['sum'] == 3
+
+@pytest.mark.django_db
+def test_metrics_endpoint(authenticated_client, settings):
+    """Prometheus形式で出力し、トークン設定時は認証を求める"""
+    authenticated_client.get('/api/tasks/')
+
+    res = APIClient().get('/metrics')
+    assert res.status_code == 200
+    assert res['Content-Type'].startswith('text/plain')
+    body = res.content.decode()
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_request_db_queries_bucket{view="/api/tasks/",method="GET",le="+Inf"} 1' in body
+    assert 'response_cache_misses_total' in body
+
+    settings.METRICS_TOKEN = 'secret'
+    assert APIClient().get('/metrics').status_code == 401
+    assert APIClient().get('/metrics', HTTP_AUTHORIZATION='Bearer secret').status_code == 200
+
+@pytest.mark.django_db
+def test_server_timing_header(authenticated_client, settings):
+    """SERVER_TIMING を有効にした場合のみ内訳を返す"""
+    assert not authenticated_client.get('/api/tasks/').has_header('Server-Timing')
+
+    settings.SERVER_TIMING = True
+    res = authenticated_client.get('/api/tasks/?page_size=1', HTTP_ORIGIN='http://localhost:3000')
+    timing = res['Server-Timing']
+    assert timing.startswith('total;dur=')
+    assert 'db;dur=' in timing and 'desc="2 queries"' in timing
+    assert 'serializer;dur=' in timing
+    assert res['Timing-Allow-Origin'] == 'http://localhost:3000'
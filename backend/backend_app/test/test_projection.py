@@ -0,0 +1,86 @@
+import re
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from backend_app.projection import load_related, project, projection
+from schedules.models import Schedule
+from tasks.models import Task
+from users.models import UserProfile
+from users.serializers import UserSerializer
+
+def selected_columns(sql):
+    """SELECT 句のカラム名("table"."column" の column)"""
+    select = sql.split(' FROM ')[0]
+    return re.findall(r'"\w+"\."(\w+)"', select)
+
+def page_query(queries, table):
+    # 検証子の集計クエリ(副問い合わせに ORDER BY を含む)は除く
+    return next(
+        q['sql'] for q in queries
+        if f'FROM "{table}"' in q['sql'] and 'ORDER BY' in q['sql'] and 'COUNT(' not in q['sql']
+    )
+
+@pytest.mark.django_db
+def test_list_selects_serialized_columns(authenticated_client, test_user, settings):
+    """一覧はシリアライズするカラムだけを取得する(user_id や change_seq は読まない)"""
+    settings.FAST_LIST_SERIALIZER = False
+    Task.objects.create(user=test_user, title='Task')
+    Schedule.objects.create(user=test_user, title='Meeting', location='Tokyo', date='2025-12-01T10:00:00+09:00')
+
+    with CaptureQueriesContext(connection) as queries:
+        assert authenticated_client.get('/api/tasks/').status_code == 200
+        assert authenticated_client.get('/api/schedules/').status_code == 200
+    assert selected_columns(page_query(queries, 'tasks')) == [
+        'id', 'position', 'version', 'title', 'detail', 'done', 'created_at', 'updated_at'
+    ]
+    assert selected_columns(page_query(queries, 'schedules')) == [
+        'id', 'version', 'title', 'memo', 'location', 'date', 'created_at', 'updated_at'
+    ]
+
+@pytest.mark.django_db
+def test_detail_selects_serialized_columns(authenticated_client, test_user):
+    """詳細の取得も同じ射影を使い、更新は事前に読まない"""
+    task = Task.objects.create(user=test_user, title='Task')
+
+    with CaptureQueriesContext(connection) as queries:
+        res = authenticated_client.get(f'/api/tasks/{task.pk}/')
+    assert res.data['title'] == 'Task'
+    assert 'user_id' not in selected_columns(queries[0]['sql'])
+
+    with CaptureQueriesContext(connection) as queries:
+        res = authenticated_client.put(f'/api/tasks/{task.pk}/', {'done': True}, format='json')
+    assert res.status_code == 200
+    assert not [query for query in queries if query['sql'].startswith('SELECT')]
+    task.refresh_from_db()
+    assert task.done is True and task.title == 'Task'
+
+@pytest.mark.django_db
+def test_nested_serializer_is_joined(test_user):
+    """ネストしたシリアライザーのリレーションは JOIN して1クエリで取得する"""
+    UserProfile.objects.create(user_id=test_user.pk, google_user_id='google-1', picture_url='https://example.com/a.png')
+    assert projection(UserSerializer).related == ('profile',)
+
+    user = User.objects.get(pk=test_user.pk)
+    with CaptureQueriesContext(connection) as queries:
+        data = UserSerializer(load_related(user, UserSerializer)).data
+    assert len(queries) == 1
+    assert 'password' not in selected_columns(queries[0]['sql'])
+    assert data['profile']['google_user_id'] == 'google-1'
+
+def test_unprojectable_serializer():
+    """モデルのフィールドに対応しない項目があれば射影しない"""
+    class TaskWithLabel(serializers.ModelSerializer):
+        label = serializers.SerializerMethodField()
+
+        class Meta:
+            model = Task
+            fields = ['id', 'label']
+
+        def get_label(self, obj):
+            return obj.title
+
+    assert projection(TaskWithLabel) is None
+    queryset = Task.objects.all()
+    assert project(queryset, TaskWithLabel) is queryset
@@ -1,10 +1,18 @@
 from django.contrib import admin
 from django.urls import path, include
+from backend_app.db_pool import db_pool_stats
+from backend_app.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
+    path('api/db-pool/', db_pool_stats, name='db_pool_stats'),
     path('api/tasks/', include('tasks.urls')),
     path('api/schedules/', include('schedules.urls')),
     path('api/bookmarks/', include('bookmarks.urls')),
+    path('api/dashboard/', include('dashboard.urls')),
+    path('api/sync/', include('sync.urls')),
+    path('api/search/', include('search.urls')),
+    path('api/async/', include('backend_app.async_urls')),
     path('api/', include('users.urls')),
 ]
@@ -0,0 +1,97 @@
+"""
+詳細の更新(If-Match による楽観的排他制御)
+
+PUT /api/<app>/<id>/
+If-Match: "3"
+
+詳細のETagは行の version カラム(conditional.version_etag)。If-Match のバージョンを条件にした
+UPDATE ... WHERE id = ? AND user_id = ? AND version IN (...) RETURNING ... を1回だけ実行し、
+事前の SELECT をしない。一致する行が無ければ(他の更新が先に入った・削除された)412 を返す。
+If-Match が無い更新は従来どおり後勝ちで、行が無ければ 404。
+更新後の行と新しいETagを返すので、クライアントは続けて If-Match に使える。
+"""
+from asgiref.sync import sync_to_async
+from django.db import connections, transaction
+from django.db.models import F
+from django.db.models.sql import UpdateQuery
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from backend_app import response_cache
+from backend_app.conditional import ANY_VERSION, if_match_versions, object_validators
+from sync.events import publish_change
+from sync.models import ChangeCounter
+
+
+def _update_returning(queryset, values):
+    """queryset の行を values で更新し、更新後の行(インスタンス)のリストを返す"""
+    model = queryset.model
+    query = queryset.query.chain(UpdateQuery)
+    query.add_update_values(values)
+    sql, params = query.get_compiler(queryset.db).as_sql()
+    fields = [field for field in model._meta.concrete_fields if not field.generated]
+    connection = connections[queryset.db]
+    returning = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.execute(f'{sql} RETURNING {returning}', params)
+        rows = cursor.fetchall()
+    attnames = [field.attname for field in fields]
+    return [model.from_db(queryset.db, attnames, row) for row in rows]
+
+
+def update_row(queryset, pk, user_id, validated_data, versions=None):
+    """
+    queryset(ユーザーの行)の pk の行を UPDATE 1回で更新し、更新後の行を返す
+
+    versions(if_match_versions の値)が集合なら、そのバージョンの行だけを更新する。
+    更新しなかった場合は None。save() と同じく変更番号と更新日時を進め、変更を配信する
+    """
+    queryset = queryset.filter(pk=pk)
+    if versions is not None and versions is not ANY_VERSION:
+        if not versions:
+            # どのバージョンとも一致しない(弱いETagだけなど)
+            return None
+        queryset = queryset.filter(version__in=versions)
+    with transaction.atomic():
+        seq = ChangeCounter.objects.allocate(user_id)
+        rows = _update_returning(queryset, {
+            **validated_data,
+            'updated_at': timezone.now(),
+            'change_seq': seq,
+            'version': F('version') + 1,
+        })
+        if not rows:
+            # 確保した番号はロールバックで戻す
+            transaction.set_rollback(True)
+            return None
+        instance = rows[0]
+        publish_change(instance, 'saved', seq)
+
+    # UPDATE はシグナルを送らないため明示的に無効化する
+    response_cache.invalidate(queryset.model, user_id)
+    return instance
+
+
+# 生のSQLを実行するため、非同期ビューからはスレッドで呼ぶ
+aupdate_row = sync_to_async(update_row)
+
+
+def failed_status(versions):
+    """update_row が更新しなかった場合のステータス(If-Match があれば 412、無ければ 404)"""
+    if versions is None:
+        return status.HTTP_404_NOT_FOUND
+    return status.HTTP_412_PRECONDITION_FAILED
+
+
+def update_response(request, queryset, serializer_class, pk):
+    """queryset(ユーザーの行)の pk の行を PUT の内容で更新し、更新後の行と新しい検証子を返す"""
+    serializer = serializer_class(data=request.data, partial=True)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    versions = if_match_versions(request)
+    instance = update_row(queryset, pk, request.user.pk, serializer.validated_data, versions)
+    if instance is None:
+        return Response(status=failed_status(versions))
+    return object_validators(instance).apply(Response(serializer_class(instance).data))
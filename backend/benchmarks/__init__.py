@@ -0,0 +1,10 @@
+"""
+性能計測用スクリプト
+
+- data.py: 計測用の大きなアカウントを作成する
+- bench_views.py / bench_serializers.py: pytest-benchmark のマイクロベンチマーク
+- load.py: 起動中のサーバーへのHTTP負荷ドライバー
+- async_views.py / db_connections.py: ASGIの同期/非同期ビュー、DB接続方式の比較
+
+backend ディレクトリで python -m benchmarks.<name>(bench_*.py は pytest)として実行する。
+"""
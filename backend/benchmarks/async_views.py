@@ -0,0 +1,184 @@
+"""
+同期版と非同期版のCRUDビューのスループット比較
+
+ASGIアプリケーション(backend_app.asgi)をプロセス内で直接呼び出し、
+同時に --concurrency 件のリクエストを送り続けて requests/sec を計測する。
+ネットワークやサーバーのワーカー構成の影響を除き、ビューの処理方式の差だけを比べる。
+
+    python -m benchmarks.async_views --requests 2000 --concurrency 100
+
+レスポンスキャッシュはデフォルトで無効(毎回DBを読む)。--cache で有効にする。
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+
+def setup_django(use_cache):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_app.settings')
+    if not use_cache:
+        os.environ['CACHE_BACKEND'] = 'django.core.cache.backends.dummy.DummyCache'
+    import django
+    django.setup()
+
+
+def seed(tasks):
+    """計測用ユーザーとタスクを作成し、アクセストークンを返す"""
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from tasks.models import Task
+
+    user = User.objects.create_user(username='bench', password='bench')
+    objs = [Task(user=user, title=f'Task {i}', detail='x' * 100) for i in range(tasks)]
+    Task.assign_change_seqs(objs)
+    Task.objects.bulk_create(objs)
+    return str(RefreshToken.for_user(user).access_token), objs[0].pk
+
+
+def create_test_db():
+    """計測用のDBを作成し、元のDB名を返す(pytest の --reuse-db で使うテスト用DBとは別にする)"""
+    from django.db import connection
+
+    old_name = connection.settings_dict['NAME']
+    connection.settings_dict['TEST']['NAME'] = f'test_{old_name}_bench'
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    return old_name
+
+
+def destroy_test_db(old_name):
+    """計測用のDBを削除する"""
+    from django.db import connection
+
+    # ASGIのリクエストごとのスレッドで開いた接続が残っていると削除できないため切断する
+    if connection.pool is not None:
+        connection.close_pool()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_terminate_backend(pid) FROM pg_stat_activity '
+            'WHERE datname = current_database() AND pid <> pg_backend_pid()'
+        )
+    connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+async def call(application, path, token):
+    """ASGIアプリケーションへGETを1回送り、ステータスを返す"""
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': query.encode(),
+        'headers': [(b'host', b'testserver'), (b'authorization', f'Bearer {token}'.encode())],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    sent = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # レスポンスを返し終えるまで切断しない
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    status = None
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await application(scope, receive, send)
+    disconnected.set()
+    return status
+
+
+async def run(application, path, token, requests, concurrency):
+    """requests 件を concurrency 並列で送り、所要時間とレイテンシを返す"""
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            status = await call(application, path, token)
+            if status != 200:
+                raise RuntimeError(f'{path}: HTTP {status}')
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies
+
+
+def summarize(name, path, elapsed, latencies):
+    latencies = sorted(latencies)
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        'name': name,
+        'path': path,
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(quantiles[49] * 1000, 2),
+        'p95_ms': round(quantiles[94] * 1000, 2),
+        'p99_ms': round(quantiles[98] * 1000, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--tasks', type=int, default=200, help='投入するタスク数')
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--cache', action='store_true', help='レスポンスキャッシュを有効にする')
+    parser.add_argument('--json', action='store_true', help='結果をJSONで出力する')
+    args = parser.parse_args(argv)
+
+    setup_django(args.cache)
+    from backend_app.asgi import application
+
+    old_name = create_test_db()
+    try:
+        token, task_id = seed(args.tasks)
+        cases = [
+            ('sync list', f'/api/tasks/?page_size={args.page_size}'),
+            ('async list', f'/api/async/tasks/?page_size={args.page_size}'),
+            ('sync detail', f'/api/tasks/{task_id}/'),
+            ('async detail', f'/api/async/tasks/{task_id}/'),
+        ]
+        results = []
+        for name, path in cases:
+            # 接続の確立などを計測から除くため少数を先に流す
+            asyncio.run(run(application, path, token, min(args.concurrency, 50), args.concurrency))
+            elapsed, latencies = asyncio.run(run(application, path, token, args.requests, args.concurrency))
+            results.append(summarize(name, path, elapsed, latencies))
+    finally:
+        destroy_test_db(old_name)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    print(f"{'name':<14}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for result in results:
+        print(
+            f"{result['name']:<14}{result['rps']:>10}{result['p50_ms']:>10}"
+            f"{result['p95_ms']:>10}{result['p99_ms']:>10}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""シリアライザーのマイクロベンチマーク(取得済みの行を JSON 用の値へ変換する時間のみ)"""
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from backend_app.fast_serializers import fast_serializer
+from backend_app.projection import project
+from bookmarks.models import Bookmark
+from bookmarks.serializers import BookmarkSerializer
+from schedules.models import Schedule
+from schedules.serializers import ScheduleSerializer
+from tasks.models import Task
+from tasks.serializers import TaskSerializer
+from users.serializers import UserSerializer
+
+SOURCES = {
+    'task': (Task, TaskSerializer),
+    'schedule': (Schedule, ScheduleSerializer),
+    'bookmark': (Bookmark, BookmarkSerializer),
+}
+
+
+@pytest.mark.parametrize('rows', [100, 500])
+@pytest.mark.parametrize('kind', SOURCES)
+def test_serialize_page(benchmark, db, bench_user, kind, rows):
+    """一覧1ページ分のシリアライズ"""
+    model, serializer_class = SOURCES[kind]
+    page = list(model.objects.filter(user=bench_user).order_by('-created_at', '-id')[:rows])
+    data = benchmark(lambda: serializer_class(page, many=True).data)
+    assert len(data) == len(page)
+
+
+@pytest.mark.parametrize('rows', [100, 500])
+@pytest.mark.parametrize('kind', SOURCES)
+def test_fast_serialize_page(benchmark, db, bench_user, kind, rows):
+    """test_serialize_page の高速版(取得済みの values_list() の行を変換する時間のみ)"""
+    model, serializer_class = SOURCES[kind]
+    fast = fast_serializer(serializer_class)
+    page = list(fast.queryset(model.objects.filter(user=bench_user).order_by('-created_at', '-id'))[:rows])
+    data = benchmark(lambda: fast.serialize(page))
+    assert len(data) == len(page)
+
+
+@pytest.mark.parametrize('rows', [500])
+@pytest.mark.parametrize('kind', SOURCES)
+@pytest.mark.parametrize('impl', ['drf', 'fast'])
+def test_fetch_and_serialize_page(benchmark, db, bench_user, kind, rows, impl):
+    """一覧1ページ分の取得とシリアライズ(ModelSerializer / values_list() からの高速版)"""
+    model, serializer_class = SOURCES[kind]
+    queryset = model.objects.filter(user=bench_user).order_by('-created_at', '-id')
+    if impl == 'fast':
+        fast = fast_serializer(serializer_class)
+        data = benchmark(lambda: fast.serialize(list(fast.queryset(queryset)[:rows])))
+    else:
+        queryset = project(queryset, serializer_class)
+        data = benchmark(lambda: serializer_class(list(queryset[:rows]), many=True).data)
+    assert len(data) == min(rows, queryset.count())
+
+
+@pytest.mark.parametrize('fields', [None, ('id', 'name', 'url')])
+def test_serialize_sparse_fields(benchmark, db, bench_user, fields):
+    """?fields= で絞ったブックマーク一覧のシリアライズ(全フィールドとの比較)"""
+    page = list(Bookmark.objects.filter(user=bench_user).order_by('-created_at', '-id')[:500])
+    data = benchmark(lambda: BookmarkSerializer(page, many=True, fields=fields).data)
+    benchmark.extra_info['payload_bytes'] = len(JSONRenderer().render(data))
+
+
+def test_serialize_user(benchmark, db, bench_user):
+    """ユーザー(プロフィールを含む)のシリアライズ"""
+    from django.contrib.auth.models import User
+
+    user = User.objects.select_related('profile').get(pk=bench_user.pk)
+    benchmark(lambda: UserSerializer(user).data)
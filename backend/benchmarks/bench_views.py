@@ -0,0 +1,137 @@
+"""ビューのマイクロベンチマーク(計測用アカウントに対するリクエスト1回あたり)"""
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from bookmarks.models import Bookmark
+from schedules.models import Schedule
+from tasks.models import Task
+
+
+def ok(response, status=200):
+    assert response.status_code == status, response.content[:200]
+    return response
+
+
+@pytest.mark.parametrize('page_size', [20, 100])
+def test_task_list_cold(bench_client, measure, page_size):
+    """タスク一覧(キャッシュなし)"""
+    measure(lambda: ok(bench_client.get(f'/api/tasks/?page_size={page_size}')), cold=True)
+
+
+def test_task_list_open(bench_client, measure):
+    """未完了のタスク一覧(?done=false、部分インデックス、キャッシュなし)"""
+    measure(lambda: ok(bench_client.get('/api/tasks/?done=false')), cold=True)
+
+
+def test_task_list_cached(bench_client, measure):
+    """タスク一覧(レスポンスキャッシュにヒット)"""
+    measure(lambda: ok(bench_client.get('/api/tasks/')))
+
+
+def test_task_list_not_modified(bench_client, measure):
+    """タスク一覧(If-None-Match で 304)"""
+    etag = ok(bench_client.get('/api/tasks/'))['ETag']
+    measure(lambda: ok(bench_client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag), 304))
+
+
+def test_task_list_deep_page(bench_client, measure, bench_user):
+    """タスク一覧(中ほどのページをカーソルで取得)"""
+    from backend_app.pagination import encode_cursor
+
+    rows = Task.objects.filter(user=bench_user).order_by('-created_at', '-id')
+    cursor = encode_cursor(rows[rows.count() // 2])
+    measure(lambda: ok(bench_client.get(f'/api/tasks/?cursor={cursor}')), cold=True)
+
+
+def test_task_list_async(bench_client, measure):
+    """タスク一覧の非同期版(キャッシュなし)"""
+    measure(lambda: ok(bench_client.get('/api/async/tasks/')), cold=True)
+
+
+def test_task_detail(bench_client, measure, bench_user):
+    """タスク詳細"""
+    task = Task.objects.filter(user=bench_user).first()
+    measure(lambda: ok(bench_client.get(f'/api/tasks/{task.pk}/')))
+
+
+@pytest.mark.parametrize('fields', ['', '?fields=id,name,url'])
+def test_bookmark_list_fields(bench_client, measure, fields):
+    """ブックマーク一覧(全フィールド / ?fields= で絞った場合)"""
+    measure(lambda: ok(bench_client.get(f'/api/bookmarks/{fields}')), cold=True)
+
+
+def test_schedule_list_month(bench_client, measure):
+    """スケジュール一覧(1か月の範囲)"""
+    start = timezone.localdate().replace(day=1)
+    end = start + timedelta(days=31)
+    url = f'/api/schedules/?start={start}&end={end}'
+    measure(lambda: ok(bench_client.get(url)), cold=True)
+
+
+def test_schedule_summary(bench_client, measure):
+    """カレンダー用の月間サマリー"""
+    month = timezone.localdate().strftime('%Y-%m')
+    url = f'/api/schedules/summary/?month={month}&tz=Asia/Tokyo&titles=3'
+    measure(lambda: ok(bench_client.get(url)))
+
+
+def test_bookmark_list(bench_client, measure):
+    """ブックマーク一覧(キャッシュなし)"""
+    measure(lambda: ok(bench_client.get('/api/bookmarks/')), cold=True)
+
+
+def test_bookmark_list_by_position(bench_client, measure):
+    """ブックマーク一覧(手動の並び順 ?order=position、キャッシュなし)"""
+    measure(lambda: ok(bench_client.get('/api/bookmarks/?order=position')), cold=True)
+
+
+def test_bookmark_move(bench_client, measure, bench_user):
+    """ブックマークの並べ替え(中ほどの行の直後へ移動。更新するのは1行)"""
+    rows = list(Bookmark.objects.filter(user=bench_user).order_by('position', 'id').values_list('pk', flat=True))
+    moved, anchor = rows[0], rows[len(rows) // 2]
+    measure(lambda: ok(bench_client.post(f'/api/bookmarks/{moved}/move/', {'after': anchor}, format='json')))
+
+
+def test_dashboard(bench_client, measure):
+    """ダッシュボード(キャッシュなし)"""
+    measure(lambda: ok(bench_client.get('/api/dashboard/')), cold=True)
+
+
+def test_sync_initial(bench_client, measure):
+    """差分同期の初回(各種類 SYNC_MAX_CHANGES 件まで)"""
+    measure(lambda: ok(bench_client.get('/api/sync/')), rounds=5)
+
+
+def test_sync_incremental(bench_client, measure, bench_user):
+    """差分同期(直近の変更のみ)"""
+    latest = max(
+        model.objects.filter(user=bench_user).order_by('-change_seq').values_list('change_seq', flat=True)[0]
+        for model in (Task, Schedule, Bookmark)
+    )
+    measure(lambda: ok(bench_client.get(f'/api/sync/?since={latest - 10}')))
+
+
+@pytest.mark.parametrize('q', ['会議室A', '資料 確認 提出', 'example 12'])
+def test_search(bench_client, measure, q):
+    """横断検索(語の一致件数が少ない/多い場合)"""
+    measure(lambda: ok(bench_client.get('/api/search/', {'q': q})))
+
+
+def test_current_user(bench_client, measure):
+    """ログインユーザーの取得"""
+    measure(lambda: ok(bench_client.get('/api/auth/me/')))
+
+
+def test_bookmark_create(bench_client, measure):
+    """ブックマーク作成"""
+    payload = {'name': 'Bench', 'url': 'https://example.com/', 'iconEmoji': '📌', 'color': 'red'}
+    # 作成した行はテストのトランザクションごと破棄される
+    measure(lambda: ok(bench_client.post('/api/bookmarks/', payload, format='json'), 201))
+
+
+def test_task_update(bench_client, measure, bench_user):
+    """タスク更新(If-Match の条件付き UPDATE 1回。事前に読まない)"""
+    task = Task.objects.filter(user=bench_user).order_by('-created_at').values_list('pk', flat=True)[0]
+    measure(lambda: ok(bench_client.put(f'/api/tasks/{task}/', {'done': True}, format='json', HTTP_IF_MATCH='*')))
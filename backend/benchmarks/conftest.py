@@ -0,0 +1,62 @@
+"""
+pytest-benchmark 用のフィクスチャ
+
+    pytest benchmarks/bench_*.py --benchmark-json=benchmark.json
+    pytest benchmarks/bench_*.py --benchmark-autosave    # .benchmarks/ に保存
+    pytest benchmarks/bench_*.py --benchmark-compare     # 前回の保存結果と比較
+
+bench_*.py は通常のテスト実行(test_*.py)では収集されないため、ファイルを指定して実行する。
+計測用アカウントはテスト用DBにセッションで1回だけ作成する(BENCH_SCALE で件数の倍率を指定)。
+"""
+import os
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from benchmarks.data import create_account
+
+BENCH_SCALE = float(os.getenv('BENCH_SCALE', '1'))
+
+
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture(scope='session')
+def bench_user(django_db_setup, django_db_blocker):
+    """計測用アカウント(タスク10,000件・スケジュール50,000件・ブックマーク2,000件)"""
+    with django_db_blocker.unblock():
+        return create_account('bench', BENCH_SCALE)
+
+
+@pytest.fixture
+def bench_client(db, bench_user):
+    """計測用アカウントのJWTで認証するクライアント"""
+    client = APIClient()
+    token = RefreshToken.for_user(bench_user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.fixture
+def measure(benchmark):
+    """
+    1回あたりのクエリ数を extra_info に記録してから計測する
+
+    cold=True の場合は毎回キャッシュを空にしてから呼び出す
+    """
+    def run(func, cold=False, rounds=20):
+        if cold:
+            clear_caches()
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        benchmark.extra_info['queries'] = len(queries)
+        if cold:
+            return benchmark.pedantic(func, setup=clear_caches, rounds=rounds)
+        return benchmark.pedantic(func, rounds=rounds, warmup_rounds=1)
+    return run
@@ -0,0 +1,164 @@
+"""
+計測用の大きなアカウントを作成する
+
+1ユーザー(Googleプロフィール付き)あたり タスク10,000件・スケジュール50,000件・ブックマーク2,000件(デフォルト)。
+作成日時は1件ごとに過去へずらし、スケジュールの日時は前後1年に散らす。
+乱数は固定のシードを使うため、同じ引数なら同じデータになる。
+
+    python -m benchmarks.data --username bench
+    python -m benchmarks.data --username bench --scale 0.1   # 1/10 の件数
+
+同じユーザー名が既にあり件数が揃っていれば何もしない。
+"""
+import argparse
+import os
+import random
+from datetime import timedelta
+
+TASKS = 10_000
+SCHEDULES = 50_000
+BOOKMARKS = 2_000
+BATCH_SIZE = 5_000
+
+EMOJIS = ['📌', '📚', '🛒', '💼', '🎵', '🏃', '🍳', '✈️']
+COLORS = ['red', 'blue', 'green', 'yellow', 'purple', 'gray']
+PLACES = ['会議室A', '会議室B', 'オンライン', '本社', '自宅', '渋谷', '新宿']
+WORDS = ['資料', '確認', '提出', '打ち合わせ', '買い物', '予約', '連絡', '整理', '見直し', '準備']
+
+
+def counts(scale=1.0):
+    """スケールに応じた (タスク, スケジュール, ブックマーク) の件数"""
+    return int(TASKS * scale), int(SCHEDULES * scale), int(BOOKMARKS * scale)
+
+
+def _phrase(rng, words=3):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def _spread_created_at(model, user):
+    """
+    作成日時を id の降順に1分ずつ過去へずらす
+
+    auto_now_add は bulk_create でも現在時刻になるため、作成後にまとめて更新する
+    """
+    from django.db.models import DurationField, ExpressionWrapper, F, Max, Value
+
+    rows = model.objects.filter(user=user)
+    last_id = rows.aggregate(last_id=Max('id'))['last_id']
+    if last_id is None:
+        return
+    offset = ExpressionWrapper(
+        Value(timedelta(minutes=1)) * (last_id - F('id')), output_field=DurationField()
+    )
+    rows.update(created_at=F('created_at') - offset, updated_at=F('updated_at') - offset)
+
+
+def _analyze(*models):
+    """統計情報を更新する(大量に追加した直後は autovacuum が走る前でも実行計画が正しくなるように)"""
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+
+def _bulk_create(model, objs):
+    from ranking.models import RankedModel
+
+    for start in range(0, len(objs), BATCH_SIZE):
+        batch = objs[start:start + BATCH_SIZE]
+        if issubclass(model, RankedModel):
+            model.assign_positions(batch)
+        model.assign_change_seqs(batch)
+        model.objects.bulk_create(batch)
+
+
+def create_account(username, scale=1.0, seed=0):
+    """計測用ユーザーを作成(既にあれば件数を確認して再利用)し、User を返す"""
+    from django.contrib.auth.models import User
+    from django.db import transaction
+    from django.utils import timezone
+    from bookmarks.models import Bookmark
+    from schedules.models import Schedule
+    from tasks.models import Task
+    from users.models import UserProfile
+
+    n_tasks, n_schedules, n_bookmarks = counts(scale)
+    user = User.objects.filter(username=username).first()
+    if user is not None:
+        existing = (
+            Task.objects.filter(user=user).count(),
+            Schedule.objects.filter(user=user).count(),
+            Bookmark.objects.filter(user=user).count(),
+        )
+        if existing == (n_tasks, n_schedules, n_bookmarks):
+            return user
+        user.delete()
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    with transaction.atomic():
+        user = User.objects.create_user(
+            username=username, email=f'{username}@example.com', password=username
+        )
+        UserProfile.objects.create(
+            user=user,
+            google_user_id=f'bench-{username}',
+            picture_url='https://example.com/picture.png',
+        )
+        _bulk_create(Task, [
+            Task(
+                user=user,
+                title=_phrase(rng),
+                detail=_phrase(rng, 12) if rng.random() < 0.7 else None,
+                done=rng.random() < 0.6,
+            )
+            for _ in range(n_tasks)
+        ])
+        _bulk_create(Schedule, [
+            Schedule(
+                user=user,
+                title=_phrase(rng),
+                memo=_phrase(rng, 6) if rng.random() < 0.5 else None,
+                location=rng.choice(PLACES),
+                date=now + timedelta(minutes=rng.randint(-365 * 24 * 60, 365 * 24 * 60)),
+            )
+            for _ in range(n_schedules)
+        ])
+        _bulk_create(Bookmark, [
+            Bookmark(
+                user=user,
+                name=_phrase(rng, 2),
+                url=f'https://example.com/{i}/{rng.randint(0, 10**6)}',
+                iconEmoji=rng.choice(EMOJIS),
+                color=rng.choice(COLORS),
+            )
+            for i in range(n_bookmarks)
+        ])
+        for model in (Task, Schedule, Bookmark):
+            _spread_created_at(model, user)
+    _analyze(Task, Schedule, Bookmark)
+    return user
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--username', default='bench')
+    parser.add_argument('--scale', type=float, default=1.0, help='件数の倍率')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_app.settings')
+    import django
+    django.setup()
+
+    user = create_account(args.username, args.scale, args.seed)
+    n_tasks, n_schedules, n_bookmarks = counts(args.scale)
+    print(
+        f'{user.username} (id={user.pk}): '
+        f'{n_tasks} tasks, {n_schedules} schedules, {n_bookmarks} bookmarks'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+DB接続方式(DB_CONN_MODE)ごとの負荷試験
+
+none / persistent / pool のそれぞれで同じ負荷をかけ、
+requests/sec・レイテンシと、計測中に新しく張ったDB接続の数を比べる。
+設定は起動時に決まるため、方式ごとに子プロセスで実行する。
+
+    python -m benchmarks.db_connections --server wsgi --requests 2000 --concurrency 20
+    python -m benchmarks.db_connections --server asgi --modes none pool
+
+--server wsgi はスレッドプールから WSGI アプリケーションを直接呼び出す(スレッドは使い回される)。
+ASGIではリクエストごとに別スレッドで同期コードが動くため persistent では接続が使い回されず、
+リクエストの数だけ接続が残る。ASGIでは pool を使う。
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.async_views import create_test_db, destroy_test_db, run, seed, setup_django, summarize
+
+MODES = ('none', 'persistent', 'pool')
+
+
+def call_wsgi(application, path, token):
+    """WSGIアプリケーションへGETを1回送り、ステータスを返す"""
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'testserver',
+        'HTTP_AUTHORIZATION': f'Bearer {token}',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    status = []
+    body = application(environ, lambda value, headers: status.append(value))
+    try:
+        b''.join(body)
+    finally:
+        # request_finished(古い接続の整理)はここで送られる
+        body.close()
+    return int(status[0].split()[0])
+
+
+def run_wsgi(application, path, token, requests, concurrency):
+    """requests 件を concurrency スレッドで送り、所要時間とレイテンシを返す"""
+    def request(_):
+        started = time.perf_counter()
+        status = call_wsgi(application, path, token)
+        if status != 200:
+            raise RuntimeError(f'{path}: HTTP {status}')
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        latencies = list(executor.map(request, range(requests)))
+    return time.perf_counter() - started, latencies
+
+
+def measure(args):
+    """現在のプロセスの DB_CONN_MODE で計測する(子プロセス側)"""
+    setup_django(use_cache=False)
+    from django.db.backends.signals import connection_created
+    from backend_app import db_pool
+
+    if args.server == 'wsgi':
+        from backend_app.wsgi import application
+        driver = run_wsgi
+    else:
+        from backend_app.asgi import application
+
+        def driver(*driver_args):
+            return asyncio.run(run(*driver_args))
+
+    old_name = create_test_db()
+    try:
+        token, _ = seed(args.tasks)
+        path = f'/api/tasks/?page_size={args.page_size}'
+        # 計測前に各スレッド・プールの接続を用意しておく
+        driver(application, path, token, args.concurrency * 2, args.concurrency)
+
+        # プールを使わない場合は接続のたびに connection_created が送られる
+        opened = []
+        connection_created.connect(lambda **kwargs: opened.append(1), weak=False)
+        before = db_pool.stats()
+        elapsed, latencies = driver(application, path, token, args.requests, args.concurrency)
+        after = db_pool.stats()
+    finally:
+        destroy_test_db(old_name)
+
+    result = summarize(f"{args.server} {os.environ['DB_CONN_MODE']}", path, elapsed, latencies)
+    if 'connections_opened' in after:
+        result['connections_opened'] = after['connections_opened'] - before['connections_opened']
+        result['pool_wait_ms_avg'] = after['wait_ms_avg']
+    else:
+        result['connections_opened'] = len(opened)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--server', choices=('wsgi', 'asgi'), default='wsgi')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--tasks', type=int, default=200, help='投入するタスク数')
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--json', action='store_true', help='結果をJSONで出力する')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        json.dump(measure(args), sys.stdout)
+        return
+
+    forwarded = [
+        '--server', args.server,
+        '--requests', str(args.requests),
+        '--concurrency', str(args.concurrency),
+        '--tasks', str(args.tasks),
+        '--page-size', str(args.page_size),
+    ]
+    results = []
+    for mode in args.modes:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.db_connections', '--worker', *forwarded],
+            env={**os.environ, 'DB_CONN_MODE': mode},
+            check=True,
+            stdout=subprocess.PIPE,
+            text=True,
+        ).stdout
+        results.append(json.loads(output))
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    print(f"{'mode':<18}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'connects':>10}")
+    for result in results:
+        print(
+            f"{result['name']:<18}{result['rps']:>10}{result['p50_ms']:>10}"
+            f"{result['p95_ms']:>10}{result['p99_ms']:>10}{result['connections_opened']:>10}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""
+HTTP負荷ドライバー
+
+起動中のサーバーへエンドポイントごとに --requests 件を --concurrency 並列で送り、
+requests/sec・p50/p95/p99・1リクエストあたりのクエリ数を出力する。
+クエリ数とDB時間はサーバーの Server-Timing ヘッダーから読むため、SERVER_TIMING=True で起動する。
+
+    python -m benchmarks.data --username bench
+    SERVER_TIMING=True python manage.py runserver --noreload 0.0.0.0:8000  # 別ターミナル
+    python -m benchmarks.load --url http://localhost:8000 --username bench --json load.json
+
+--json の出力にはコミットのハッシュを含めるため、コミット間で結果を比較できる。
+レスポンスキャッシュを通さずに計測する場合は、サーバーを
+CACHE_BACKEND=django.core.cache.backends.dummy.DummyCache で起動する。
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+
+
+def default_endpoints():
+    month = datetime.now().strftime('%Y-%m')
+    return [
+        '/api/tasks/',
+        '/api/tasks/?page_size=500',
+        '/api/tasks/?done=false',
+        f'/api/schedules/?start={month}-01&end={month}-28',
+        f'/api/schedules/summary/?month={month}&tz=Asia/Tokyo',
+        '/api/bookmarks/',
+        '/api/dashboard/',
+        '/api/sync/',
+        '/api/auth/me/',
+    ]
+
+
+_TIMING = re.compile(r'(\w+);dur=([\d.]+)(?:;desc="(\d+) queries")?')
+
+
+def access_token(username):
+    """ローカルの設定・DBで計測用ユーザーのアクセストークンを発行する"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_app.settings')
+    import django
+    django.setup()
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    return str(RefreshToken.for_user(User.objects.get(username=username)).access_token)
+
+
+def parse_server_timing(value):
+    """Server-Timing ヘッダーから (DB時間ms, クエリ数) を取り出す"""
+    db_ms = queries = None
+    for name, duration, count in _TIMING.findall(value or ''):
+        if name == 'db':
+            db_ms = float(duration)
+            queries = int(count) if count else None
+    return db_ms, queries
+
+
+def _percentile(values, percent):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100)[percent - 1]
+
+
+def run_endpoint(url, token, requests_count, concurrency, timeout):
+    """1つのURLに負荷をかけ、集計結果を返す"""
+    local = threading.local()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def request(_):
+        # スレッドごとにセッション(Keep-Alive の接続)を使い回す
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        try:
+            response = session.get(url, headers=headers, timeout=timeout)
+        except requests.RequestException:
+            return None
+        elapsed = time.perf_counter() - started
+        db_ms, queries = parse_server_timing(response.headers.get('Server-Timing'))
+        return response.status_code, elapsed, db_ms, queries
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(request, range(requests_count)))
+    wall = time.perf_counter() - started
+
+    succeeded = [result for result in results if result is not None and result[0] < 400]
+    latencies = sorted(result[1] * 1000 for result in succeeded)
+    queries = [result[3] for result in succeeded if result[3] is not None]
+    db_times = [result[2] for result in succeeded if result[2] is not None]
+    summary = {
+        'url': url,
+        'requests': requests_count,
+        'errors': requests_count - len(succeeded),
+        'rps': round(len(succeeded) / wall, 1),
+        'queries_per_request': round(statistics.mean(queries), 2) if queries else None,
+        'db_ms_mean': round(statistics.mean(db_times), 2) if db_times else None,
+    }
+    if latencies:
+        summary.update({
+            'p50_ms': round(_percentile(latencies, 50), 2),
+            'p95_ms': round(_percentile(latencies, 95), 2),
+            'p99_ms': round(_percentile(latencies, 99), 2),
+        })
+    return summary
+
+
+def commit_id():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--token', help='アクセストークン(省略時は --username のトークンを発行)')
+    parser.add_argument('--username', default='bench')
+    parser.add_argument('--requests', type=int, default=500, help='エンドポイントごとのリクエスト数')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--endpoint', action='append', dest='endpoints', help='計測するパス(複数指定可)')
+    parser.add_argument('--json', metavar='PATH', help='結果をJSONで保存する')
+    args = parser.parse_args(argv)
+
+    token = args.token or access_token(args.username)
+    results = []
+    for path in args.endpoints or default_endpoints():
+        url = args.url.rstrip('/') + path
+        # 接続の確立やキャッシュの作成を計測から除く
+        run_endpoint(url, token, args.concurrency, args.concurrency, args.timeout)
+        results.append(run_endpoint(url, token, args.requests, args.concurrency, args.timeout))
+
+    print(f"{'path':<56}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'errors':>8}")
+    for result in results:
+        path = result['url'][len(args.url.rstrip('/')):]
+        print(
+            f"{path:<56}{result['rps']:>9}{result.get('p50_ms', '-'):>10}{result.get('p95_ms', '-'):>10}"
+            f"{result.get('p99_ms', '-'):>10}{str(result['queries_per_request']):>9}{result['errors']:>8}"
+        )
+
+    if args.json:
+        report = {
+            'commit': commit_id(),
+            'datetime': datetime.now(timezone.utc).isoformat(),
+            'concurrency': args.concurrency,
+            'results': results,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Wrote {args.json}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
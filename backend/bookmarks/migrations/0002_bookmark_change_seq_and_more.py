@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookmarks', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookmark',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='変更番号'),
+        ),
+        migrations.AddIndex(
+            model_name='bookmark',
+            index=models.Index(fields=['user', 'change_seq'], name='bookmarks_user_id_2720a1_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.db import migrations, models
+
+from ranking.ranks import spread
+
+
+def fill_positions(apps, schema_editor):
+    """既存のブックマークに、これまでの一覧と同じ並び(新しい順)の順位を振る"""
+    Bookmark = apps.get_model('bookmarks', 'Bookmark')
+    user_ids = list(Bookmark.objects.order_by().values_list('user_id', flat=True).distinct())
+    for user_id in user_ids:
+        rows = list(Bookmark.objects.filter(user_id=user_id).order_by('-created_at', '-id').only('id'))
+        for row, position in zip(rows, spread(len(rows))):
+            row.position = position
+        Bookmark.objects.bulk_update(rows, ['position'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookmarks', '0003_bookmark_search_vector_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookmark',
+            name='position',
+            field=models.CharField(blank=True, db_collation='C', editable=False, max_length=255, verbose_name='並び順'),
+        ),
+        migrations.RunPython(fill_positions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # 既存の大きなテーブルへの書き込みを止めないよう CREATE INDEX CONCURRENTLY で作る
+    atomic = False
+
+    dependencies = [
+        ('bookmarks', '0004_bookmark_position'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='bookmark',
+            index=models.Index(fields=['user', 'position', 'id'], name='bookmarks_user_id_051c6f_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookmarks', '0005_bookmark_position_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookmark',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='バージョン'),
+        ),
+    ]
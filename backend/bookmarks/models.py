@@ -1,7 +1,12 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models import F, Func, Value
 from django.contrib.auth.models import User
+from ranking.models import RankedModel
+from sync.models import ChangeTrackedModel
 
-class Bookmark(models.Model):
+class Bookmark(RankedModel, ChangeTrackedModel):
     """ブックマークモデル"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bookmark', verbose_name='ユーザー')
     name = models.CharField(max_length=255, verbose_name='名前')
@@ -10,6 +15,21 @@ class Bookmark(models.Model):
     color = models.CharField(max_length=255, verbose_name='色')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='作成日時')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新日時')
+    # 全文検索用(/api/search/)。name を重み A、url を B としてDBが生成する
+    # URLはそのままでは1語になるため、英数字以外で区切って語にする
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('name', weight='A', config='simple')
+            + SearchVector(
+                Func(F('url'), Value('[^[:alnum:]]+'), Value(' '), Value('g'), function='REGEXP_REPLACE'),
+                weight='B',
+                config='simple',
+            )
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name='検索用ベクトル',
+    )
 
     class Meta:
         db_table = 'bookmarks'
@@ -18,6 +38,12 @@ class Bookmark(models.Model):
         verbose_name_plural = 'ブックマーク'
         indexes = [
             models.Index(fields=['user', '-created_at']),
+            # 手動の並び順(?order=position)用
+            models.Index(fields=['user', 'position', 'id']),
+            # 差分同期用
+            models.Index(fields=['user', 'change_seq']),
+            # 全文検索用
+            GinIndex(fields=['search_vector']),
         ]
 
     def __str__(self):
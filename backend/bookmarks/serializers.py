@@ -1,17 +1,23 @@
 from rest_framework import serializers
+from backend_app.batch import BulkListSerializer
+from backend_app.metrics import SerializerTimingMixin
+from backend_app.sparse_fields import SparseFieldsMixin
 from .models import Bookmark
 
-class BookmarkSerializer(serializers.ModelSerializer):
+class BookmarkSerializer(SparseFieldsMixin, SerializerTimingMixin, serializers.ModelSerializer):
     """BookmarkモデルをJSON形式に変換する"""
 
     class Meta:
         model = Bookmark
 
         # JSONに含めるフィールド
-        fields = ['id', 'name', 'url', 'iconEmoji', 'color', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'url', 'iconEmoji', 'color', 'created_at', 'updated_at', 'version', 'position']
 
-        # 読み取り専用フィールド
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        # 読み取り専用フィールド。position は move/ で変更する
+        read_only_fields = ['id', 'created_at', 'updated_at', 'version', 'position']
+
+        # many=True で一括作成・更新する
+        list_serializer_class = BulkListSerializer
 
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
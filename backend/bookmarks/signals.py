@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from backend_app import response_cache
+from backend_app.conditional import mark_deleted
+from sync.events import publish_change
+from sync.models import record_deletion
+from .models import Bookmark
+
+@receiver(post_save, sender=Bookmark)
+def bookmark_saved(sender, instance, **kwargs):
+    """ブックマークの保存で一覧キャッシュを無効化し、変更を配信"""
+    response_cache.invalidate(sender, instance.user_id)
+    publish_change(instance, 'saved', instance.change_seq)
+
+@receiver(post_delete, sender=Bookmark)
+def bookmark_deleted(sender, instance, origin=None, **kwargs):
+    """ブックマークの削除を削除ログ・一覧のバージョン・キャッシュに反映し、変更を配信"""
+    seq = record_deletion(instance, origin)
+    if seq is not None:
+        publish_change(instance, 'deleted', seq)
+    mark_deleted(sender, instance.user_id)
+    response_cache.invalidate(sender, instance.user_id)
@@ -0,0 +1,87 @@
+import pytest
+from backend_app import response_cache
+
+@pytest.mark.django_db
+def test_bookmark_list_cache_hit(authenticated_client, django_assert_num_queries):
+    """2回目の一覧取得はDBに問い合わせない"""
+    api_client = authenticated_client
+    api_client.post('/api/bookmarks/', {
+        'name': 'Google',
+        'url': 'https://google.com',
+        'iconEmoji': 'icon',
+        'color': '#FF0000'
+    }, format='json')
+
+    before = response_cache.stats()
+    res = api_client.get('/api/bookmarks/')
+    assert res['X-Cache'] == 'MISS'
+
+    with django_assert_num_queries(0):
+        res = api_client.get('/api/bookmarks/')
+    assert res['X-Cache'] == 'HIT'
+    assert len(res.data) == 1
+
+    after = response_cache.stats()
+    assert after['hits'] == before['hits'] + 1
+    assert after['misses'] == before['misses'] + 1
+
+@pytest.mark.django_db
+def test_bookmark_list_cache_invalidation(authenticated_client):
+    """更新・削除でキャッシュが無効化される"""
+    api_client = authenticated_client
+    res = api_client.post('/api/bookmarks/', {
+        'name': 'Google',
+        'url': 'https://google.com',
+        'iconEmoji': 'icon',
+        'color': '#FF0000'
+    }, format='json')
+    bookmark_id = res.data['id']
+    api_client.get('/api/bookmarks/')
+
+    api_client.put(f'/api/bookmarks/{bookmark_id}/', {'name': 'Updated'}, format='json')
+    res = api_client.get('/api/bookmarks/')
+    assert res['X-Cache'] == 'MISS'
+    assert res.data[0]['name'] == 'Updated'
+
+    api_client.delete(f'/api/bookmarks/{bookmark_id}/')
+    res = api_client.get('/api/bookmarks/')
+    assert res['X-Cache'] == 'MISS'
+    assert res.data == []
+
+def create_bookmark(api_client):
+    res = api_client.post('/api/bookmarks/', {
+        'name': 'Google',
+        'url': 'https://google.com',
+        'iconEmoji': 'icon',
+        'color': '#FF0000'
+    }, format='json')
+    return res.data['id']
+
+@pytest.mark.django_db
+def test_cache_invalidation_reaches_other_workers(authenticated_client, settings, tmp_path):
+    """共有キャッシュなら、あるワーカーでの更新が別のワーカーのキャッシュも無効化する"""
+    shared = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': str(tmp_path)}
+    settings.CACHES = {**settings.CACHES, 'worker_a': shared, 'worker_b': shared}
+    settings.RESPONSE_CACHE_ENABLED = None
+    api_client = authenticated_client
+    bookmark_id = create_bookmark(api_client)
+
+    settings.RESPONSE_CACHE_ALIAS = 'worker_a'
+    api_client.get('/api/bookmarks/')
+    assert api_client.get('/api/bookmarks/')['X-Cache'] == 'HIT'
+
+    settings.RESPONSE_CACHE_ALIAS = 'worker_b'
+    api_client.put(f'/api/bookmarks/{bookmark_id}/', {'name': 'Updated'}, format='json')
+
+    settings.RESPONSE_CACHE_ALIAS = 'worker_a'
+    res = api_client.get('/api/bookmarks/')
+    assert res['X-Cache'] == 'MISS'
+    assert res.data[0]['name'] == 'Updated'
+
+@pytest.mark.django_db
+def test_process_local_cache_is_opt_in(authenticated_client, settings):
+    """LocMemCache では無効化が他のワーカーに届かないため、既定ではキャッシュしない"""
+    settings.RESPONSE_CACHE_ENABLED = None
+    create_bookmark(authenticated_client)
+    authenticated_client.get('/api/bookmarks/')
+    assert authenticated_client.get('/api/bookmarks/')['X-Cache'] == 'MISS'
@@ -0,0 +1,30 @@
+import pytest
+from bookmarks.models import Bookmark
+
+@pytest.mark.django_db
+def test_bookmark_list_cursor_pagination(authenticated_client, test_user, settings):
+    """既定の件数で区切られた一覧も、カーソルで全ページを重複・欠落なく辿れる"""
+    settings.LIST_PAGE_SIZE = 2
+    for i in range(5):
+        Bookmark.objects.create(user=test_user, name=f'Bookmark {i}', url=f'https://example.com/{i}', iconEmoji='📌', color='red')
+
+    seen = []
+    url = '/api/bookmarks/'
+    while True:
+        res = authenticated_client.get(url)
+        assert res.status_code == 200
+        assert len(res.data) <= 2
+        seen += [bookmark['id'] for bookmark in res.data]
+        cursor = res.get('X-Next-Cursor')
+        if not cursor:
+            break
+        url = f'/api/bookmarks/?cursor={cursor}'
+
+    assert seen == list(Bookmark.objects.filter(user=test_user).order_by('-created_at', '-id').values_list('id', flat=True))
+
+@pytest.mark.django_db
+def test_bookmark_list_invalid_cursor(authenticated_client):
+    """不正なカーソル"""
+    res = authenticated_client.get('/api/bookmarks/?cursor=invalid')
+    assert res.status_code == 400
+    assert 'cursor' in res.data
@@ -0,0 +1,43 @@
+import pytest
+from bookmarks.models import Bookmark
+
+def add_bookmarks(user, count=5):
+    for i in range(count):
+        Bookmark.objects.create(user=user, name=f'Bookmark {i}', url=f'https://example.com/{i}', iconEmoji='📌', color='red')
+
+@pytest.mark.django_db
+def test_bookmark_read_query_budget(jwt_client, test_user, query_budget):
+    """一覧・詳細のクエリ数は件数によらない"""
+    add_bookmarks(test_user)
+    bookmark = Bookmark.objects.first()
+    query_budget(3, lambda: jwt_client.get('/api/bookmarks/'), grow=lambda: add_bookmarks(test_user))
+    query_budget(2, lambda: jwt_client.get(f'/api/bookmarks/{bookmark.pk}/'))
+
+@pytest.mark.django_db
+def test_bookmark_write_query_budget(jwt_client, test_user, query_budget):
+    """作成・更新・削除のクエリ数"""
+    add_bookmarks(test_user, 1)
+    bookmark = Bookmark.objects.first()
+    payload = {'name': 'New', 'url': 'https://example.com/new', 'iconEmoji': '📚', 'color': 'blue'}
+    # 作成は先頭の順位の取得(ranking)を含む
+    query_budget(6, lambda: jwt_client.post('/api/bookmarks/', payload, format='json'))
+    # 更新は事前に読まず UPDATE ... RETURNING 1回(versioning.py)
+    query_budget(5, lambda: jwt_client.put(f'/api/bookmarks/{bookmark.pk}/', {'color': 'green'}, format='json'))
+    query_budget(5, lambda: jwt_client.delete(f'/api/bookmarks/{bookmark.pk}/'))
+
+@pytest.mark.django_db
+def test_bookmark_batch_query_budget(jwt_client, test_user, query_budget):
+    """一括操作のクエリ数は操作の件数によらない"""
+    payload = {}
+
+    def prepare(n):
+        add_bookmarks(test_user, n * 2)
+        ids = list(Bookmark.objects.filter(user=test_user).order_by('-id').values_list('id', flat=True))
+        payload.update({
+            'create': [{'name': f'New {i}', 'url': f'https://example.com/new/{i}', 'iconEmoji': '📚', 'color': 'blue'} for i in range(n)],
+            'update': [{'id': pk, 'color': 'green'} for pk in ids[:n]],
+            'delete': ids[n:n * 2],
+        })
+
+    prepare(2)
+    query_budget(14, lambda: jwt_client.post('/api/bookmarks/batch/', payload, format='json'), grow=lambda: prepare(6))
@@ -0,0 +1,56 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from bookmarks.models import Bookmark
+
+@pytest.fixture
+def bookmark(test_user):
+    return Bookmark.objects.create(user=test_user, name='Google', url='https://google.com', iconEmoji='icon', color='#FF0000')
+
+def bookmark_select(queries):
+    return next(q['sql'] for q in queries if q['sql'].startswith('SELECT "bookmarks"."id"'))
+
+@pytest.mark.django_db
+def test_bookmark_list_fields(authenticated_client, bookmark):
+    """?fields= で出力と SELECT するカラムを絞る"""
+    with CaptureQueriesContext(connection) as queries:
+        res = authenticated_client.get('/api/bookmarks/?fields=url,id,name')
+    assert res.status_code == 200
+    assert res.data == [{'id': bookmark.id, 'name': 'Google', 'url': 'https://google.com'}]
+
+    # カーソルに使う created_at 以外は指定したフィールドだけを読む
+    sql = bookmark_select(queries).split(' FROM ')[0]
+    assert '"color"' not in sql and '"updated_at"' not in sql
+
+    # 全フィールドの表現とは別のETag・キャッシュになる
+    full = authenticated_client.get('/api/bookmarks/')
+    assert full.data[0]['color'] == '#FF0000'
+    assert full['ETag'] != res['ETag']
+    res = authenticated_client.get('/api/bookmarks/?fields=id,name,url', HTTP_IF_NONE_MATCH=full['ETag'])
+    assert res.status_code == 200
+
+@pytest.mark.django_db
+def test_bookmark_detail_fields(authenticated_client, bookmark):
+    """詳細でも ?fields= を使える"""
+    res = authenticated_client.get(f'/api/bookmarks/{bookmark.id}/?fields=name')
+    assert res.status_code == 200
+    assert res.data == {'name': 'Google'}
+
+    res = authenticated_client.get(f'/api/bookmarks/{bookmark.id}/?fields=name', HTTP_IF_NONE_MATCH=res['ETag'])
+    assert res.status_code == 304
+
+@pytest.mark.django_db
+def test_bookmark_async_fields(jwt_client, bookmark):
+    """非同期版の一覧・詳細も同じく絞る"""
+    res = jwt_client.get('/api/async/bookmarks/?fields=id,url')
+    assert res.json() == [{'id': bookmark.id, 'url': 'https://google.com'}]
+    res = jwt_client.get(f'/api/async/bookmarks/{bookmark.id}/?fields=color')
+    assert res.json() == {'color': '#FF0000'}
+    assert jwt_client.get('/api/async/bookmarks/?fields=nope').status_code == 400
+
+@pytest.mark.django_db
+def test_bookmark_unknown_field(authenticated_client, bookmark):
+    """存在しないフィールドは400"""
+    res = authenticated_client.get('/api/bookmarks/?fields=id,user,password')
+    assert res.status_code == 400
+    assert 'password' in str(res.data['fields'])
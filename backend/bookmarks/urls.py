@@ -5,5 +5,7 @@ app_name = 'bookmarks'
 
 urlpatterns = [
     path('', views.bookmark_list, name='bookmark_list'),
+    path('batch/', views.bookmark_batch, name='bookmark_batch'),
     path('<int:pk>/', views.bookmark_detail, name='bookmark_detail'),
+    path('<int:pk>/move/', views.bookmark_move, name='bookmark_move'),
 ]
\ No newline at end of file
@@ -2,6 +2,13 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from backend_app.batch import batch_response
+from backend_app.conditional import object_validators
+from backend_app.listing import list_response
+from backend_app.projection import project
+from backend_app.sparse_fields import fields_validators, requested_fields
+from backend_app.versioning import update_response
+from ranking.moves import move_response
 from .models import Bookmark
 from .serializers import BookmarkSerializer
 
@@ -11,8 +18,7 @@ def bookmark_list(request):
     """ブックマーク一覧取得・作成"""
     if request.method == 'GET':
         bookmarks = Bookmark.objects.filter(user=request.user)
-        serializer = BookmarkSerializer(bookmarks, many=True)
-        return Response(serializer.data)
+        return list_response(request, bookmarks, BookmarkSerializer)
     
     elif request.method == 'POST':
         serializer = BookmarkSerializer(data=request.data, context={'request': request})
@@ -21,25 +27,46 @@ def bookmark_list(request):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bookmark_batch(request):
+    """ブックマーク一括作成・更新・削除"""
+    bookmarks = Bookmark.objects.filter(user=request.user)
+    return batch_response(request, bookmarks, BookmarkSerializer)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bookmark_move(request, pk):
+    """ブックマークの並べ替え(移動した1行だけ更新する)"""
+    bookmarks = Bookmark.objects.filter(user=request.user)
+    return move_response(request, bookmarks, BookmarkSerializer, pk)
+
 @api_view(['GET', 'PUT', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def bookmark_detail(request, pk):
     """ブックマーク詳細取得・更新・削除"""
+    bookmarks = Bookmark.objects.filter(user=request.user)
+    if request.method == 'PUT':
+        # 事前に読まず、If-Match のバージョンを条件にした UPDATE 1回で更新する
+        return update_response(request, bookmarks, BookmarkSerializer, pk)
+
+    fields = None
+    if request.method == 'GET':
+        # 取得のみの場合はシリアライズするカラム(とETagに使うバージョン・更新日時)だけを読む
+        fields = requested_fields(request, BookmarkSerializer)
+        bookmarks = project(bookmarks, BookmarkSerializer, ('updated_at', 'version'), fields)
     try:
-        bookmark = Bookmark.objects.get(pk=pk, user=request.user)
+        bookmark = bookmarks.get(pk=pk)
     except Bookmark.DoesNotExist:
         return Response(status=status.HTTP_404_NOT_FOUND)
     
     if request.method == 'GET':
-        serializer = BookmarkSerializer(bookmark)
-        return Response(serializer.data)
-    
-    elif request.method == 'PUT':
-        serializer = BookmarkSerializer(bookmark, data=request.data, partial=True)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        validators = fields_validators(object_validators(bookmark), fields)
+        response = validators.not_modified(request)
+        if response is None:
+            serializer = BookmarkSerializer(bookmark, fields=fields)
+            response = Response(serializer.data)
+        return validators.apply(response)
     
     elif request.method == 'DELETE':
         bookmark.delete()
@@ -1,6 +1,21 @@
 import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """テスト間でキャッシュを共有しない"""
+    for cache in caches.all():
+        cache.clear()
+
+@pytest.fixture(autouse=True)
+def response_cache_enabled(settings):
+    """テストは1プロセスなので、LocMemCache でも一覧のレスポンスキャッシュを使う"""
+    settings.RESPONSE_CACHE_ENABLED = True
 
 @pytest.fixture
 def api_client():
@@ -21,4 +36,40 @@ def authenticated_client(test_user):
     """認証済みのAPIクライアント"""
     client = APIClient()
     client.force_authenticate(user=test_user)
-    return client
\ No newline at end of file
+    return client
+
+@pytest.fixture
+def jwt_client(test_user):
+    """JWTで認証するAPIクライアント(認証処理も実際のリクエストと同じく通る)"""
+    client = APIClient()
+    access = RefreshToken.for_user(test_user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+    return client
+
+@pytest.fixture
+def query_budget():
+    """
+    エンドポイントのクエリ数の上限を固定する
+
+    query_budget(max_queries, request, grow=None)
+
+    キャッシュを空にして request() を実行し、クエリ数が max_queries 以下であることを確認する。
+    grow を渡した場合は、grow() で行を増やしてからもう一度実行し、
+    クエリ数が件数によらず変わらないこと(行ごとのクエリが無いこと)も確認する。
+    """
+    def check(max_queries, request, grow=None):
+        counts = []
+        for step in range(2 if grow else 1):
+            if step:
+                grow()
+            for cache in caches.all():
+                cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = request()
+            assert response.status_code < 400, response.content
+            sql = '\n'.join(query['sql'] for query in queries)
+            assert len(queries) <= max_queries, f'{len(queries)} queries (budget {max_queries}):\n{sql}'
+            counts.append(len(queries))
+        assert len(set(counts)) == 1, f'Query count grew with the collection: {counts}\n{sql}'
+        return counts[-1]
+    return check
@@ -0,0 +1,66 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from schedules.models import Schedule
+from tasks.models import Task
+
+@pytest.mark.django_db
+def test_dashboard(authenticated_client, test_user):
+    """ホーム画面のデータをまとめて取得"""
+    Task.objects.create(user=test_user, title='Open')
+    Task.objects.create(user=test_user, title='Done', done=True)
+    Schedule.objects.create(user=test_user, title='Today', location='Tokyo', date=timezone.now())
+    Schedule.objects.create(
+        user=test_user, title='Next week', location='Tokyo',
+        date=timezone.now() + timedelta(days=7)
+    )
+
+    res = authenticated_client.get('/api/dashboard/')
+    assert res.status_code == 200
+    assert [task['title'] for task in res.data['tasks']] == ['Open']
+    assert [schedule['title'] for schedule in res.data['schedules']] == ['Today']
+    assert res.data['bookmarks'] == []
+    assert res.data['profile']['email'] == 'test@example.com'
+    assert set(res.data['etags']) == {'tasks', 'schedules', 'bookmarks', 'profile'}
+
+@pytest.mark.django_db
+def test_dashboard_section_etags(authenticated_client, test_user):
+    """変更の無いセクションは省略される"""
+    api_client = authenticated_client
+    etags = api_client.get('/api/dashboard/').data['etags']
+    if_none_match = ', '.join(etags.values())
+
+    res = api_client.get('/api/dashboard/', HTTP_IF_NONE_MATCH=if_none_match)
+    assert res.status_code == 304
+
+    Task.objects.create(user=test_user, title='New')
+    res = api_client.get('/api/dashboard/', HTTP_IF_NONE_MATCH=if_none_match)
+    assert res.status_code == 200
+    assert [task['title'] for task in res.data['tasks']] == ['New']
+    assert 'schedules' not in res.data
+    assert 'bookmarks' not in res.data
+    assert 'profile' not in res.data
+
+@pytest.mark.django_db
+def test_dashboard_schedules_etag_changes_with_date(authenticated_client, monkeypatch):
+    """今日の予定が前日と同じ(どちらも空など)でも、日付が変われば送り直す"""
+    etags = authenticated_client.get('/api/dashboard/').data['etags']
+    tomorrow = timezone.localdate() + timedelta(days=1)
+    monkeypatch.setattr('django.utils.timezone.localdate', lambda *args, **kwargs: tomorrow)
+
+    res = authenticated_client.get('/api/dashboard/', HTTP_IF_NONE_MATCH=', '.join(etags.values()))
+    assert res.status_code == 200
+    assert res.data['schedules'] == []
+    assert res.data['etags']['schedules'] != etags['schedules']
+    assert set(res.data) == {'etags', 'truncated', 'schedules'}
+
+@pytest.mark.django_db
+def test_dashboard_sections_are_capped(authenticated_client, test_user, settings):
+    """各セクションは LIST_PAGE_SIZE 件までで、切った場合は truncated が true"""
+    settings.LIST_PAGE_SIZE = 2
+    for i in range(3):
+        Task.objects.create(user=test_user, title=f'Task {i}')
+
+    res = authenticated_client.get('/api/dashboard/')
+    assert [task['title'] for task in res.data['tasks']] == ['Task 2', 'Task 1']
+    assert res.data['truncated'] == {'tasks': True, 'schedules': False, 'bookmarks': False}
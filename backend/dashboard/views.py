@@ -0,0 +1,82 @@
+import json
+from datetime import datetime, time, timedelta
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from django.conf import settings
+from django.utils import timezone
+from django.utils.http import parse_etags
+
+from backend_app.conditional import collection_validators, make_etag
+from backend_app.projection import load_related, project
+from bookmarks.models import Bookmark
+from bookmarks.serializers import BookmarkSerializer
+from schedules.models import Schedule
+from schedules.serializers import ScheduleSerializer
+from tasks.models import Task
+from tasks.serializers import TaskSerializer
+from users.serializers import UserSerializer
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard(request):
+    """
+    ホーム画面用の集約エンドポイント
+
+    GET /api/dashboard/
+
+    未完了のタスク・今日の予定・ブックマーク・プロフィールをまとめて返す。
+    前回の etags の値を If-None-Match に並べて送ると、変更の無いセクションは省略される。
+    各セクションは LIST_PAGE_SIZE 件まで。超えたセクションは truncated が true になるので、
+    続きは各一覧API(/api/tasks/?done=false など)で取得する。
+    """
+    client_etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+
+    today = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+    # (クエリセット, シリアライザー, 集計の対象を決める値)
+    sections = {
+        'tasks': (
+            Task.objects.filter(user=request.user, done=False),
+            TaskSerializer,
+            (),
+        ),
+        'schedules': (
+            Schedule.objects
+            .filter(user=request.user, date__gte=today, date__lt=today + timedelta(days=1))
+            .order_by('date'),
+            ScheduleSerializer,
+            # 日付が変われば、行が同じ(どちらも空など)でも別の集合なので送り直す
+            (today.isoformat(), timezone.get_current_timezone_name()),
+        ),
+        'bookmarks': (
+            Bookmark.objects.filter(user=request.user),
+            BookmarkSerializer,
+            (),
+        ),
+    }
+
+    page_size = settings.LIST_PAGE_SIZE
+    etags = {}
+    payload = {}
+    truncated = {}
+    for name, (queryset, serializer_class, scope) in sections.items():
+        # セクションごとに集計クエリでバージョンを確認し、変更があるものだけシリアライズ
+        etags[name] = make_etag(name, *scope, collection_validators(request, queryset).etag)
+        if etags[name] not in client_etags:
+            # 1件多く取得して、件数の上限で切ったかを判定
+            rows = list(project(queryset, serializer_class)[:page_size + 1])
+            truncated[name] = len(rows) > page_size
+            payload[name] = serializer_class(rows[:page_size], many=True).data
+
+    profile = UserSerializer(load_related(request.user, UserSerializer)).data
+    etags['profile'] = make_etag('profile', json.dumps(profile, sort_keys=True, default=str))
+    if etags['profile'] not in client_etags:
+        payload['profile'] = profile
+
+    if not payload:
+        return Response(status=status.HTTP_304_NOT_MODIFIED)
+
+    return Response({'etags': etags, 'truncated': truncated, **payload})
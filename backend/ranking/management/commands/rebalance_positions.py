@@ -0,0 +1,34 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+from django.db.models.functions import Length
+
+from ranking.models import RankedModel
+from ranking.moves import rebalance
+
+
+class Command(BaseCommand):
+    help = '長くなった・重複した並び順(position)をユーザーごとに詰め直す(cronなどで定期実行する)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--length', type=int,
+            help='これより長い順位を持つユーザーを詰め直す(省略時は POSITION_REBALANCE_LENGTH)',
+        )
+
+    def handle(self, *args, length, **options):
+        length = length or settings.POSITION_REBALANCE_LENGTH
+        for model in apps.get_models():
+            if not issubclass(model, RankedModel):
+                continue
+            # 長い順位・空の順位(bulk_create などで振られていない行)を持つユーザーと、同じ順位が並んでいるユーザー
+            user_ids = set(
+                model.objects
+                .values('user_id', 'position')
+                .annotate(count=Count('id'), length=Length('position'))
+                .filter(Q(count__gt=1) | Q(length__gt=length) | Q(position=''))
+                .values_list('user_id', flat=True)
+            )
+            rows = sum(rebalance(model, user_id) for user_id in user_ids)
+            self.stdout.write(f'{model._meta.label}: {len(user_ids)} user(s), {rows} row(s) rebalanced')
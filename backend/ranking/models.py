@@ -0,0 +1,43 @@
+from django.db import models
+
+from .ranks import rank_before
+
+
+class RankedModel(models.Model):
+    """
+    ユーザーが手動で並べ替えられるモデル
+
+    position(ranks.py の順位文字列)の昇順が並び順。新しい行は先頭に追加する
+    (既定の一覧と同じく新しいものが上)。並べ替えは moves.move_response で1行だけ更新する。
+    """
+    # バイト順で比較するため C 照合順序にする
+    position = models.CharField(max_length=255, db_collation='C', blank=True, editable=False, verbose_name='並び順')
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def first_position(cls, user_id):
+        """ユーザーの先頭の順位(行が無ければ None。順位が空の行は詰め直すまで無視する)"""
+        return (
+            cls._default_manager
+            .filter(user_id=user_id, position__gt='')
+            .order_by('position', 'id')
+            .values_list('position', flat=True)
+            .first()
+        )
+
+    def save(self, *args, **kwargs):
+        if not self.position:
+            self.position = rank_before(self.first_position(self.user_id))
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def assign_positions(cls, objs):
+        """bulk_create 用にまとめて順位を振る(同じユーザーの行のみ。後の要素ほど前)"""
+        if not objs:
+            return
+        position = cls.first_position(objs[0].user_id)
+        for obj in objs:
+            position = rank_before(position)
+            obj.position = position
@@ -0,0 +1,128 @@
+"""
+並べ替え(1行の移動)と順位の詰め直し
+
+POST /api/<app>/<id>/move/
+{"after": 12}      12 の直後へ(null なら先頭へ)
+{"before": 15}     15 の直前へ(null なら末尾へ)
+
+隣の行の順位を読み、その間の順位を動かした行にだけ書き込む。
+一覧が何件あっても更新するのは1行(UPDATE 1回)。
+同じ順位が並んでいて間に入れない場合と、順位が長くなりすぎる場合だけ、
+そのユーザーの順位を詰め直してから移動する(通常は manage.py rebalance_positions で事前に詰める)。
+
+同じユーザーの移動と詰め直しはトランザクション単位のロックで1つずつ実行し、
+ロックを取ってから隣の行を読む(同時の移動が同じ隙間に同じ順位を書かないように)。
+"""
+import zlib
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from backend_app import response_cache
+from sync.events import publish_change
+from .ranks import rank_between, spread
+
+
+def _anchor(request):
+    """(基準にする行の id, 'after' / 'before')"""
+    for side in ('after', 'before'):
+        if side in request.data:
+            pk = request.data[side]
+            if pk is not None and (isinstance(pk, bool) or not isinstance(pk, int)):
+                raise ValidationError({side: 'Expected an id or null'})
+            return pk, side
+    raise ValidationError({'after': 'This field is required.'})
+
+
+def _lock_positions(model, user_id):
+    """ユーザーの順位の読み書きを直列にする(トランザクション終了まで保持するアドバイザリロック)"""
+    key = zlib.crc32(model._meta.db_table.encode()) & 0x7FFFFFFF
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)', [key, user_id])
+
+
+def _neighbours(others, pk, side):
+    """移動先の前後の順位 (lower, upper)。端は None。読んだ行はトランザクション終了までロックする"""
+    positions = others.select_for_update().values_list('position', flat=True)
+    if pk is None:
+        if side == 'after':
+            return None, positions.order_by('position', 'id').first()
+        return positions.order_by('-position', '-id').first(), None
+
+    try:
+        anchor = positions.get(pk=pk)
+    except others.model.DoesNotExist:
+        raise ValidationError({side: 'Not found'})
+    # 基準の行の隣を (user, position, id) インデックスの範囲で読む(同じ順位の行は id で切る)
+    if side == 'after':
+        upper = (
+            positions.filter(position__gte=anchor).filter(Q(position__gt=anchor) | Q(id__gt=pk))
+            .order_by('position', 'id').first()
+        )
+        return anchor, upper
+    lower = (
+        positions.filter(position__lte=anchor).filter(Q(position__lt=anchor) | Q(id__lt=pk))
+        .order_by('-position', '-id').first()
+    )
+    return lower, anchor
+
+
+def rebalance(model, user_id):
+    """
+    ユーザーの行の順位を、並び順を変えずに等間隔の短い順位に詰め直し、詰め直した行数を返す
+
+    順位が変わった行は更新日時・変更番号・バージョンも進め、差分同期・検証子・変更の配信に反映する
+    """
+    with transaction.atomic():
+        _lock_positions(model, user_id)
+        objs = list(
+            model.objects.select_for_update()
+            .filter(user_id=user_id)
+            .order_by('position', 'id')
+            .only('id', 'user_id', 'position', 'version')
+        )
+        now = timezone.now()
+        changed = []
+        for obj, position in zip(objs, spread(len(objs))):
+            if obj.position != position:
+                obj.position = position
+                obj.updated_at = now
+                changed.append(obj)
+        model.bulk_update_changes(changed, ['position', 'updated_at'], batch_size=1000)
+        # 確保した番号はすべて配信する(履歴の番号が飛ぶと再接続時の再送が欠ける)
+        for obj in changed:
+            publish_change(obj, 'saved', obj.change_seq)
+        if changed:
+            response_cache.invalidate(model, user_id)
+    return len(changed)
+
+
+def move_response(request, queryset, serializer_class, pk):
+    """queryset(ユーザーの行)の pk の行を移動し、移動後の行を返す"""
+    model = queryset.model
+    anchor, side = _anchor(request)
+    with transaction.atomic():
+        _lock_positions(model, request.user.pk)
+        try:
+            instance = queryset.select_for_update().get(pk=pk)
+        except model.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        if anchor == instance.pk:
+            raise ValidationError({side: 'Cannot move relative to itself'})
+        others = queryset.exclude(pk=instance.pk)
+        position = rank_between(*_neighbours(others, anchor, side))
+        max_length = model._meta.get_field('position').max_length
+        if position is None or len(position) > max_length:
+            # 間に入れない・長すぎる場合だけ同じロックの中で詰め直して、もう一度隣を読む
+            rebalance(model, instance.user_id)
+            instance.refresh_from_db()
+            position = rank_between(*_neighbours(others, anchor, side))
+
+        instance.position = position
+        instance.save(update_fields=['position', 'updated_at'])
+    return Response(serializer_class(instance).data)
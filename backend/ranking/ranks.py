@@ -0,0 +1,96 @@
+"""
+辞書順で比較する順位文字列(分数インデックス)
+
+順位は62進数の小数部分の桁を表す文字列で、C照合順序(バイト順)の比較が数値の大小と一致する。
+どの2つの順位の間にも新しい順位を作れるため、並び替えで書き換えるのは動かした1行だけで済む。
+末尾が '0' の順位は作らない('V' と 'V0' の間には何も入らないため)。
+
+同じ場所への挿入を繰り返すと約6回ごとに1文字伸びる。伸びた順位は rebalance で詰め直す。
+"""
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+
+# 空の一覧の最初の順位(中央)
+FIRST = DIGITS[BASE // 2]
+
+# 先頭・末尾への追加は、この桁数で1ずつずらす(中央から約700万回は伸びない)
+WIDTH = 4
+
+_INDEX = {digit: index for index, digit in enumerate(DIGITS)}
+
+
+def _value(rank, width):
+    """順位を width 桁の整数にする(右を '0' で埋める)"""
+    value = 0
+    for digit in rank.ljust(width, DIGITS[0]):
+        value = value * BASE + _INDEX[digit]
+    return value
+
+
+def _rank(value, width):
+    """width 桁の整数を順位にする(末尾の '0' は除く)"""
+    digits = []
+    for _ in range(width):
+        value, digit = divmod(value, BASE)
+        digits.append(DIGITS[digit])
+    return ''.join(reversed(digits)).rstrip(DIGITS[0])
+
+
+def is_valid(rank):
+    """順位として使える文字列か"""
+    return bool(rank) and not rank.endswith(DIGITS[0]) and all(digit in _INDEX for digit in rank)
+
+
+def rank_before(rank):
+    """rank より前の順位(rank が None なら最初の順位)。前に入らない(空文字列)なら None"""
+    if rank is None:
+        return FIRST
+    if not rank.strip(DIGITS[0]):
+        return None
+    width = max(len(rank), WIDTH)
+    while True:
+        value = _value(rank, width) - 1
+        if value > 0:
+            return _rank(value, width)
+        width += 1
+
+
+def rank_after(rank):
+    """rank より後の順位(rank が None なら最初の順位)"""
+    if rank is None:
+        return FIRST
+    width = max(len(rank), WIDTH)
+    while True:
+        value = _value(rank, width) + 1
+        if value < BASE ** width:
+            return _rank(value, width)
+        width += 1
+
+
+def rank_between(lower, upper):
+    """
+    lower と upper の間の順位(None は端)
+
+    lower < upper でなければ(同じ順位が並んでいるなど)間に入らないので None
+    """
+    if lower is None:
+        return rank_before(upper)
+    if upper is None:
+        return rank_after(lower)
+    if not lower < upper:
+        return None
+    width = max(len(lower), len(upper))
+    low, high = _value(lower, width), _value(upper, width)
+    while high - low < 2:
+        width += 1
+        low, high = low * BASE, high * BASE
+    return _rank((low + high) // 2, width)
+
+
+def spread(count):
+    """count 個の順位を等間隔に並べる(詰め直し・初期値用)。間には62×62以上の余地を残す"""
+    width = 1
+    while BASE ** width < (count + 1) * BASE ** 2:
+        width += 1
+    step = BASE ** width // (count + 1)
+    return [_rank(step * (index + 1), width) for index in range(count)]
@@ -0,0 +1,181 @@
+import threading
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from rest_framework.test import APIClient
+from bookmarks.models import Bookmark
+from ranking.moves import rebalance
+from sync.events import InProcessBroker
+from sync.models import ChangeCounter
+from tasks.models import Task
+
+def add_bookmarks(user, count=5):
+    for i in range(count):
+        Bookmark.objects.create(user=user, name=f'Bookmark {i}', url=f'https://example.com/{i}', iconEmoji='📌', color='red')
+
+def names(res):
+    assert res.status_code == 200
+    data = res.data if hasattr(res, 'data') else res.json()
+    return [item.get('name') or item.get('title') for item in data]
+
+def ids(names_to_ids, *names):
+    return [names_to_ids[name] for name in names]
+
+@pytest.mark.django_db
+def test_new_rows_go_first(authenticated_client, test_user):
+    """新しい行は先頭に入り、?order=position の並びは作成順の新しい順と同じ"""
+    add_bookmarks(test_user, 3)
+    assert names(authenticated_client.get('/api/bookmarks/?order=position')) == ['Bookmark 2', 'Bookmark 1', 'Bookmark 0']
+    res = authenticated_client.get('/api/bookmarks/?order=bogus')
+    assert res.status_code == 400
+    res = authenticated_client.get('/api/schedules/?order=position')
+    assert res.status_code == 400
+
+@pytest.mark.django_db
+def test_move_bookmark(authenticated_client, test_user):
+    """after / before で移動し、更新するのは動かした1行だけ"""
+    add_bookmarks(test_user, 4)
+    pk = dict(Bookmark.objects.values_list('name', 'id'))
+    positions = dict(Bookmark.objects.values_list('name', 'position'))
+
+    res = authenticated_client.post(f"/api/bookmarks/{pk['Bookmark 0']}/move/", {'after': pk['Bookmark 3']}, format='json')
+    assert res.status_code == 200
+    assert positions['Bookmark 3'] < res.data['position'] < positions['Bookmark 2']
+    assert names(authenticated_client.get('/api/bookmarks/?order=position')) == ['Bookmark 3', 'Bookmark 0', 'Bookmark 2', 'Bookmark 1']
+    # 他の行の順位は変わらない
+    assert dict(Bookmark.objects.exclude(pk=pk['Bookmark 0']).values_list('name', 'position')) == {
+        name: position for name, position in positions.items() if name != 'Bookmark 0'
+    }
+
+    authenticated_client.post(f"/api/bookmarks/{pk['Bookmark 1']}/move/", {'after': None}, format='json')
+    authenticated_client.post(f"/api/bookmarks/{pk['Bookmark 3']}/move/", {'before': None}, format='json')
+    authenticated_client.post(f"/api/bookmarks/{pk['Bookmark 2']}/move/", {'before': pk['Bookmark 0']}, format='json')
+    assert names(authenticated_client.get('/api/bookmarks/?order=position')) == ['Bookmark 1', 'Bookmark 2', 'Bookmark 0', 'Bookmark 3']
+
+@pytest.mark.django_db
+def test_move_validation(authenticated_client, test_user):
+    """移動先の指定が不正なら400、他のユーザーの行は404"""
+    add_bookmarks(test_user, 2)
+    first, second = Bookmark.objects.order_by('id').values_list('id', flat=True)
+    url = f'/api/bookmarks/{first}/move/'
+    assert authenticated_client.post(url, {}, format='json').status_code == 400
+    assert authenticated_client.post(url, {'after': 'x'}, format='json').status_code == 400
+    assert authenticated_client.post(url, {'after': first}, format='json').status_code == 400
+    assert authenticated_client.post(url, {'after': 999999}, format='json').status_code == 400
+    assert authenticated_client.post('/api/bookmarks/999999/move/', {'after': second}, format='json').status_code == 404
+
+@pytest.mark.django_db
+def test_move_query_budget(jwt_client, test_user, query_budget):
+    """移動のクエリ数は件数によらない(UPDATE は1行だけ)"""
+    add_bookmarks(test_user, 3)
+    first, second = Bookmark.objects.order_by('id').values_list('id', flat=True)[:2]
+    query_budget(
+        11,
+        lambda: jwt_client.post(f'/api/bookmarks/{first}/move/', {'after': second}, format='json'),
+        grow=lambda: add_bookmarks(test_user, 20),
+    )
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_moves_get_distinct_positions(test_user):
+    """同じ隙間への同時の移動も、隣の行を読み直して別々の順位になる"""
+    add_bookmarks(test_user, 8)
+    first, second, *moving = Bookmark.objects.order_by('position', 'id').values_list('id', flat=True)
+    barrier = threading.Barrier(len(moving))
+    statuses = []
+
+    def move(pk):
+        client = APIClient()
+        client.force_authenticate(test_user)
+        barrier.wait()
+        try:
+            statuses.append(client.post(f'/api/bookmarks/{pk}/move/', {'after': first}, format='json').status_code)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=move, args=(pk,)) for pk in moving]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses == [200] * len(moving)
+    positions = list(Bookmark.objects.values_list('position', flat=True))
+    assert len(set(positions)) == len(positions)
+
+@pytest.mark.django_db
+def test_move_rebalances_ties(authenticated_client, test_user):
+    """同じ順位が並んでいて間に入れない場合は詰め直してから移動する"""
+    add_bookmarks(test_user, 3)
+    Bookmark.objects.update(position='V')
+    pk = dict(Bookmark.objects.values_list('name', 'id'))
+    res = authenticated_client.post(f"/api/bookmarks/{pk['Bookmark 2']}/move/", {'after': pk['Bookmark 0']}, format='json')
+    assert res.status_code == 200
+    assert names(authenticated_client.get('/api/bookmarks/?order=position')) == ['Bookmark 0', 'Bookmark 2', 'Bookmark 1']
+    assert len(set(Bookmark.objects.values_list('position', flat=True))) == 3
+
+@pytest.mark.django_db
+def test_order_by_position_pagination(authenticated_client, jwt_client, test_user):
+    """?order=position でもカーソルでページをたどれる(非同期版も同じ)"""
+    for i in range(5):
+        Task.objects.create(user=test_user, title=f'Task {i}')
+    Task.objects.filter(title__in=['Task 1', 'Task 3']).update(position='V')
+
+    res = authenticated_client.get('/api/tasks/?order=position&page_size=2')
+    seen = names(res)
+    while res.has_header('X-Next-Cursor'):
+        res = authenticated_client.get(f"/api/tasks/?order=position&page_size=2&cursor={res['X-Next-Cursor']}")
+        seen += names(res)
+    assert seen == list(Task.objects.order_by('position', 'id').values_list('title', flat=True))
+
+    sync_res = jwt_client.get('/api/tasks/?order=position&page_size=2')
+    async_res = jwt_client.get('/api/async/tasks/?order=position&page_size=2')
+    assert async_res.content == sync_res.content
+    assert async_res['X-Next-Cursor'] == sync_res['X-Next-Cursor']
+
+@pytest.mark.django_db
+def test_batch_create_positions(authenticated_client, test_user):
+    """一括作成した行も先頭に入る"""
+    add_bookmarks(test_user, 1)
+    payload = {'create': [
+        {'name': f'New {i}', 'url': f'https://example.com/new/{i}', 'iconEmoji': '📌', 'color': 'red'} for i in range(2)
+    ]}
+    assert authenticated_client.post('/api/bookmarks/batch/', payload, format='json').status_code == 200
+    assert names(authenticated_client.get('/api/bookmarks/?order=position')) == ['New 1', 'New 0', 'Bookmark 0']
+
+@pytest.mark.django_db
+def test_rebalance_command(test_user):
+    """長い順位・重複・空の順位を持つユーザーだけ、並び順を変えずに詰め直す"""
+    add_bookmarks(test_user, 3)
+    Bookmark.objects.filter(name='Bookmark 1').update(position='V' + 'z' * 30)
+    Bookmark.objects.filter(name='Bookmark 0').update(position='')
+    before = list(Bookmark.objects.order_by('position', 'id').values_list('name', flat=True))
+    seq = max(Bookmark.objects.values_list('change_seq', flat=True))
+
+    call_command('rebalance_positions')
+
+    after = list(Bookmark.objects.order_by('position', 'id').values_list('name', 'position', 'change_seq'))
+    assert [name for name, _, _ in after] == before
+    assert all(len(position) <= 4 for _, position, _ in after)
+    assert all(change_seq > seq for _, _, change_seq in after)
+
+@pytest.mark.django_db
+def test_rebalance_publishes_changes(test_user, monkeypatch, django_capture_on_commit_callbacks):
+    """詰め直した行の変更も配信し、再接続時の再送に番号の抜けが無い"""
+    broker = InProcessBroker()
+    monkeypatch.setattr('sync.events._broker', broker)
+    add_bookmarks(test_user, 3)
+    Bookmark.objects.update(position='V')
+    last = ChangeCounter.objects.get(user=test_user).seq
+
+    with django_capture_on_commit_callbacks(execute=True):
+        moved = rebalance(Bookmark, test_user.pk)
+    assert moved > 0
+    with django_capture_on_commit_callbacks(execute=True):
+        Bookmark.objects.create(user=test_user, name='New', url='https://example.com/new', iconEmoji='📌', color='red')
+
+    events = broker.replay(test_user.pk, last)
+    assert [event['id'] for event in events] == list(range(last + 1, last + moved + 2))
+    assert all(event['data']['kind'] == 'bookmarks' and event['data']['action'] == 'saved' for event in events)
+    changed = dict(Bookmark.objects.filter(change_seq__gt=last).values_list('change_seq', 'id'))
+    assert {event['id']: event['data']['id'] for event in events} == changed
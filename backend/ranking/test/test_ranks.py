@@ -0,0 +1,38 @@
+import random
+from ranking.ranks import is_valid, rank_after, rank_before, rank_between, spread
+
+def test_rank_between_keeps_order():
+    """どの2つの順位の間にも、末尾が '0' でない順位を作れる"""
+    rng = random.Random(0)
+    ranks = spread(10)
+    for _ in range(2000):
+        index = rng.randrange(len(ranks) + 1)
+        lower = ranks[index - 1] if index else None
+        upper = ranks[index] if index < len(ranks) else None
+        rank = rank_between(lower, upper)
+        assert is_valid(rank)
+        assert (lower is None or lower < rank) and (upper is None or rank < upper)
+        ranks.insert(index, rank)
+    assert ranks == sorted(ranks)
+
+def test_rank_between_without_room():
+    """同じ順位の間には入らない"""
+    assert rank_between('V', 'V') is None
+    assert rank_between('W', 'V') is None
+    assert rank_before('') is None
+    assert rank_between(None, None) == 'V'
+
+def test_ranks_at_the_ends_stay_short():
+    """先頭・末尾への追加を繰り返しても順位は伸びない"""
+    first = last = 'V'
+    for _ in range(5000):
+        first, last = rank_before(first), rank_after(last)
+    assert len(first) == len(last) == 4
+    assert first < 'V' < last
+
+def test_spread():
+    """詰め直した順位は短く等間隔"""
+    ranks = spread(2000)
+    assert ranks == sorted(ranks) and len(set(ranks)) == 2000
+    assert max(len(rank) for rank in ranks) == 4
+    assert all(is_valid(rank) for rank in ranks)
@@ -0,0 +1,91 @@
+import zoneinfo
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+
+def _parse(request, param):
+    """
+    クエリパラメータを日時として解釈する
+
+    日付のみ(2025-12-01)の場合は (その日の0時, True) を返す
+    """
+    value = request.query_params.get(param)
+    if not value:
+        return None, False
+
+    try:
+        parsed = parse_date(value)
+        if parsed is not None:
+            return timezone.make_aware(datetime.combine(parsed, time.min)), True
+
+        parsed = parse_datetime(value)
+        if parsed is not None:
+            if timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed)
+            return parsed, False
+    except ValueError:
+        pass
+    raise ValidationError({param: 'Invalid date'})
+
+
+def filter_by_date(request, queryset):
+    """
+    スケジュールを日時で絞り込む
+
+    ?date=2025-12-01                       その日の予定
+    ?start=2025-12-01&end=2025-12-31       期間の予定(日付のみの end はその日を含む)
+    ?start=...T10:00:00&end=...T12:00:00   start <= date < end
+    """
+    day, day_is_date = _parse(request, 'date')
+    if day is not None:
+        if not day_is_date:
+            day = timezone.make_aware(datetime.combine(timezone.localdate(day), time.min))
+        # 日付の範囲で絞り、(user, date) インデックスを使う
+        return queryset.filter(date__gte=day, date__lt=day + timedelta(days=1))
+
+    start, _ = _parse(request, 'start')
+    end, end_is_date = _parse(request, 'end')
+    if start is not None:
+        queryset = queryset.filter(date__gte=start)
+    if end is not None:
+        queryset = queryset.filter(date__lt=end + timedelta(days=1) if end_is_date else end)
+    return queryset
+
+
+def month_range(request):
+    """
+    ?month=2025-12&tz=Asia/Tokyo をその月の範囲に変換する
+
+    (月初, 翌月初, タイムゾーン) を返す。month を省略した場合は今月
+    """
+    tz_name = request.query_params.get('tz') or settings.TIME_ZONE
+    try:
+        tz = zoneinfo.ZoneInfo(tz_name)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        raise ValidationError({'tz': 'Invalid timezone'})
+
+    month = request.query_params.get('month')
+    if month:
+        try:
+            first = parse_date(f'{month}-01') if len(month) == 7 else None
+        except ValueError:
+            first = None
+        if first is None:
+            raise ValidationError({'month': 'Invalid month'})
+    else:
+        first = timezone.localdate(timezone=tz).replace(day=1)
+
+    try:
+        next_first = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+    except ValueError:
+        # 9999-12 の翌月は date で表せない
+        raise ValidationError({'month': 'Invalid month'})
+    return (
+        datetime.combine(first, time.min, tzinfo=tz),
+        datetime.combine(next_first, time.min, tzinfo=tz),
+        tz,
+    )
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0002_schedule_schedules_user_id_e5272d_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedule',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='変更番号'),
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['user', 'change_seq'], name='schedules_user_id_f1d12a_idx'),
+        ),
+    ]
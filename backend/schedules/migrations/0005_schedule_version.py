@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0004_schedule_search_vector_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedule',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='バージョン'),
+        ),
+    ]
@@ -1,7 +1,10 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.contrib.auth.models import User
+from sync.models import ChangeTrackedModel
 
-class Schedule(models.Model):
+class Schedule(ChangeTrackedModel):
     """スケジュールモデル"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='schedule', verbose_name='ユーザー')
     title = models.CharField(max_length=255, verbose_name='タイトル')
@@ -10,6 +13,16 @@ class Schedule(models.Model):
     date = models.DateTimeField(verbose_name='時間')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='作成日')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新日')
+    # 全文検索用(/api/search/)。title を重み A、memo・location を B としてDBが生成する
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('title', weight='A', config='simple')
+            + SearchVector('memo', 'location', weight='B', config='simple')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name='検索用ベクトル',
+    )
 
     class Meta:
         db_table = 'schedules'
@@ -18,6 +31,12 @@ class Schedule(models.Model):
         verbose_name_plural = 'スケジュール'
         indexes = [
             models.Index(fields=['user', '-created_at']),
+            # 日付範囲での絞り込み用
+            models.Index(fields=['user', 'date']),
+            # 差分同期用
+            models.Index(fields=['user', 'change_seq']),
+            # 全文検索用
+            GinIndex(fields=['search_vector']),
         ]
 
     def __str__(self):
@@ -1,17 +1,23 @@
 from rest_framework import serializers
+from backend_app.batch import BulkListSerializer
+from backend_app.metrics import SerializerTimingMixin
+from backend_app.sparse_fields import SparseFieldsMixin
 from .models import Schedule
 
-class ScheduleSerializer(serializers.ModelSerializer):
+class ScheduleSerializer(SparseFieldsMixin, SerializerTimingMixin, serializers.ModelSerializer):
     """ScheduleモデルをJSON形式に変換する"""
 
     class Meta:
         model = Schedule
 
         # JSONに含めるフィールド
-        fields = ['id', 'title', 'memo', 'location', 'date', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'memo', 'location', 'date', 'created_at', 'updated_at', 'version']
 
         # 読み取り専用フィールド
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'version']
+
+        # many=True で一括作成・更新する
+        list_serializer_class = BulkListSerializer
 
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
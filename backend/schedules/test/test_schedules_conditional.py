@@ -0,0 +1,73 @@
+import pytest
+
+def create_schedule(api_client, title='Meeting'):
+    res = api_client.post('/api/schedules/', {
+        'title': title,
+        'location': 'Tokyo',
+        'date': '2025-12-01T10:00:00+09:00'
+    }, format='json')
+    assert res.status_code == 201
+    return res.data['id']
+
+@pytest.mark.django_db
+def test_schedule_list_not_modified(authenticated_client):
+    """一覧が変わっていなければ304"""
+    api_client = authenticated_client
+    create_schedule(api_client)
+
+    res = api_client.get('/api/schedules/')
+    assert res.status_code == 200
+    etag = res['ETag']
+
+    res = api_client.get('/api/schedules/', HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 304
+    assert res['ETag'] == etag
+
+    res = api_client.get('/api/schedules/', HTTP_IF_MODIFIED_SINCE=res['Last-Modified'])
+    assert res.status_code == 304
+
+@pytest.mark.django_db
+def test_schedule_list_etag_changes(authenticated_client):
+    """追加・削除でETagが変わる"""
+    api_client = authenticated_client
+    schedule_id = create_schedule(api_client)
+    etag = api_client.get('/api/schedules/')['ETag']
+
+    create_schedule(api_client, 'Lunch')
+    res = api_client.get('/api/schedules/', HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    assert len(res.data) == 2
+    etag = res['ETag']
+
+    api_client.delete(f'/api/schedules/{schedule_id}/')
+    res = api_client.get('/api/schedules/', HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    assert len(res.data) == 1
+
+@pytest.mark.django_db
+def test_schedule_detail_not_modified(authenticated_client):
+    """詳細は行の更新で304が解除される"""
+    api_client = authenticated_client
+    schedule_id = create_schedule(api_client)
+
+    etag = api_client.get(f'/api/schedules/{schedule_id}/')['ETag']
+    res = api_client.get(f'/api/schedules/{schedule_id}/', HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 304
+
+    api_client.put(f'/api/schedules/{schedule_id}/', {'title': 'Updated'}, format='json')
+    res = api_client.get(f'/api/schedules/{schedule_id}/', HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    assert res.data['title'] == 'Updated'
+
+@pytest.mark.django_db
+def test_schedule_put_if_match(authenticated_client):
+    """詳細のETagを If-Match に使うと、先に更新された場合は 412"""
+    api_client = authenticated_client
+    schedule_id = create_schedule(api_client)
+    etag = api_client.get(f'/api/schedules/{schedule_id}/')['ETag']
+
+    res = api_client.put(f'/api/schedules/{schedule_id}/', {'title': 'First'}, format='json', HTTP_IF_MATCH=etag)
+    assert res.status_code == 200
+    res = api_client.put(f'/api/schedules/{schedule_id}/', {'title': 'Second'}, format='json', HTTP_IF_MATCH=etag)
+    assert res.status_code == 412
+    assert api_client.get(f'/api/schedules/{schedule_id}/').data['title'] == 'First'
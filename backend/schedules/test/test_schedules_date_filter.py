@@ -0,0 +1,48 @@
+import pytest
+
+@pytest.fixture
+def schedules(authenticated_client):
+    for title, date in [
+        ('November', '2025-11-30T23:00:00+09:00'),
+        ('December first', '2025-12-01T00:00:00+09:00'),
+        ('December last', '2025-12-31T23:59:00+09:00'),
+        ('January', '2026-01-01T09:00:00+09:00'),
+    ]:
+        res = authenticated_client.post('/api/schedules/', {
+            'title': title,
+            'location': 'Tokyo',
+            'date': date
+        }, format='json')
+        assert res.status_code == 201
+
+def titles(res):
+    return sorted(schedule['title'] for schedule in res.data)
+
+@pytest.mark.django_db
+def test_schedule_filter_by_month(authenticated_client, schedules):
+    """start/end の日付指定は end の日を含む"""
+    res = authenticated_client.get('/api/schedules/?start=2025-12-01&end=2025-12-31')
+    assert res.status_code == 200
+    assert titles(res) == ['December first', 'December last']
+
+@pytest.mark.django_db
+def test_schedule_filter_by_datetime_range(authenticated_client, schedules):
+    """日時指定の end は含まない"""
+    res = authenticated_client.get('/api/schedules/', {
+        'start': '2025-11-30T23:00:00+09:00',
+        'end': '2025-12-01T00:00:00+09:00',
+    })
+    assert titles(res) == ['November']
+
+@pytest.mark.django_db
+def test_schedule_filter_by_date(authenticated_client, schedules):
+    """1日分の予定"""
+    res = authenticated_client.get('/api/schedules/?date=2026-01-01')
+    assert titles(res) == ['January']
+
+@pytest.mark.django_db
+def test_schedule_filter_invalid_date(authenticated_client):
+    """不正な日付"""
+    res = authenticated_client.get('/api/schedules/?start=2025-13-01')
+    assert res.status_code == 400
+    assert 'start' in res.data
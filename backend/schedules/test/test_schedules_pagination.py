@@ -0,0 +1,30 @@
+import pytest
+from schedules.models import Schedule
+
+@pytest.mark.django_db
+def test_schedule_list_cursor_pagination(authenticated_client, test_user, settings):
+    """既定の件数で区切られた一覧も、カーソルで全ページを重複・欠落なく辿れる(日付の絞り込みと併用)"""
+    settings.LIST_PAGE_SIZE = 2
+    for i in range(5):
+        Schedule.objects.create(user=test_user, title=f'Schedule {i}', location='Tokyo', date=f'2025-12-0{i + 1}T10:00:00+09:00')
+    Schedule.objects.create(user=test_user, title='Other month', location='Tokyo', date='2026-01-05T10:00:00+09:00')
+
+    seen = []
+    url = '/api/schedules/?start=2025-12-01&end=2025-12-31'
+    while True:
+        res = authenticated_client.get(url)
+        assert res.status_code == 200
+        assert len(res.data) <= 2
+        seen += [schedule['title'] for schedule in res.data]
+        if not res.has_header('Link'):
+            break
+        url = res['Link'].split('<')[1].split('>')[0]
+
+    assert seen == [f'Schedule {i}' for i in reversed(range(5))]
+
+@pytest.mark.django_db
+def test_schedule_list_invalid_cursor(authenticated_client):
+    """不正なカーソル"""
+    res = authenticated_client.get('/api/schedules/?cursor=invalid')
+    assert res.status_code == 400
+    assert 'cursor' in res.data
@@ -0,0 +1,48 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from schedules.models import Schedule
+
+START = datetime(2025, 12, 1, 9, tzinfo=timezone.utc)
+
+def add_schedules(user, count=5):
+    for i in range(count):
+        Schedule.objects.create(user=user, title=f'Schedule {i}', location='Tokyo', date=START + timedelta(days=i))
+
+@pytest.mark.django_db
+def test_schedule_read_query_budget(jwt_client, test_user, query_budget):
+    """一覧(期間指定)・サマリー・詳細のクエリ数は件数によらない"""
+    add_schedules(test_user)
+    schedule = Schedule.objects.first()
+    grow = lambda: add_schedules(test_user, 10)
+    query_budget(3, lambda: jwt_client.get('/api/schedules/'), grow=grow)
+    query_budget(3, lambda: jwt_client.get('/api/schedules/?start=2025-12-01&end=2025-12-31'), grow=grow)
+    query_budget(2, lambda: jwt_client.get('/api/schedules/summary/?month=2025-12&titles=3'), grow=grow)
+    query_budget(2, lambda: jwt_client.get(f'/api/schedules/{schedule.pk}/'))
+
+@pytest.mark.django_db
+def test_schedule_write_query_budget(jwt_client, test_user, query_budget):
+    """作成・更新・削除のクエリ数"""
+    add_schedules(test_user, 1)
+    schedule = Schedule.objects.first()
+    payload = {'title': 'New', 'location': 'Tokyo', 'date': '2025-12-24T19:00:00+09:00'}
+    query_budget(5, lambda: jwt_client.post('/api/schedules/', payload, format='json'))
+    # 更新は事前に読まず UPDATE ... RETURNING 1回(versioning.py)
+    query_budget(5, lambda: jwt_client.put(f'/api/schedules/{schedule.pk}/', {'memo': 'Memo'}, format='json'))
+    query_budget(5, lambda: jwt_client.delete(f'/api/schedules/{schedule.pk}/'))
+
+@pytest.mark.django_db
+def test_schedule_batch_query_budget(jwt_client, test_user, query_budget):
+    """一括操作のクエリ数は操作の件数によらない"""
+    payload = {}
+
+    def prepare(n):
+        add_schedules(test_user, n * 2)
+        ids = list(Schedule.objects.filter(user=test_user).order_by('-id').values_list('id', flat=True))
+        payload.update({
+            'create': [{'title': f'New {i}', 'location': 'Tokyo', 'date': '2025-12-24T19:00:00+09:00'} for i in range(n)],
+            'update': [{'id': pk, 'memo': 'Memo'} for pk in ids[:n]],
+            'delete': ids[n:n * 2],
+        })
+
+    prepare(2)
+    query_budget(13, lambda: jwt_client.post('/api/schedules/batch/', payload, format='json'), grow=lambda: prepare(6))
@@ -0,0 +1,38 @@
+import pytest
+
+@pytest.mark.django_db
+def test_schedule_month_summary(authenticated_client, django_assert_num_queries):
+    """日ごとの件数(日付はAsia/Tokyoで区切る)"""
+    api_client = authenticated_client
+    for title, date in [
+        ('Morning', '2025-12-01T08:00:00+09:00'),
+        # UTCでは11月30日だが、日本時間では12月1日
+        ('Midnight', '2025-12-01T00:30:00+09:00'),
+        ('Dinner', '2025-12-24T19:00:00+09:00'),
+        ('Next month', '2026-01-01T10:00:00+09:00'),
+    ]:
+        api_client.post('/api/schedules/', {
+            'title': title,
+            'location': 'Tokyo',
+            'date': date
+        }, format='json')
+
+    with django_assert_num_queries(1) as queries:
+        res = api_client.get('/api/schedules/summary/?month=2025-12&titles=1')
+    assert res.status_code == 200
+    # タイトルはDBで先頭の件数だけに切る
+    assert ')[1:1]' in queries.captured_queries[0]['sql']
+    assert res.data['month'] == '2025-12'
+    assert res.data['days'] == [
+        {'date': '2025-12-01', 'count': 2, 'titles': ['Midnight']},
+        {'date': '2025-12-24', 'count': 1, 'titles': ['Dinner']},
+    ]
+
+@pytest.mark.django_db
+def test_schedule_month_summary_invalid_month(authenticated_client):
+    """不正な月(翌月を表せない 9999-12 も含む)"""
+    for month in ['2025-13', '9999-12']:
+        res = authenticated_client.get(f'/api/schedules/summary/?month={month}')
+        assert res.status_code == 400
+        assert 'month' in res.data
+    assert authenticated_client.get('/api/schedules/summary/?month=9999-11').status_code == 200
@@ -5,5 +5,7 @@ app_name = 'bookmarks'
 
 urlpatterns = [
     path('', views.schedule_list, name='schedule_list'),
+    path('batch/', views.schedule_batch, name='schedule_batch'),
+    path('summary/', views.schedule_summary, name='schedule_summary'),
     path('<int:pk>/', views.schedule_detail, name='schedule_detail'),
 ]
\ No newline at end of file
@@ -2,6 +2,20 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import CharField, Count, Func
+from django.db.models.functions import TruncDate
+from backend_app.batch import batch_response
+from backend_app.conditional import object_validators
+from archive.detail import archived_detail_response, archived_update_response
+from archive.models import ArchivedSchedule, ScheduleWithArchive
+from backend_app.listing import list_response
+from backend_app.params import INCLUDE_ARCHIVED_PARAM, bool_param
+from backend_app.projection import project
+from backend_app.sparse_fields import fields_validators, requested_fields
+from backend_app.versioning import update_response
+from .filters import filter_by_date, month_range
 from .models import Schedule
 from .serializers import ScheduleSerializer
 
@@ -10,9 +24,10 @@ from .serializers import ScheduleSerializer
 def schedule_list(request):
     """スケジュール一覧取得・作成"""
     if request.method == 'GET':
-        schedules = Schedule.objects.filter(user=request.user)
-        serializer = ScheduleSerializer(schedules, many=True)
-        return Response(serializer.data)
+        # ?include_archived=true ではアーカイブした(過去の)スケジュールも含める
+        source = ScheduleWithArchive if bool_param(request, INCLUDE_ARCHIVED_PARAM) else Schedule
+        schedules = filter_by_date(request, source.objects.filter(user=request.user))
+        return list_response(request, schedules, ScheduleSerializer, Schedule)
     
     elif request.method == 'POST':
         serializer = ScheduleSerializer(data=request.data, context={'request': request})
@@ -21,26 +36,93 @@ def schedule_list(request):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def schedule_batch(request):
+    """スケジュール一括作成・更新・削除"""
+    schedules = Schedule.objects.filter(user=request.user)
+    return batch_response(request, schedules, ScheduleSerializer)
+
 @api_view(['GET', 'PUT', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def schedule_detail(request, pk):
     """スケジュール詳細取得・更新・削除"""
+    schedules = Schedule.objects.filter(user=request.user)
+    if request.method == 'PUT':
+        # 事前に読まず、If-Match のバージョンを条件にした UPDATE 1回で更新する
+        response = update_response(request, schedules, ScheduleSerializer, pk)
+        # アーカイブした行は更新できない(409)
+        return archived_update_response(request, ArchivedSchedule, response, pk)
+
+    fields = None
+    if request.method == 'GET':
+        # 取得のみの場合はシリアライズするカラム(とETagに使うバージョン・更新日時)だけを読む
+        fields = requested_fields(request, ScheduleSerializer)
+        schedules = project(schedules, ScheduleSerializer, ('updated_at', 'version'), fields)
     try:
-        schedule = Schedule.objects.get(pk=pk, user=request.user)
+        schedule = schedules.get(pk=pk)
     except Schedule.DoesNotExist:
-        return Response(status=status.HTTP_404_NOT_FOUND)
+        # アーカイブした行は読み取り専用で返す
+        return archived_detail_response(request, ArchivedSchedule, ScheduleSerializer, pk)
     
     if request.method == 'GET':
-        serializer = ScheduleSerializer(schedule)
-        return Response(serializer.data)
-    
-    elif request.method == 'PUT':
-        serializer = ScheduleSerializer(schedule, data=request.data, partial=True)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        validators = fields_validators(object_validators(schedule), fields)
+        response = validators.not_modified(request)
+        if response is None:
+            serializer = ScheduleSerializer(schedule, fields=fields)
+            response = Response(serializer.data)
+        return validators.apply(response)
     
     elif request.method == 'DELETE':
         schedule.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class _FirstElements(Func):
+    """配列の先頭 limit 要素(PostgreSQL の (array)[1:limit]。limit は整数に限る)"""
+    template = '(%(expressions)s)[1:%(limit)d]'
+    output_field = ArrayField(CharField())
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def schedule_summary(request):
+    """
+    カレンダー用の月間サマリー(日ごとの件数)
+
+    GET /api/schedules/summary/?month=2025-12&tz=Asia/Tokyo&titles=3
+
+    アーカイブした過去の月は ?include_archived=true で集計する
+    """
+    start, end, tz = month_range(request)
+    try:
+        title_limit = max(0, min(int(request.query_params.get('titles', 0)), 10))
+    except ValueError:
+        title_limit = 0
+
+    source = ScheduleWithArchive if bool_param(request, INCLUDE_ARCHIVED_PARAM) else Schedule
+
+    # 1回のGROUP BYクエリで日ごとに集計する
+    days = (
+        source.objects
+        .filter(user=request.user, date__gte=start, date__lt=end)
+        .annotate(day=TruncDate('date', tzinfo=tz))
+        .values('day')
+        .annotate(count=Count('id'))
+        .order_by('day')
+    )
+    if title_limit:
+        # 先頭の title_limit 件だけをDBで切り出して返す(件数の多い日も全タイトルを転送しない)
+        days = days.annotate(titles=_FirstElements(ArrayAgg('title', order_by='date'), limit=title_limit))
+
+    return Response({
+        'month': start.strftime('%Y-%m'),
+        'timezone': str(tz),
+        'days': [
+            {
+                'date': day['day'].isoformat(),
+                'count': day['count'],
+                **({'titles': day['titles']} if title_limit else {}),
+            }
+            for day in days
+        ],
+    })
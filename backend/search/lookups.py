@@ -0,0 +1,20 @@
+from django.db.models import CharField, TextField
+from django.db.models.lookups import IContains
+
+
+@CharField.register_lookup
+@TextField.register_lookup
+class ILikeContains(IContains):
+    """
+    大文字小文字を区別しない部分一致(field__ilike_contains='資料')
+
+    PostgreSQL の icontains は UPPER(column) LIKE UPPER(%s) になり、カラムの
+    gin_trgm_ops インデックス(search/migrations/0001)を使えない。
+    ILIKE はそのまま使えるので、検索の部分一致はこちらで書く。
+    """
+    lookup_name = 'ilike_contains'
+
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} ILIKE {rhs}', (*lhs_params, *rhs_params)
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# (テーブル, カラム) ごとに gin_trgm_ops の GIN インデックスを作る
+TRIGRAM_COLUMNS = [
+    ('tasks', 'title'),
+    ('tasks', 'detail'),
+    ('schedules', 'title'),
+    ('schedules', 'memo'),
+    ('schedules', 'location'),
+    ('bookmarks', 'name'),
+    ('bookmarks', 'url'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    """
+    pg_trgm を入れ、トライグラムのインデックスを作る
+
+    pg_trgm を入れられない環境(拡張の無いPostgreSQLのビルドなど)では作らず、検索は全文検索のみになる。
+    既存のテーブルへの書き込みを止めないよう CREATE INDEX CONCURRENTLY で作る(DO ブロックの中では使えない)。
+    途中で失敗した場合は INVALID のインデックスが残るため、DROP INDEX してから再実行する
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, column in TRIGRAM_COLUMNS:
+            cursor.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_{column}_trgm '
+                f'ON {table} USING gin ({column} gin_trgm_ops)'
+            )
+
+
+def drop_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table, column in TRIGRAM_COLUMNS:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {table}_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY はトランザクションの中では実行できない
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0003_task_search_vector_task_tasks_search__eda4a6_gin'),
+        ('schedules', '0004_schedule_search_vector_and_more'),
+        ('bookmarks', '0003_bookmark_search_vector_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
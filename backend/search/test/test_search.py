@@ -0,0 +1,95 @@
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from bookmarks.models import Bookmark
+from schedules.models import Schedule
+from search import views
+from search.views import has_trigram
+from tasks.models import Task
+
+@pytest.fixture
+def rows(test_user):
+    Task.objects.create(user=test_user, title='企画書 レビュー', detail='Meeting の前に確認')
+    Task.objects.create(user=test_user, title='Buy milk')
+    Schedule.objects.create(user=test_user, title='Weekly meeting', location='会議室A', date='2025-12-01T10:00:00+09:00')
+    Bookmark.objects.create(user=test_user, name='Docs', url='https://docs.example.com/meetings', iconEmoji='icon', color='red')
+    other = User.objects.create_user(username='other', password='pass')
+    Task.objects.create(user=other, title='Meeting notes')
+
+def search(client, q, **params):
+    res = client.get('/api/search/', {'q': q, **params})
+    assert res.status_code == 200
+    return res.data['results']
+
+@pytest.mark.django_db
+def test_search_merges_ranked_results(authenticated_client, rows):
+    """3種類の結果を1つのリストにスコア順で返す(他のユーザーの行は含まない)"""
+    results = search(authenticated_client, 'meet')
+    # タイトル(重み A)に一致した行が詳細・URL(重み B)より上位
+    assert (results[0]['kind'], results[0]['title']) == ('schedules', 'Weekly meeting')
+    assert sorted((r['kind'], r['title']) for r in results[1:]) == [('bookmarks', 'Docs'), ('tasks', '企画書 レビュー')]
+    assert all(r['title'] != 'Meeting notes' for r in results)
+    assert results[0]['subtitle'] == '会議室A'
+    assert results == sorted(results, key=lambda r: -r['rank'])
+
+@pytest.mark.django_db
+def test_search_terms_and_prefix(authenticated_client, rows):
+    """空白区切りの語はすべて前方一致する行だけを返す"""
+    assert [r['title'] for r in search(authenticated_client, 'buy mil')] == ['Buy milk']
+    assert [r['title'] for r in search(authenticated_client, '企画')] == ['企画書 レビュー']
+    assert search(authenticated_client, 'milk meeting') == []
+
+@pytest.mark.django_db
+def test_search_limit_and_empty_query(authenticated_client, rows):
+    """件数の上限と、検索語が無い場合"""
+    assert len(search(authenticated_client, 'meet', limit=1)) == 1
+    assert search(authenticated_client, '  ') == []
+    # tsquery の演算子は語として扱わない
+    assert search(authenticated_client, "'&|!") == []
+
+@pytest.mark.django_db
+def test_search_query_budget(jwt_client, rows, query_budget):
+    """3種類の検索は UNION ALL の1クエリ"""
+    has_trigram()
+    query_budget(2, lambda: jwt_client.get('/api/search/?q=meet'))
+
+@pytest.mark.django_db
+def test_has_trigram_rechecks_when_missing(monkeypatch):
+    """pg_trgm が無いという結果は一定時間だけ使い、その後は確認し直す。有る場合は確認しない"""
+    def queries():
+        with CaptureQueriesContext(connection) as captured:
+            has_trigram()
+        return len(captured)
+
+    monkeypatch.setattr(views, '_trigram', {'available': False, 'checked_at': time.monotonic()})
+    assert queries() == 0
+    views._trigram['checked_at'] -= views.TRIGRAM_RECHECK_SECONDS + 1
+    assert queries() == 1
+    assert queries() == 0
+
+    monkeypatch.setattr(views, '_trigram', {'available': True, 'checked_at': 0})
+    assert queries() == 0
+
+@pytest.mark.django_db
+def test_search_typo(authenticated_client, rows):
+    """pg_trgm があれば語の途中や打ち間違いにも一致する"""
+    if not has_trigram():
+        pytest.skip('pg_trgm is not installed')
+    assert [r['title'] for r in search(authenticated_client, 'meetnig')][0] == 'Weekly meeting'
+
+@pytest.mark.django_db
+def test_search_unspaced_japanese(authenticated_client, test_user):
+    """空白で区切られていない日本語の文中の語も部分一致で見つかる(pg_trgm が無くても)"""
+    Task.objects.create(user=test_user, title='会議室で資料を確認')
+    Schedule.objects.create(user=test_user, title='定例', location='本社ビル3階', date='2025-12-01T10:00:00+09:00')
+    Task.objects.create(user=test_user, title='Review 100%_done')
+
+    assert [r['title'] for r in search(authenticated_client, '資料')] == ['会議室で資料を確認']
+    assert [r['title'] for r in search(authenticated_client, '資料 会議')] == ['会議室で資料を確認']
+    assert [r['title'] for r in search(authenticated_client, 'ビル')] == ['定例']
+    assert search(authenticated_client, '資料 ビル') == []
+    # LIKE のワイルドカードは文字として扱う
+    assert search(authenticated_client, '資料 %') == []
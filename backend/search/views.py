@@ -0,0 +1,144 @@
+import re
+import time
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import CharField, F, FloatField, Q, Value
+from django.db.models.functions import Cast, Coalesce, Greatest
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from bookmarks.models import Bookmark
+from schedules.models import Schedule
+from tasks.models import Task
+
+# (種類, モデル, 表示するタイトル, 補足, 部分一致(トライグラム)の対象)
+SOURCES = [
+    ('tasks', Task, 'title', 'detail', ['title', 'detail']),
+    ('schedules', Schedule, 'title', 'location', ['title', 'memo', 'location']),
+    ('bookmarks', Bookmark, 'name', 'url', ['name', 'url']),
+]
+
+MAX_TERMS = 8
+
+# tsquery の演算子として解釈される文字
+_TSQUERY_SPECIAL = re.compile(r"[&|!():*<>'\\]")
+
+
+# pg_trgm が無かった場合に確認し直すまでの秒数
+TRIGRAM_RECHECK_SECONDS = 60
+
+_trigram = {'available': False, 'checked_at': None}
+
+
+def has_trigram():
+    """
+    pg_trgm が入っているか(無い環境では全文検索のみ。search/migrations/0001 を参照)
+
+    入っていれば以後は確認しない。無ければ TRIGRAM_RECHECK_SECONDS ごとに確認し直し、
+    後から拡張を入れた場合も再起動せずに部分一致を使う
+    """
+    now = time.monotonic()
+    checked_at = _trigram['checked_at']
+    if _trigram['available'] or (checked_at is not None and now - checked_at < TRIGRAM_RECHECK_SECONDS):
+        return _trigram['available']
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        _trigram['available'] = cursor.fetchone() is not None
+    _trigram['checked_at'] = now
+    return _trigram['available']
+
+
+def prefix_query(text):
+    """空白で区切った語がすべて前方一致する tsquery。語が無ければ None"""
+    terms = [_TSQUERY_SPECIAL.sub('', term) for term in text.split()]
+    terms = [term for term in terms if term][:MAX_TERMS]
+    if not terms:
+        return None
+    return SearchQuery(' & '.join(f"'{term}':*" for term in terms), search_type='raw', config='simple')
+
+
+def substring_terms(text):
+    """
+    部分一致でも探す語(非ASCII文字を含む検索語のときだけ)
+
+    日本語は語の間に空白が無く、'simple' 設定では「会議室で資料を確認」全体が1つの語彙素になるため、
+    前方一致の tsquery では「資料」が一致しない。トライグラムの単語類似度も短い語ではしきい値に届かない
+    """
+    if text.isascii():
+        return []
+    return text.split()[:MAX_TERMS]
+
+
+def _source_queryset(user, text, query, terms, trigram, kind, model, title, subtitle, fields):
+    """1種類分の (種類, id, タイトル, 補足, スコア) を スコア順に limit 件取得するクエリ"""
+    match = Q(search_vector=query)
+    if terms:
+        # 各語がいずれかのフィールドに含まれる行(ILIKE は gin_trgm_ops インデックスを使える)
+        contains_all = Q()
+        for term in terms:
+            contains_any = Q()
+            for field in fields:
+                contains_any |= Q(**{f'{field}__ilike_contains': term})
+            contains_all &= contains_any
+        match |= contains_all
+    rank = SearchRank(F('search_vector'), query)
+    if trigram:
+        # 語の途中や打ち間違いはトライグラムの単語類似度で拾い、スコアにも加える
+        for field in fields:
+            match |= Q(**{f'{field}__trigram_word_similar': text})
+        similarity = Greatest(*[TrigramWordSimilarity(text, field) for field in fields])
+        rank = rank + Coalesce(similarity, 0.0, output_field=FloatField())
+    return (
+        model.objects
+        .filter(user=user)
+        .filter(match)
+        .annotate(
+            kind=Value(kind, output_field=CharField()),
+            label=F(title),
+            note=Cast(subtitle, output_field=CharField()),
+            rank=Cast(rank, output_field=FloatField()),
+        )
+        .values_list('kind', 'id', 'label', 'note', 'rank')
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search(request):
+    """
+    タスク・スケジュール・ブックマークの横断検索(クイック検索バー用)
+
+    GET /api/search/?q=資料 確認&limit=20
+
+    各モデルの生成カラム search_vector(GINインデックス)に前方一致の全文検索を行い、
+    pg_trgm があればトライグラムの単語類似度(GINインデックス)で部分一致・打ち間違いも拾う。
+    日本語など非ASCII文字を含む検索語は、空白で区切られていない文中でも見つかるよう部分一致(ILIKE)でも探す。
+    3種類の結果は UNION ALL の1クエリでスコア順に並べて返す。
+    """
+    text = request.query_params.get('q', '').strip()
+    try:
+        limit = int(request.query_params.get('limit', settings.SEARCH_MAX_RESULTS))
+    except ValueError:
+        limit = settings.SEARCH_MAX_RESULTS
+    limit = max(1, min(limit, settings.SEARCH_MAX_RESULTS))
+
+    query = prefix_query(text)
+    if query is None:
+        return Response({'query': text, 'results': []})
+
+    terms = substring_terms(text)
+    trigram = has_trigram()
+    querysets = [
+        _source_queryset(request.user, text, query, terms, trigram, *source).order_by('-rank')[:limit]
+        for source in SOURCES
+    ]
+    rows = querysets[0].union(*querysets[1:], all=True).order_by('-rank', 'kind', '-id')[:limit]
+
+    results = [
+        {'kind': kind, 'id': pk, 'title': label, 'subtitle': note, 'rank': round(rank, 4)}
+        for kind, pk, label, note, rank in rows
+    ]
+    return Response({'query': text, 'results': results})
@@ -0,0 +1,105 @@
+"""
+変更イベントのPub/Sub
+
+タスク・スケジュール・ブックマークの保存/削除をユーザーごとのイベントとして配信する。
+イベントIDは変更番号(ChangeCounter)なので、再接続時は Last-Event-ID から再送するか、
+取りこぼしがあり得る場合は resync イベントで差分同期(/api/sync/?since=)を促す。
+
+ブローカーは settings.EVENTS_BROKER で差し替えられる(複数ワーカー構成ではプロセス間で共有できる実装を使う)。
+"""
+import asyncio
+import threading
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class Broker:
+    """ブローカーのインターフェース"""
+
+    def publish(self, user_id, event):
+        """イベントを配信する(同期コードから呼ばれる)"""
+        raise NotImplementedError
+
+    def subscribe(self, user_id):
+        """購読を開始し、asyncio.Queue を返す(イベントループ上で呼ぶ)"""
+        raise NotImplementedError
+
+    def unsubscribe(self, user_id, queue):
+        raise NotImplementedError
+
+    def replay(self, user_id, last_event_id):
+        """
+        last_event_id より後のイベントを返す
+
+        取りこぼしが無いと言えない場合は None
+        """
+        return None
+
+
+class InProcessBroker(Broker):
+    """プロセス内のPub/Sub(単一ワーカー用)"""
+
+    def __init__(self, history_size=None):
+        self._subscribers = defaultdict(list)
+        self._history = defaultdict(lambda: deque(maxlen=history_size or settings.EVENTS_HISTORY_SIZE))
+        self._lock = threading.Lock()
+
+    def publish(self, user_id, event):
+        with self._lock:
+            self._history[user_id].append(event)
+            subscribers = list(self._subscribers[user_id])
+        # 購読側のイベントループへスレッドセーフに渡す
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def subscribe(self, user_id):
+        queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers[user_id].append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        with self._lock:
+            self._subscribers[user_id] = [
+                subscriber for subscriber in self._subscribers[user_id] if subscriber[1] is not queue
+            ]
+            if not self._subscribers[user_id]:
+                del self._subscribers[user_id]
+
+    def replay(self, user_id, last_event_id):
+        with self._lock:
+            history = list(self._history.get(user_id, ()))
+        # 変更番号は連番なので、履歴が last_event_id の直後から残っていれば再送できる
+        if not history or history[0]['id'] > last_event_id + 1:
+            return None
+        return [event for event in history if event['id'] > last_event_id]
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.EVENTS_BROKER)()
+        return _broker
+
+
+def publish_change(instance, action, seq):
+    """
+    行の保存/削除をコミット後に配信する
+
+    action は 'saved' または 'deleted'
+    """
+    event = {
+        'id': seq,
+        'event': 'change',
+        'data': {'kind': instance._meta.app_label, 'action': action, 'id': instance.pk},
+    }
+    user_id = instance.user_id
+    transaction.on_commit(lambda: get_broker().publish(user_id, event))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from sync.pruning import cutoff, prune_tombstones
+
+
+class Command(BaseCommand):
+    help = '保持期間を過ぎた削除ログ(差分同期用)を削除する(cronなどで定期実行する)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='この日数より古い削除ログを消す(省略時は SYNC_TOMBSTONE_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='1トランザクションで消す件数')
+
+    def handle(self, *args, days, batch_size, **options):
+        pruned = prune_tombstones(cutoff(days), batch_size)
+        self.stdout.write(f'{pruned} tombstone(s) pruned')
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='change_counter', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='ユーザー')),
+                ('seq', models.BigIntegerField(default=0, verbose_name='最新の変更番号')),
+            ],
+            options={
+                'verbose_name': '変更カウンター',
+                'verbose_name_plural': '変更カウンター',
+                'db_table': 'sync_counters',
+            },
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50, verbose_name='種類')),
+                ('object_id', models.BigIntegerField(verbose_name='削除した行のID')),
+                ('seq', models.BigIntegerField(verbose_name='変更番号')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='削除日時')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to=settings.AUTH_USER_MODEL, verbose_name='ユーザー')),
+            ],
+            options={
+                'verbose_name': '削除ログ',
+                'verbose_name_plural': '削除ログ',
+                'db_table': 'sync_tombstones',
+                'ordering': ['seq'],
+                'indexes': [models.Index(fields=['user', 'seq'], name='sync_tombst_user_id_3914b3_idx')],
+            },
+        ),
+    ]
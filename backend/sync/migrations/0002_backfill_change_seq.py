@@ -0,0 +1,39 @@
+from django.db import migrations
+
+MODELS = [('tasks', 'Task'), ('schedules', 'Schedule'), ('bookmarks', 'Bookmark')]
+
+
+def backfill_change_seq(apps, schema_editor):
+    """既存の行にユーザーごとの変更番号を振り、カウンターを作成する"""
+    ChangeCounter = apps.get_model('sync', 'ChangeCounter')
+    counters = {}
+
+    for app_label, model_name in MODELS:
+        model = apps.get_model(app_label, model_name)
+        batch = []
+        for obj in model.objects.order_by('user_id', 'id').only('id', 'user_id').iterator():
+            counters[obj.user_id] = counters.get(obj.user_id, 0) + 1
+            obj.change_seq = counters[obj.user_id]
+            batch.append(obj)
+            if len(batch) >= 1000:
+                model.objects.bulk_update(batch, ['change_seq'])
+                batch = []
+        model.objects.bulk_update(batch, ['change_seq'])
+
+    ChangeCounter.objects.bulk_create(
+        [ChangeCounter(user_id=user_id, seq=seq) for user_id, seq in counters.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0001_initial'),
+        ('tasks', '0002_task_change_seq_task_tasks_user_id_de280b_idx'),
+        ('schedules', '0003_schedule_change_seq_and_more'),
+        ('bookmarks', '0002_bookmark_change_seq_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_change_seq, migrations.RunPython.noop),
+    ]
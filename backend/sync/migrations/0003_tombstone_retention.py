@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:13
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # 既存の大きなテーブルへの書き込みを止めないよう CREATE INDEX CONCURRENTLY で作る
+    atomic = False
+
+    dependencies = [
+        ('sync', '0002_backfill_change_seq'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changecounter',
+            name='pruned_seq',
+            field=models.BigIntegerField(db_default=0, default=0, verbose_name='削除した削除ログの変更番号'),
+        ),
+        AddIndexConcurrently(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted_at'], name='sync_tombst_deleted_f39b14_idx'),
+        ),
+    ]
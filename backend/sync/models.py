@@ -0,0 +1,179 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connection, models, transaction
+from django.db.models import F
+from django.contrib.auth.models import User
+
+
+class ChangeCounterManager(models.Manager):
+    def allocate(self, user_id, count=1):
+        """
+        ユーザーの変更番号を count 個確保し、最後の番号を返す
+
+        カウンター行はトランザクション終了までロックされるため、
+        同じユーザーの変更は番号順にコミットされる
+        """
+        table = self.model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (user_id, seq) VALUES (%s, %s) '
+                f'ON CONFLICT (user_id) DO UPDATE SET seq = {table}.seq + EXCLUDED.seq '
+                f'RETURNING seq',
+                [user_id, count],
+            )
+            return cursor.fetchone()[0]
+
+
+class ChangeCounter(models.Model):
+    """ユーザーごとの変更番号(単調増加)"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='change_counter', verbose_name='ユーザー')
+    seq = models.BigIntegerField(default=0, verbose_name='最新の変更番号')
+    # 保持期間を過ぎて削除した削除ログの最後の番号(これより前の since では差分同期できない)
+    pruned_seq = models.BigIntegerField(default=0, db_default=0, verbose_name='削除した削除ログの変更番号')
+
+    objects = ChangeCounterManager()
+
+    class Meta:
+        db_table = 'sync_counters'
+        verbose_name = '変更カウンター'
+        verbose_name_plural = '変更カウンター'
+
+
+class Tombstone(models.Model):
+    """削除ログ(差分同期で削除を伝える)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tombstones', verbose_name='ユーザー')
+    kind = models.CharField(max_length=50, verbose_name='種類')
+    object_id = models.BigIntegerField(verbose_name='削除した行のID')
+    seq = models.BigIntegerField(verbose_name='変更番号')
+    deleted_at = models.DateTimeField(auto_now_add=True, verbose_name='削除日時')
+
+    class Meta:
+        db_table = 'sync_tombstones'
+        ordering = ['seq']
+        verbose_name = '削除ログ'
+        verbose_name_plural = '削除ログ'
+        indexes = [
+            models.Index(fields=['user', 'seq']),
+            # 保持期間を過ぎたものの削除用(sync/pruning.py)
+            models.Index(fields=['deleted_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id} (seq={self.seq})'
+
+
+class ChangeTrackedModel(models.Model):
+    """
+    保存のたびにユーザーの変更番号を記録するモデル
+
+    version は行ごとの更新回数で、詳細のETagと If-Match による楽観的排他制御に使う
+    (backend_app/versioning.py)。同時の更新と同じ番号にならないよう、加算はDB側で行う
+    """
+    change_seq = models.BigIntegerField(default=0, editable=False, verbose_name='変更番号')
+    version = models.PositiveIntegerField(default=1, editable=False, verbose_name='バージョン')
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        # 番号の確保と保存を同じトランザクションで行い、コミット順と番号順を揃える
+        with transaction.atomic():
+            self.change_seq = ChangeCounter.objects.allocate(self.user_id)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'change_seq', 'version'}
+            if self._state.adding:
+                super().save(*args, **kwargs)
+                return
+            version = self.version
+            self.version = F('version') + 1
+            try:
+                super().save(*args, **kwargs)
+            except BaseException:
+                self.version = version
+                raise
+            self.version = version + 1
+
+    @classmethod
+    def assign_change_seqs(cls, objs):
+        """bulk_create / bulk_update 用にまとめて番号を振る(同じユーザーの行のみ)"""
+        if not objs:
+            return
+        last = ChangeCounter.objects.allocate(objs[0].user_id, len(objs))
+        for seq, obj in enumerate(objs, start=last - len(objs) + 1):
+            obj.change_seq = seq
+
+    @classmethod
+    def bulk_update_changes(cls, objs, fields, batch_size=None):
+        """
+        bulk_update に変更番号の割り当てとバージョンの加算を加えたもの(同じユーザーの行のみ)
+
+        bulk_update では save() が働かないため、変更番号とバージョンもここで書き込む
+        """
+        cls.assign_change_seqs(objs)
+        versions = [obj.version for obj in objs]
+        for obj in objs:
+            obj.version = F('version') + 1
+        try:
+            cls._default_manager.bulk_update(objs, sorted({*fields, 'change_seq', 'version'}), batch_size=batch_size)
+        finally:
+            for obj, version in zip(objs, versions):
+                obj.version = version
+        for obj in objs:
+            obj.version += 1
+
+
+_bulk_deletion = ContextVar('bulk_deletion', default=False)
+
+
+@contextmanager
+def bulk_deletion():
+    """
+    ブロック内の削除では行ごとの削除ログを記録しない
+
+    呼び出し側が record_deletions でまとめて記録し、変更を配信する
+    """
+    token = _bulk_deletion.set(True)
+    try:
+        yield
+    finally:
+        _bulk_deletion.reset(token)
+
+
+def record_deletion(instance, origin=None):
+    """
+    削除ログを記録する
+
+    記録した変更番号を返す。ユーザー自体の削除に伴うカスケード削除と
+    bulk_deletion() 内の削除では記録せず None
+    """
+    origin_model = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    if origin is not None and issubclass(origin_model, User):
+        return None
+    if _bulk_deletion.get():
+        return None
+    tombstone = Tombstone.objects.create(
+        user_id=instance.user_id,
+        kind=instance._meta.label_lower,
+        object_id=instance.pk,
+        seq=ChangeCounter.objects.allocate(instance.user_id),
+    )
+    return tombstone.seq
+
+
+def record_deletions(instances):
+    """
+    同じユーザーの複数行の削除ログを、番号の確保1回と INSERT 1回で記録する
+
+    各行に割り当てた変更番号のリストを返す
+    """
+    if not instances:
+        return []
+    user_id = instances[0].user_id
+    last = ChangeCounter.objects.allocate(user_id, len(instances))
+    seqs = list(range(last - len(instances) + 1, last + 1))
+    Tombstone.objects.bulk_create([
+        Tombstone(user_id=user_id, kind=instance._meta.label_lower, object_id=instance.pk, seq=seq)
+        for instance, seq in zip(instances, seqs)
+    ])
+    return seqs
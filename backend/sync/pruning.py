@@ -0,0 +1,62 @@
+"""
+保持期間を過ぎた削除ログ(Tombstone)の削除(manage.py prune_tombstones)
+
+1バッチ = 1トランザクション = 1文:
+
+    WITH pruned AS (
+        DELETE FROM sync_tombstones WHERE id IN (
+            SELECT id FROM sync_tombstones WHERE deleted_at < <cutoff> ORDER BY deleted_at LIMIT n
+        ) RETURNING user_id, seq
+    )
+    UPDATE sync_counters SET pruned_seq = GREATEST(pruned_seq, <ユーザーの消した最後の番号>) ...
+
+消した番号はユーザーごとに ChangeCounter.pruned_seq に残す。それより前の since での差分同期は
+消した削除を伝えられないため、resync を返して初めから同期し直してもらう(sync/views.py)。
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ChangeCounter, Tombstone
+
+
+def cutoff(days=None):
+    """この日時より前の削除ログが対象"""
+    if days is None:
+        days = settings.SYNC_TOMBSTONE_RETENTION_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def _prune_batch(before, batch_size):
+    """1バッチ分を消し、消した件数を返す(トランザクション内で呼ぶ)"""
+    table = Tombstone._meta.db_table
+    counters = ChangeCounter._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'WITH pruned AS ('
+            f'DELETE FROM {table} WHERE id IN ('
+            f'SELECT id FROM {table} WHERE deleted_at < %s ORDER BY deleted_at LIMIT %s'
+            f') RETURNING user_id, seq'
+            f'), '
+            f'counted AS ('
+            f'UPDATE {counters} SET pruned_seq = GREATEST({counters}.pruned_seq, last.seq) '
+            f'FROM (SELECT user_id, MAX(seq) AS seq FROM pruned GROUP BY user_id) AS last '
+            f'WHERE {counters}.user_id = last.user_id'
+            f') '
+            f'SELECT COUNT(*) FROM pruned',
+            [before, batch_size],
+        )
+        return cursor.fetchone()[0]
+
+
+def prune_tombstones(before, batch_size=1000):
+    """before より前の削除ログをすべて消し、消した件数を返す"""
+    pruned = 0
+    while True:
+        with transaction.atomic():
+            count = _prune_batch(before, batch_size)
+        pruned += count
+        if count < batch_size:
+            return pruned
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
+from django.test import AsyncClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from sync.events import InProcessBroker
+from tasks.models import Task
+
+@pytest.fixture
+def broker(settings, monkeypatch):
+    """テストごとに新しいブローカーを使う"""
+    settings.EVENTS_HEARTBEAT_INTERVAL = 0.1
+    broker = InProcessBroker()
+    monkeypatch.setattr('sync.events._broker', broker)
+    return broker
+
+@pytest.fixture
+def access_token(test_user):
+    return str(RefreshToken.for_user(test_user).access_token)
+
+async def next_event(stream):
+    """ハートビートを読み飛ばして次のイベントを取得"""
+    while True:
+        chunk = (await asyncio.wait_for(anext(stream), 5)).decode()
+        if not chunk.startswith(':'):
+            return chunk
+
+@pytest.mark.django_db
+def test_events_require_authentication(broker):
+    """トークンが無ければ401"""
+    async def run():
+        return await AsyncClient().get('/api/sync/events/')
+
+    assert async_to_sync(run)().status_code == 401
+
+@pytest.mark.django_db
+def test_events_push_changes(broker, access_token, test_user, django_capture_on_commit_callbacks):
+    """保存・削除がイベントとして届き、ハートビートも送られる"""
+    async def run():
+        response = await AsyncClient().get(f'/api/sync/events/?token={access_token}')
+        assert response['Content-Type'] == 'text/event-stream'
+        stream = response.streaming_content
+        assert (await anext(stream)).decode().startswith('retry:')
+        assert (await asyncio.wait_for(anext(stream), 5)) == b': heartbeat\n\n'
+
+        @sync_to_async
+        def change():
+            with django_capture_on_commit_callbacks(execute=True):
+                task = Task.objects.create(user=test_user, title='Task')
+            task_id = task.id
+            with django_capture_on_commit_callbacks(execute=True):
+                task.delete()
+            return task_id
+
+        task_id = await change()
+        saved = await next_event(stream)
+        deleted = await next_event(stream)
+        await stream.aclose()
+        return task_id, saved, deleted
+
+    task_id, saved, deleted = async_to_sync(run)()
+    assert 'event: change' in saved
+    assert f'"kind": "tasks", "action": "saved", "id": {task_id}' in saved
+    assert f'"action": "deleted", "id": {task_id}' in deleted
+
+@pytest.mark.django_db
+def test_events_resume_from_last_event_id(broker, access_token, test_user):
+    """Last-Event-ID 以降のイベントを再送し、再送できなければ resync を送る"""
+    for seq in (1, 2, 3):
+        broker.publish(test_user.pk, {'id': seq, 'event': 'change', 'data': {'id': seq}})
+
+    async def read_first(last_event_id):
+        response = await AsyncClient().get(
+            f'/api/sync/events/?token={access_token}',
+            headers={'Last-Event-ID': str(last_event_id)},
+        )
+        stream = response.streaming_content
+        await anext(stream)
+        event = await next_event(stream)
+        await stream.aclose()
+        return event
+
+    assert async_to_sync(read_first)(1).startswith('id: 2\n')
+
+    broker._history[test_user.pk].popleft()
+    broker._history[test_user.pk].popleft()
+    resync = async_to_sync(read_first)(0)
+    assert 'event: resync' in resync
+    assert '"since": "0"' in resync
+
+@pytest.mark.django_db(transaction=True)
+def test_events_release_db_connection(broker, access_token, test_user):
+    """ストリームの間はDB接続を持ち続けない(認証後すぐにプールへ返す)"""
+    async def run():
+        response = await AsyncClient().get(f'/api/sync/events/?token={access_token}')
+        stream = response.streaming_content
+        await anext(stream)
+        held = await sync_to_async(lambda: connection.connection is not None)()
+        await stream.aclose()
+        return held
+
+    assert async_to_sync(run)() is False
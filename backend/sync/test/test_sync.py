@@ -0,0 +1,107 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+from bookmarks.models import Bookmark
+from sync.models import Tombstone
+from tasks.models import Task
+
+def sync(api_client, token=None):
+    res = api_client.get('/api/sync/', {'since': token} if token else {})
+    assert res.status_code == 200
+    return res.data
+
+@pytest.mark.django_db
+def test_sync_returns_only_changes(authenticated_client, test_user):
+    """前回のトークン以降の変更と削除だけを返す"""
+    api_client = authenticated_client
+    first = Task.objects.create(user=test_user, title='First')
+    Bookmark.objects.create(user=test_user, name='Google', url='https://google.com', iconEmoji='icon', color='#FF0000')
+
+    data = sync(api_client)
+    assert [task['title'] for task in data['tasks']['changed']] == ['First']
+    assert len(data['bookmarks']['changed']) == 1
+    assert data['has_more'] is False
+
+    # 変更が無ければ空でトークンも変わらない
+    unchanged = sync(api_client, data['token'])
+    assert unchanged['token'] == data['token']
+    assert unchanged['tasks'] == {'changed': [], 'deleted': []}
+
+    second = Task.objects.create(user=test_user, title='Second')
+    first_id = first.id
+    first.delete()
+    api_client.post('/api/tasks/batch/', {'update': [{'id': second.id, 'done': True}]}, format='json')
+
+    data = sync(api_client, data['token'])
+    assert [(task['title'], task['done']) for task in data['tasks']['changed']] == [('Second', True)]
+    assert data['tasks']['deleted'] == [first_id]
+    assert data['bookmarks'] == {'changed': [], 'deleted': []}
+
+@pytest.mark.django_db
+def test_sync_has_more(authenticated_client, test_user, settings):
+    """件数の上限を超えた場合は続けて取得できる"""
+    settings.SYNC_MAX_CHANGES = 2
+    for i in range(5):
+        Task.objects.create(user=test_user, title=f'Task {i}')
+
+    titles, token = [], None
+    while True:
+        data = sync(authenticated_client, token)
+        titles += [task['title'] for task in data['tasks']['changed']]
+        token = data['token']
+        if not data['has_more']:
+            break
+    assert titles == [f'Task {i}' for i in range(5)]
+
+@pytest.mark.django_db
+def test_sync_invalid_token(authenticated_client):
+    """不正なトークン"""
+    res = authenticated_client.get('/api/sync/?since=abc')
+    assert res.status_code == 400
+
+@pytest.mark.django_db
+def test_user_deletion_skips_tombstones(test_user):
+    """ユーザー削除のカスケードでは削除ログを残さない"""
+    Task.objects.create(user=test_user, title='Task')
+    User.objects.filter(pk=test_user.pk).delete()
+    assert not Tombstone.objects.exists()
+
+@pytest.mark.django_db
+def test_batch_delete_records_tombstones(authenticated_client, test_user):
+    """一括削除の削除ログはまとめて記録され、差分同期で返る"""
+    tasks = [Task.objects.create(user=test_user, title=f'Task {i}') for i in range(3)]
+    token = sync(authenticated_client)['token']
+
+    res = authenticated_client.post('/api/tasks/batch/', {'delete': [task.id for task in tasks[:2]]}, format='json')
+    assert res.status_code == 200
+    seqs = list(Tombstone.objects.order_by('seq').values_list('seq', flat=True))
+    assert len(seqs) == 2 and seqs[1] == seqs[0] + 1
+
+    data = sync(authenticated_client, token)
+    assert sorted(data['tasks']['deleted']) == sorted(task.id for task in tasks[:2])
+
+@pytest.mark.django_db
+def test_pruned_tombstones_require_resync(authenticated_client, test_user):
+    """保持期間を過ぎた削除ログは消し、それより前のトークンでの差分同期は 410 で初めからの同期を促す"""
+    first, second, third = (Task.objects.create(user=test_user, title=title) for title in ('First', 'Second', 'Third'))
+    first_id, second_id = first.id, second.id
+    old_token = sync(authenticated_client)['token']
+    first.delete()
+    token = sync(authenticated_client, old_token)['token']
+    second.delete()
+    Tombstone.objects.filter(object_id=first_id).update(deleted_at=timezone.now() - timedelta(days=91))
+
+    out = StringIO()
+    call_command('prune_tombstones', stdout=out)
+    assert out.getvalue().strip() == '1 tombstone(s) pruned'
+    assert list(Tombstone.objects.values_list('object_id', flat=True)) == [second_id]
+
+    res = authenticated_client.get('/api/sync/', {'since': old_token})
+    assert res.status_code == 410
+    assert res.data['resync'] is True
+    assert sync(authenticated_client, token)['tasks']['deleted'] == [second_id]
+    assert [task['title'] for task in sync(authenticated_client)['tasks']['changed']] == ['Third']
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'sync'
+
+urlpatterns = [
+    path('', views.sync, name='sync'),
+    path('events/', views.events, name='events'),
+]
@@ -0,0 +1,206 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework_simplejwt.exceptions import InvalidToken
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection
+from django.http import JsonResponse, StreamingHttpResponse
+
+from backend_app.projection import project
+from bookmarks.models import Bookmark
+from bookmarks.serializers import BookmarkSerializer
+from schedules.models import Schedule
+from schedules.serializers import ScheduleSerializer
+from tasks.models import Task
+from tasks.serializers import TaskSerializer
+from users.authentication import CachedJWTAuthentication
+from .events import get_broker
+from .models import ChangeCounter, Tombstone
+
+SOURCES = {
+    'tasks': (Task, TaskSerializer),
+    'schedules': (Schedule, ScheduleSerializer),
+    'bookmarks': (Bookmark, BookmarkSerializer),
+}
+
+
+def _parse_since(request):
+    since = request.query_params.get('since')
+    if not since:
+        # 初回は全件(既存行の変更番号は1以上)
+        return 0
+    try:
+        since = int(since)
+    except ValueError:
+        raise ValidationError({'since': 'Invalid token'})
+    if since < 0:
+        raise ValidationError({'since': 'Invalid token'})
+    return since
+
+
+def _pruned_seq(user):
+    """ユーザーの消した削除ログの最後の番号(sync/pruning.py)"""
+    return ChangeCounter.objects.filter(user=user).values_list('pruned_seq', flat=True).first() or 0
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sync(request):
+    """
+    差分同期
+
+    GET /api/sync/?since=<token>
+
+    token 以降に作成・更新された行と、削除された行のIDを返す。
+    レスポンスの token を次回の since に渡す。has_more が true の場合は続けて取得する。
+    token 以降の削除ログが保持期間を過ぎて消えている場合は 410 と resync を返すので、
+    since を付けずに初めから同期し直す。
+    """
+    since = _parse_since(request)
+    limit = settings.SYNC_MAX_CHANGES
+
+    # 種類ごとに変更番号順で limit + 1 件まで取得(件数は変更量に比例)
+    changed = {
+        name: list(
+            project(model.objects, serializer_class, extra=('change_seq',))
+            .filter(user=request.user, change_seq__gt=since)
+            .order_by('change_seq')[:limit + 1]
+        )
+        for name, (model, serializer_class) in SOURCES.items()
+    }
+    tombstones = list(
+        Tombstone.objects
+        .filter(user=request.user, seq__gt=since)
+        .order_by('seq')[:limit + 1]
+    )
+    # 削除ログを読んだ後に確認する(間に消された場合も見落とさない)
+    if since and since < _pruned_seq(request.user):
+        return Response(
+            {'detail': 'Token is older than the tombstone retention', 'resync': True},
+            status=status.HTTP_410_GONE,
+        )
+
+    # 取り切れなかった種類があれば、全種類をその種類の limit 件目の番号までで揃える
+    seq_lists = [[obj.change_seq for obj in rows] for rows in changed.values()]
+    seq_lists.append([tombstone.seq for tombstone in tombstones])
+    overflowed = [seqs[limit - 1] for seqs in seq_lists if len(seqs) > limit]
+    cutoff = min(overflowed) if overflowed else None
+    if cutoff is not None:
+        changed = {
+            name: [obj for obj in rows if obj.change_seq <= cutoff]
+            for name, rows in changed.items()
+        }
+        tombstones = [tombstone for tombstone in tombstones if tombstone.seq <= cutoff]
+        token = cutoff
+    else:
+        token = max((seq for seqs in seq_lists for seq in seqs), default=since)
+
+    payload = {'token': str(token), 'has_more': cutoff is not None}
+    for name, (model, serializer_class) in SOURCES.items():
+        kind = model._meta.label_lower
+        payload[name] = {
+            'changed': serializer_class(changed[name], many=True).data,
+            'deleted': [tombstone.object_id for tombstone in tombstones if tombstone.kind == kind],
+        }
+    return Response(payload)
+
+
+def _authenticate(request):
+    """
+    Authorization ヘッダーまたは ?token= のJWTでユーザーを取得
+
+    EventSource はヘッダーを付けられないため、クエリパラメータも受け付ける。
+    ストリームの間はDBを使わないため、認証で使った接続はここで閉じてプールに返す
+    (request_finished はストリームを閉じるまで送られず、開いたタブの数だけ接続を占有してしまう)
+    """
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else request.GET.get('token')
+    if not raw_token:
+        return None
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    finally:
+        # トランザクションの中(テストなど)では閉じられない
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def _format_event(event):
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+async def _event_stream(user_id, last_event_id):
+    broker = get_broker()
+    queue = broker.subscribe(user_id)
+    try:
+        yield f'retry: {settings.EVENTS_RETRY_MS}\n\n'
+
+        # 購読開始後に届いたイベントと再送分の重複を除くため、再送したIDを覚えておく
+        replayed = set()
+        if last_event_id is not None:
+            missed = broker.replay(user_id, last_event_id)
+            if missed is None:
+                # 取りこぼしがあり得るので差分同期を促す
+                yield _format_event({
+                    'id': last_event_id,
+                    'event': 'resync',
+                    'data': {'since': str(last_event_id)},
+                })
+            else:
+                for event in missed:
+                    replayed.add(event['id'])
+                    yield _format_event(event)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), settings.EVENTS_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                # プロキシに切断されないよう定期的にコメント行を送る
+                yield ': heartbeat\n\n'
+                continue
+            if event['id'] in replayed:
+                continue
+            yield _format_event(event)
+    finally:
+        broker.unsubscribe(user_id, queue)
+
+
+async def events(request):
+    """
+    変更イベントのストリーム(Server-Sent Events)
+
+    GET /api/sync/events/?token=<access token>
+
+    ASGIサーバー(uvicorn backend_app.asgi:application など)でのみ利用できる。
+    再接続時は Last-Event-ID から再送し、再送できない場合は resync イベントを送る。
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'Event stream requires an ASGI server'}, status=501)
+
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    response = StreamingHttpResponse(
+        _event_stream(user.pk, last_event_id),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
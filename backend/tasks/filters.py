@@ -0,0 +1,14 @@
+from backend_app.params import bool_param
+
+
+def filter_by_done(request, queryset):
+    """
+    タスクを完了状態で絞り込む
+
+    ?done=false    未完了のタスク((user, -created_at) WHERE done = false の部分インデックスを使う)
+    ?done=true     完了したタスク
+    """
+    done = bool_param(request, 'done')
+    if done is None:
+        return queryset
+    return queryset.filter(done=done)
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # 保存する生成列(GeneratedField)の追加はテーブル全体の書き換えになり、その間は
+    # ACCESS EXCLUSIVE ロックで読み書きが止まる(大きなテーブルでは利用の少ない時間に実行する)。
+    # GIN インデックスは書き込みを止めないよう、トランザクションの外で CREATE INDEX CONCURRENTLY で作る
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0002_task_change_seq_task_tasks_user_id_de280b_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('title', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector('detail', config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), output_field=django.contrib.postgres.search.SearchVectorField(), verbose_name='検索用ベクトル'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='tasks_search__eda4a6_gin'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:03
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # 既存の大きなテーブルへの書き込みを止めないよう CREATE INDEX CONCURRENTLY で作る
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0003_task_search_vector_task_tasks_search__eda4a6_gin'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('done', False)), fields=['user', '-created_at'], name='tasks_open_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.db import migrations, models
+
+from ranking.ranks import spread
+
+
+def fill_positions(apps, schema_editor):
+    """既存のタスクに、これまでの一覧と同じ並び(新しい順)の順位を振る"""
+    Task = apps.get_model('tasks', 'Task')
+    user_ids = list(Task.objects.order_by().values_list('user_id', flat=True).distinct())
+    for user_id in user_ids:
+        rows = list(Task.objects.filter(user_id=user_id).order_by('-created_at', '-id').only('id'))
+        for row, position in zip(rows, spread(len(rows))):
+            row.position = position
+        Task.objects.bulk_update(rows, ['position'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_tasks_open_user_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='position',
+            field=models.CharField(blank=True, db_collation='C', editable=False, max_length=255, verbose_name='並び順'),
+        ),
+        migrations.RunPython(fill_positions, migrations.RunPython.noop),
+    ]
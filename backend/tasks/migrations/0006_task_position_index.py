@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # 既存の大きなテーブルへの書き込みを止めないよう CREATE INDEX CONCURRENTLY で作る
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0005_task_position'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(fields=['user', 'position', 'id'], name='tasks_user_id_bc8c0a_idx'),
+        ),
+    ]
@@ -1,7 +1,11 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.contrib.auth.models import User
+from ranking.models import RankedModel
+from sync.models import ChangeTrackedModel
 
-class Task(models.Model):
+class Task(RankedModel, ChangeTrackedModel):
     """タスクモデル"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tasks', verbose_name='ユーザー')
     title = models.CharField(max_length=255, verbose_name='タイトル')
@@ -9,6 +13,16 @@ class Task(models.Model):
     done = models.BooleanField(default=False, verbose_name='完了状態')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='作成日時')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新日時')
+    # 全文検索用(/api/search/)。title を重み A、detail を B としてDBが生成する
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('title', weight='A', config='simple')
+            + SearchVector('detail', weight='B', config='simple')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name='検索用ベクトル',
+    )
 
     class Meta:
         db_table = 'tasks'
@@ -16,7 +30,19 @@ class Task(models.Model):
         verbose_name = 'タスク'
         verbose_name_plural = 'タスク'
         indexes = [
-            models.Index(fields=['user', '-created_at'])
+            models.Index(fields=['user', '-created_at']),
+            # 未完了のタスク一覧(?done=false)とダッシュボード用。完了したタスクが増えても大きくならない
+            models.Index(
+                fields=['user', '-created_at'],
+                condition=models.Q(done=False),
+                name='tasks_open_user_created_idx',
+            ),
+            # 手動の並び順(?order=position)用
+            models.Index(fields=['user', 'position', 'id']),
+            # 差分同期用
+            models.Index(fields=['user', 'change_seq']),
+            # 全文検索用
+            GinIndex(fields=['search_vector']),
         ]
 
     def __str__(self):
@@ -1,17 +1,23 @@
 from rest_framework import serializers
+from backend_app.batch import BulkListSerializer
+from backend_app.metrics import SerializerTimingMixin
+from backend_app.sparse_fields import SparseFieldsMixin
 from .models import Task
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsMixin, SerializerTimingMixin, serializers.ModelSerializer):
     """TaskモデルをJSON形式に変換する"""
 
     class Meta:
         model = Task
 
         # JSONに含めるフィールド
-        fields = ['id', 'title', 'detail', 'done', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'detail', 'done', 'created_at', 'updated_at', 'version', 'position']
         
-        # 読み取り専用(APIで変更できない)フィールド
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        # 読み取り専用(APIで変更できない)フィールド。position は move/ で変更する
+        read_only_fields = ['id', 'created_at', 'updated_at', 'version', 'position']
+
+        # many=True で一括作成・更新する
+        list_serializer_class = BulkListSerializer
 
     def create(self, validated_data):
         # リクエストユーザーを自動設定
@@ -0,0 +1,72 @@
+import pytest
+from rest_framework.test import APIClient
+from tasks.models import Task
+
+@pytest.mark.django_db
+def test_async_task_crud(jwt_client):
+    """非同期版でも同期版と同じ作成・取得・更新・削除ができる"""
+    res = jwt_client.post('/api/async/tasks/', {'title': 'Test', 'detail': 'Detail'}, format='json')
+    assert res.status_code == 201
+    task_id = res.json()['id']
+    assert res.json()['title'] == 'Test'
+
+    res = jwt_client.get(f'/api/async/tasks/{task_id}/')
+    assert res.status_code == 200
+    assert res.json()['detail'] == 'Detail'
+    assert res.has_header('ETag')
+
+    res = jwt_client.put(f'/api/async/tasks/{task_id}/', {'done': True}, format='json')
+    assert res.status_code == 200
+    assert res.json()['done'] is True
+    assert res.json()['title'] == 'Test'
+
+    res = jwt_client.delete(f'/api/async/tasks/{task_id}/')
+    assert res.status_code == 204
+    assert not Task.objects.filter(pk=task_id).exists()
+
+    res = jwt_client.get(f'/api/async/tasks/{task_id}/')
+    assert res.status_code == 404
+
+@pytest.mark.django_db
+def test_async_task_list_matches_sync(jwt_client, test_user):
+    """一覧の本文・ページング・検証子は同期版と同じ"""
+    for i in range(3):
+        Task.objects.create(user=test_user, title=f'タスク {i}')
+
+    sync_res = jwt_client.get('/api/tasks/?page_size=2')
+    async_res = jwt_client.get('/api/async/tasks/?page_size=2')
+    assert async_res.status_code == 200
+    assert async_res.content == sync_res.content
+    assert async_res['ETag'] == sync_res['ETag']
+    cursor = async_res['X-Next-Cursor']
+    assert cursor == sync_res['X-Next-Cursor']
+
+    res = jwt_client.get(f'/api/async/tasks/?page_size=2&cursor={cursor}')
+    assert [task['title'] for task in res.json()] == ['タスク 0']
+
+    res = jwt_client.get('/api/async/tasks/?page_size=2', HTTP_IF_NONE_MATCH=async_res['ETag'])
+    assert res.status_code == 304
+
+@pytest.mark.django_db
+def test_async_task_errors(jwt_client, test_user):
+    """未認証は401、不正な入力は400、他人の行は404"""
+    api_client = APIClient()
+    res = api_client.get('/api/async/tasks/')
+    assert res.status_code == 401
+    assert res['WWW-Authenticate'].startswith('Bearer')
+
+    api_client.credentials(HTTP_AUTHORIZATION='Bearer invalid')
+    assert api_client.get('/api/async/tasks/').status_code == 401
+
+    res = jwt_client.post('/api/async/tasks/', {'detail': 'no title'}, format='json')
+    assert res.status_code == 400
+    assert 'title' in res.json()
+
+    res = jwt_client.get('/api/async/tasks/?cursor=broken')
+    assert res.status_code == 400
+
+    other = Task.objects.create(
+        user=type(test_user).objects.create_user(username='other', password='x'),
+        title='Other',
+    )
+    assert jwt_client.get(f'/api/async/tasks/{other.pk}/').status_code == 404
@@ -0,0 +1,69 @@
+import pytest
+from tasks.models import Task
+
+@pytest.mark.django_db
+def test_task_batch(authenticated_client, test_user, django_assert_max_num_queries):
+    """作成・更新・削除を1リクエストで行う"""
+    api_client = authenticated_client
+    keep = Task.objects.create(user=test_user, title='Keep')
+    remove = Task.objects.create(user=test_user, title='Remove')
+
+    # 件数に関わらずクエリ数は一定
+    with django_assert_max_num_queries(15):
+        res = api_client.post('/api/tasks/batch/', {
+            'create': [{'title': f'New {i}'} for i in range(20)],
+            'update': [{'id': keep.id, 'done': True}],
+            'delete': [remove.id],
+        }, format='json')
+    assert res.status_code == 200
+    assert len(res.data['created']) == 20
+    assert res.data['created'][0]['title'] == 'New 0'
+    assert res.data['updated'][0]['done'] is True
+    assert res.data['deleted'] == [remove.id]
+
+    keep.refresh_from_db()
+    assert keep.done is True
+    assert keep.title == 'Keep'
+    assert not Task.objects.filter(id=remove.id).exists()
+    assert Task.objects.filter(user=test_user).count() == 21
+
+    res = api_client.get('/api/tasks/')
+    assert len(res.data) == 21
+
+@pytest.mark.django_db
+def test_task_batch_validation(authenticated_client, test_user):
+    """1件でも不正なら何も書き込まない"""
+    api_client = authenticated_client
+    task = Task.objects.create(user=test_user, title='Task')
+
+    res = api_client.post('/api/tasks/batch/', {
+        'create': [{'title': 'Valid'}, {'detail': 'No title'}],
+        'update': [{'id': 99999, 'title': 'Missing'}],
+        'delete': [task.id],
+    }, format='json')
+    assert res.status_code == 400
+    assert res.data['create'][0] == {}
+    assert 'title' in res.data['create'][1]
+    assert 'id' in res.data['update'][0]
+    assert Task.objects.filter(user=test_user).count() == 1
+
+@pytest.mark.django_db
+def test_task_batch_rejects_duplicate_and_bool_ids(authenticated_client, test_user):
+    """同じ id の重複と真偽値の id は項目ごとのエラーにして、何も書き込まない"""
+    api_client = authenticated_client
+    task = Task.objects.create(user=test_user, title='Task')
+    other = Task.objects.create(user=test_user, title='Other')
+
+    res = api_client.post('/api/tasks/batch/', {
+        'update': [{'id': task.id, 'done': True}, {'id': task.id, 'title': 'Again'}, {'id': True, 'title': 'Bool'}],
+        'delete': [other.id, other.id, True],
+    }, format='json')
+    assert res.status_code == 400
+    assert res.data['update'][0] == {}
+    assert res.data['update'][1] == {'id': 'Duplicate id'}
+    assert res.data['update'][2] == {'id': 'Expected an id'}
+    assert res.data['delete'] == [{}, {'id': 'Duplicate id'}, {'id': 'Expected an id'}]
+
+    task.refresh_from_db()
+    assert (task.title, task.done, task.version) == ('Task', False, 1)
+    assert Task.objects.filter(user=test_user).count() == 2
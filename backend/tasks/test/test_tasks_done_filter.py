@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from tasks.models import Task
+
+@pytest.fixture
+def tasks(test_user):
+    Task.objects.create(user=test_user, title='Open 1')
+    Task.objects.create(user=test_user, title='Done', done=True)
+    Task.objects.create(user=test_user, title='Open 2')
+
+def titles(res):
+    assert res.status_code == 200
+    data = res.data if hasattr(res, 'data') else res.json()
+    return [task['title'] for task in data]
+
+@pytest.mark.django_db
+def test_task_done_filter(authenticated_client, tasks):
+    """?done= で完了状態を絞り込む"""
+    assert titles(authenticated_client.get('/api/tasks/?done=false')) == ['Open 2', 'Open 1']
+    assert titles(authenticated_client.get('/api/tasks/?done=0')) == ['Open 2', 'Open 1']
+    assert titles(authenticated_client.get('/api/tasks/?done=True')) == ['Done']
+    assert titles(authenticated_client.get('/api/tasks/')) == ['Open 2', 'Done', 'Open 1']
+
+    res = authenticated_client.get('/api/tasks/?done=maybe')
+    assert res.status_code == 400
+    assert 'done' in res.data
+
+@pytest.mark.django_db
+def test_task_done_filter_cache(authenticated_client, tasks, test_user):
+    """絞り込みごとにキャッシュ・ETagが分かれ、完了にすると一覧から外れる"""
+    open_etag = authenticated_client.get('/api/tasks/?done=false')['ETag']
+    assert authenticated_client.get('/api/tasks/?done=true')['ETag'] != open_etag
+
+    task = Task.objects.get(title='Open 1')
+    authenticated_client.put(f'/api/tasks/{task.id}/', {'done': True}, format='json')
+    res = authenticated_client.get('/api/tasks/?done=false', HTTP_IF_NONE_MATCH=open_etag)
+    assert titles(res) == ['Open 2']
+
+@pytest.mark.django_db
+def test_task_done_filter_last_modified(authenticated_client, jwt_client, tasks, test_user):
+    """絞り込みから外れた行の更新でも Last-Modified が進み、If-Modified-Since だけでも 304 にならない"""
+    an_hour_ago = timezone.now() - timedelta(hours=1)
+    Task.objects.update(updated_at=an_hour_ago)
+    cache.set(f'deleted_at:tasks.task:{test_user.pk}', an_hour_ago, None)
+    res = authenticated_client.get('/api/tasks/?done=false')
+    last_modified = res['Last-Modified']
+    assert authenticated_client.get('/api/tasks/?done=false', HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 304
+
+    task = Task.objects.get(title='Open 1')
+    authenticated_client.put(f'/api/tasks/{task.id}/', {'done': True}, format='json')
+    res = authenticated_client.get('/api/tasks/?done=false', HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert titles(res) == ['Open 2']
+    assert res['Last-Modified'] != last_modified
+
+    # 非同期版も同じ
+    res = jwt_client.get('/api/async/tasks/?done=false', HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert res.status_code == 200
+
+@pytest.mark.django_db
+def test_task_done_filter_async(jwt_client, tasks):
+    """非同期版でも同じ"""
+    assert titles(jwt_client.get('/api/async/tasks/?done=false')) == ['Open 2', 'Open 1']
+    assert jwt_client.get('/api/async/tasks/?done=maybe').status_code == 400
+
+@pytest.mark.django_db
+def test_open_tasks_use_partial_index(test_user, query_budget, jwt_client, tasks):
+    """未完了のタスク一覧は部分インデックスで取得し、クエリ数は件数によらない"""
+    Task.objects.bulk_create([Task(user=test_user, title=f'Done {i}', done=True) for i in range(50)])
+    query = Task.objects.filter(user=test_user, done=False).order_by('-created_at', '-id')[:10]
+    with connection.cursor() as cursor:
+        # 小さなテーブルでは順次走査が選ばれるため無効にして確認する
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        assert 'tasks_open_user_created_idx' in query.explain()
+        cursor.execute('RESET enable_seqscan')
+
+    query_budget(3, lambda: jwt_client.get('/api/tasks/?done=false'), grow=lambda: Task.objects.create(user=test_user, title='More'))
@@ -0,0 +1,101 @@
+import pytest
+from sync.models import ChangeCounter
+from tasks.models import Task
+
+@pytest.fixture
+def task(test_user):
+    return Task.objects.create(user=test_user, title='Task')
+
+@pytest.mark.django_db
+def test_put_with_if_match(authenticated_client, task):
+    """If-Match のバージョンが一致すれば更新し、新しいETagを返す。古いETagでの更新は 412"""
+    res = authenticated_client.get(f'/api/tasks/{task.pk}/')
+    etag = res['ETag']
+    assert etag == '"1"' and res.data['version'] == 1
+
+    res = authenticated_client.put(f'/api/tasks/{task.pk}/', {'done': True}, format='json', HTTP_IF_MATCH=etag)
+    assert res.status_code == 200
+    assert res.data['done'] is True and res.data['title'] == 'Task'
+    assert res.data['version'] == 2
+    assert res['ETag'] == '"2"'
+
+    # 他のクライアントが先に更新していれば上書きしない
+    res = authenticated_client.put(f'/api/tasks/{task.pk}/', {'title': 'Stale'}, format='json', HTTP_IF_MATCH=etag)
+    assert res.status_code == 412
+    task.refresh_from_db()
+    assert task.title == 'Task' and task.version == 2
+
+    # 返されたETagはそのまま次の If-Match と条件付きGETに使える
+    res = authenticated_client.get(f'/api/tasks/{task.pk}/', HTTP_IF_NONE_MATCH='"2"')
+    assert res.status_code == 304
+
+@pytest.mark.django_db
+def test_if_match_variants(authenticated_client, task):
+    """* はバージョンを問わず、複数のETagはいずれかと一致すればよい。弱いETagは一致しない"""
+    url = f'/api/tasks/{task.pk}/'
+    assert authenticated_client.put(url, {'done': True}, format='json', HTTP_IF_MATCH='W/"1"').status_code == 412
+    assert authenticated_client.put(url, {'done': True}, format='json', HTTP_IF_MATCH='"abc"').status_code == 412
+    assert authenticated_client.put(url, {'done': True}, format='json', HTTP_IF_MATCH='"5", "1"').status_code == 200
+    assert authenticated_client.put(url, {'done': False}, format='json', HTTP_IF_MATCH='*').status_code == 200
+    task.refresh_from_db()
+    assert task.version == 3
+
+@pytest.mark.django_db
+def test_put_missing_row(authenticated_client, task):
+    """存在しない行は If-Match があれば 412、無ければ従来どおり 404。変更番号も消費しない"""
+    url = f'/api/tasks/{task.pk + 1}/'
+    assert authenticated_client.put(url, {'done': True}, format='json').status_code == 404
+    assert authenticated_client.put(url, {'done': True}, format='json', HTTP_IF_MATCH='*').status_code == 412
+    assert ChangeCounter.objects.get(user=task.user).seq == task.change_seq
+
+@pytest.mark.django_db
+def test_put_invalid_data(authenticated_client, task):
+    """検証エラーは 400(バージョンは進めない)"""
+    res = authenticated_client.put(f'/api/tasks/{task.pk}/', {'title': ''}, format='json', HTTP_IF_MATCH='"1"')
+    assert res.status_code == 400
+    task.refresh_from_db()
+    assert task.version == 1
+
+@pytest.mark.django_db
+def test_other_writes_bump_version(authenticated_client, task):
+    """save()・一括更新・並べ替えでもバージョンが進み、古いETagでの更新は 412 になる"""
+    task.title = 'Saved'
+    task.save()
+    assert task.version == 2
+
+    res = authenticated_client.post('/api/tasks/batch/', {'update': [{'id': task.pk, 'done': True}]}, format='json')
+    assert res.data['updated'][0]['version'] == 3
+
+    other = Task.objects.create(user=task.user, title='Other')
+    res = authenticated_client.post(f'/api/tasks/{task.pk}/move/', {'after': other.pk}, format='json')
+    assert res.data['version'] == 4
+
+    task.refresh_from_db()
+    assert task.version == 4
+    res = authenticated_client.put(f'/api/tasks/{task.pk}/', {'done': False}, format='json', HTTP_IF_MATCH='"3"')
+    assert res.status_code == 412
+
+@pytest.mark.django_db
+def test_put_invalidates_list_cache(authenticated_client, task):
+    """UPDATE で更新しても一覧のキャッシュは無効化される"""
+    authenticated_client.get('/api/tasks/')
+    assert authenticated_client.get('/api/tasks/')['X-Cache'] == 'HIT'
+
+    authenticated_client.put(f'/api/tasks/{task.pk}/', {'title': 'Updated'}, format='json', HTTP_IF_MATCH='"1"')
+    res = authenticated_client.get('/api/tasks/')
+    assert res['X-Cache'] == 'MISS'
+    assert res.data[0]['title'] == 'Updated'
+
+@pytest.mark.django_db
+def test_async_put_with_if_match(jwt_client, task):
+    """非同期版も同じ条件で更新する"""
+    url = f'/api/async/tasks/{task.pk}/'
+    res = jwt_client.get(url)
+    etag = res['ETag']
+
+    res = jwt_client.put(url, {'done': True}, format='json', HTTP_IF_MATCH=etag)
+    assert res.status_code == 200
+    assert res.json()['version'] == 2 and res['ETag'] == '"2"'
+
+    assert jwt_client.put(url, {'done': False}, format='json', HTTP_IF_MATCH=etag).status_code == 412
+    assert jwt_client.put(f'/api/async/tasks/{task.pk + 1}/', {'done': False}, format='json').status_code == 404
@@ -0,0 +1,37 @@
+import pytest
+from tasks.models import Task
+
+@pytest.mark.django_db
+def test_task_list_cursor_pagination(authenticated_client, test_user):
+    """カーソルで全ページを重複・欠落なく辿れる"""
+    api_client = authenticated_client
+    for i in range(5):
+        Task.objects.create(user=test_user, title=f'Task {i}')
+
+    # 同じ作成日時の行は id の降順で並ぶ
+    created_at = Task.objects.first().created_at
+    Task.objects.filter(user=test_user).update(created_at=created_at)
+
+    seen = []
+    url = '/api/tasks/?page_size=2'
+    while True:
+        res = api_client.get(url)
+        assert res.status_code == 200
+        assert len(res.data) <= 2
+        seen += [task['id'] for task in res.data]
+        cursor = res.get('X-Next-Cursor')
+        if not cursor:
+            assert not res.has_header('Link')
+            break
+        assert 'rel="next"' in res['Link']
+        url = f'/api/tasks/?page_size=2&cursor={cursor}'
+
+    expected = list(Task.objects.filter(user=test_user).order_by('-id').values_list('id', flat=True))
+    assert seen == expected
+
+@pytest.mark.django_db
+def test_task_list_invalid_cursor(authenticated_client):
+    """不正なカーソル"""
+    res = authenticated_client.get('/api/tasks/?cursor=invalid')
+    assert res.status_code == 400
+    assert 'cursor' in res.data
@@ -0,0 +1,42 @@
+import pytest
+from tasks.models import Task
+
+def add_tasks(user, count=5):
+    for i in range(count):
+        Task.objects.create(user=user, title=f'Task {i}')
+
+@pytest.mark.django_db
+def test_task_read_query_budget(jwt_client, test_user, query_budget):
+    """一覧・詳細のクエリ数は件数によらない"""
+    add_tasks(test_user)
+    task = Task.objects.first()
+    query_budget(3, lambda: jwt_client.get('/api/tasks/'), grow=lambda: add_tasks(test_user))
+    query_budget(2, lambda: jwt_client.get(f'/api/tasks/{task.pk}/'))
+
+@pytest.mark.django_db
+def test_task_write_query_budget(jwt_client, test_user, query_budget):
+    """作成・更新・削除のクエリ数"""
+    add_tasks(test_user, 1)
+    task = Task.objects.first()
+    # 作成は先頭の順位の取得(ranking)を含む
+    query_budget(6, lambda: jwt_client.post('/api/tasks/', {'title': 'New'}, format='json'))
+    # 更新は事前に読まず UPDATE ... RETURNING 1回(versioning.py)
+    query_budget(5, lambda: jwt_client.put(f'/api/tasks/{task.pk}/', {'done': True}, format='json'))
+    query_budget(5, lambda: jwt_client.delete(f'/api/tasks/{task.pk}/'))
+
+@pytest.mark.django_db
+def test_task_batch_query_budget(jwt_client, test_user, query_budget):
+    """一括操作のクエリ数は操作の件数によらない"""
+    payload = {}
+
+    def prepare(n):
+        add_tasks(test_user, n * 2)
+        ids = list(Task.objects.filter(user=test_user).order_by('-id').values_list('id', flat=True))
+        payload.update({
+            'create': [{'title': f'New {i}'} for i in range(n)],
+            'update': [{'id': pk, 'done': True} for pk in ids[:n]],
+            'delete': ids[n:n * 2],
+        })
+
+    prepare(2)
+    query_budget(14, lambda: jwt_client.post('/api/tasks/batch/', payload, format='json'), grow=lambda: prepare(6))
@@ -5,5 +5,7 @@ app_name = 'tasks'
 
 urlpatterns = [
     path('', views.task_list, name='task_list'),
+    path('batch/', views.task_batch, name='task_batch'),
     path('<int:pk>/', views.task_detail, name='task_detail'),
+    path('<int:pk>/move/', views.task_move, name='task_move'),
 ]
\ No newline at end of file
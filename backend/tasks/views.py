@@ -2,6 +2,17 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from backend_app.batch import batch_response
+from backend_app.conditional import object_validators
+from archive.detail import archived_detail_response, archived_update_response
+from archive.models import ArchivedTask, TaskWithArchive
+from backend_app.listing import list_response
+from backend_app.params import INCLUDE_ARCHIVED_PARAM, bool_param
+from backend_app.projection import project
+from backend_app.sparse_fields import fields_validators, requested_fields
+from backend_app.versioning import update_response
+from ranking.moves import move_response
+from .filters import filter_by_done
 from .models import Task
 from .serializers import TaskSerializer
 
@@ -10,10 +21,10 @@ from .serializers import TaskSerializer
 def task_list(request):
     """タスク一覧取得・作成"""
     if request.method == 'GET':
-        # ログインユーザーのタスクのみ取得
-        tasks = Task.objects.filter(user=request.user)
-        serializer = TaskSerializer(tasks, many=True)
-        return Response(serializer.data)
+        # ログインユーザーのタスクのみ取得(?include_archived=true ではアーカイブしたタスクも含める)
+        source = TaskWithArchive if bool_param(request, INCLUDE_ARCHIVED_PARAM) else Task
+        tasks = filter_by_done(request, source.objects.filter(user=request.user))
+        return list_response(request, tasks, TaskSerializer, Task)
     
     elif request.method == 'POST':
         serializer = TaskSerializer(data=request.data, context={'request': request})
@@ -22,26 +33,50 @@ def task_list(request):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def task_batch(request):
+    """タスク一括作成・更新・削除"""
+    tasks = Task.objects.filter(user=request.user)
+    return batch_response(request, tasks, TaskSerializer)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def task_move(request, pk):
+    """タスクの並べ替え(移動した1行だけ更新する)"""
+    tasks = Task.objects.filter(user=request.user)
+    return move_response(request, tasks, TaskSerializer, pk)
+
 @api_view(['GET', 'PUT', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def task_detail(request, pk):
     """タスク詳細取得・更新・削除"""
+    # ログインユーザーのタスクのみ取得
+    tasks = Task.objects.filter(user=request.user)
+    if request.method == 'PUT':
+        # 事前に読まず、If-Match のバージョンを条件にした UPDATE 1回で更新する
+        response = update_response(request, tasks, TaskSerializer, pk)
+        # アーカイブした行は更新できない(409)
+        return archived_update_response(request, ArchivedTask, response, pk)
+
+    fields = None
+    if request.method == 'GET':
+        # 取得のみの場合はシリアライズするカラム(とETagに使うバージョン・更新日時)だけを読む
+        fields = requested_fields(request, TaskSerializer)
+        tasks = project(tasks, TaskSerializer, ('updated_at', 'version'), fields)
     try:
-        # ログインユーザーのタスクのみ取得
-        task = Task.objects.get(pk=pk, user=request.user)
+        task = tasks.get(pk=pk)
     except Task.DoesNotExist:
-        return Response(status=status.HTTP_404_NOT_FOUND)
+        # アーカイブした行は読み取り専用で返す
+        return archived_detail_response(request, ArchivedTask, TaskSerializer, pk)
     
     if request.method == 'GET':
-        serializer = TaskSerializer(task)
-        return Response(serializer.data)
-    
-    elif request.method == 'PUT':
-        serializer = TaskSerializer(task, data=request.data, partial=True)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        validators = fields_validators(object_validators(task), fields)
+        response = validators.not_modified(request)
+        if response is None:
+            serializer = TaskSerializer(task, fields=fields)
+            response = Response(serializer.data)
+        return validators.apply(response)
     
     elif request.method == 'DELETE':
         task.delete()
@@ -0,0 +1,94 @@
+"""
+JWT認証(ユーザーをプロセス内キャッシュから解決する)
+
+SimpleJWT の JWTAuthentication は毎リクエスト User をSELECTする。
+ここでは user_id とトークンのバージョン(パスワード変更で変わる REVOKE_TOKEN_CLAIM)
+ごとに短時間キャッシュし、User / UserProfile の変更時に破棄する。
+キャッシュが無い場合はDBから取得する(プロフィールも JOIN で同時に取得する)。
+"""
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+def _cache():
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+def _cache_key(user_id):
+    return f'jwt_user:{user_id}'
+
+
+def invalidate_user(user_id):
+    """キャッシュしたユーザーを破棄"""
+    _cache().delete(_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """ユーザーの取得結果をキャッシュする JWTAuthentication"""
+
+    def _user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+    def _users(self):
+        # プロフィールも1回のJOINで取得し、キャッシュに含める(/api/auth/me/ で追加のクエリを出さない)
+        return self.user_model.objects.select_related('profile')
+
+    def _check_user(self, user, token_version):
+        """JWTAuthentication.get_user と同じ検証(有効・パスワード変更)"""
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and token_version != get_md5_hash_password(user.password):
+            raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+
+    def get_user(self, validated_token):
+        user_id = self._user_id(validated_token)
+        key = _cache_key(user_id)
+        token_version = validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+        cached = _cache().get(key)
+        if cached is not None and cached[0] == token_version:
+            return cached[1]
+
+        # キャッシュに無ければ通常の検証(存在・有効・パスワード変更)を行う
+        try:
+            user = self._users().get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        self._check_user(user, token_version)
+        _cache().set(key, (token_version, user))
+        return user
+
+    async def aget_user(self, validated_token):
+        """get_user の非同期版"""
+        user_id = self._user_id(validated_token)
+        key = _cache_key(user_id)
+        token_version = validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+        cached = await _cache().aget(key)
+        if cached is not None and cached[0] == token_version:
+            return cached[1]
+
+        try:
+            user = await self._users().aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        self._check_user(user, token_version)
+        await _cache().aset(key, (token_version, user))
+        return user
+
+    async def aauthenticate(self, request):
+        """authenticate の非同期版(ヘッダーが無ければ None)"""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
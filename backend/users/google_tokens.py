@@ -0,0 +1,115 @@
+"""
+GoogleのIDトークン検証
+
+- 証明書は Cache-Control の max-age の間キャッシュし、毎回の取得をなくす
+- HTTP接続は requests.Session でプールして使い回す(タイムアウトは GOOGLE_CERTS_TIMEOUT)
+- 検証に成功したトークンはハッシュをキーに短時間だけ結果を保持する
+"""
+import hashlib
+import re
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from google.auth import transport
+from google.auth.transport import requests as google_requests
+from google.oauth2 import id_token
+
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+class _CachedResponse(transport.Response):
+    """キャッシュした証明書のレスポンス"""
+
+    def __init__(self, status, headers, data):
+        self._status = status
+        self._headers = headers
+        self._data = data
+
+    @property
+    def status(self):
+        return self._status
+
+    @property
+    def headers(self):
+        return self._headers
+
+    @property
+    def data(self):
+        return self._data
+
+
+class CachingRequest(transport.Request):
+    """GETのレスポンスを Cache-Control の max-age までキャッシュする transport.Request"""
+
+    def __init__(self, session=None):
+        self._request = google_requests.Request(session=session or requests.Session())
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, url, method='GET', body=None, headers=None, timeout=None, **kwargs):
+        # None をそのまま渡すとタイムアウト無しになり、応答しない場合にワーカーが止まる
+        if timeout is None:
+            timeout = settings.GOOGLE_CERTS_TIMEOUT
+        if method != 'GET' or body is not None:
+            return self._request(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+
+        now = time.monotonic()
+        with self._lock:
+            expires_at, cached = self._cache.get(url, (0, None))
+        if cached is not None and expires_at > now:
+            return cached
+
+        response = self._request(url, method=method, headers=headers, timeout=timeout, **kwargs)
+        match = _MAX_AGE.search(response.headers.get('Cache-Control', ''))
+        if response.status != 200 or not match:
+            return response
+
+        cached = _CachedResponse(response.status, dict(response.headers), response.data)
+        with self._lock:
+            self._cache[url] = (now + int(match.group(1)), cached)
+        return cached
+
+    def clear(self):
+        """キャッシュした証明書を破棄"""
+        with self._lock:
+            self._cache.clear()
+
+
+# プロセス内で共有する(証明書キャッシュとコネクションプールを使い回す)
+certs_request = CachingRequest()
+
+
+def _cache_key(token):
+    return 'google_idinfo:' + hashlib.sha256(token.encode()).hexdigest()
+
+
+def verify_google_id_token(token):
+    """
+    GoogleのIDトークンを検証してクレームを返す
+
+    不正なトークンの場合は ValueError
+    """
+    key = _cache_key(token)
+    idinfo = cache.get(key)
+    if idinfo is not None:
+        return idinfo
+
+    idinfo = id_token.verify_token(
+        token,
+        certs_request,
+        audience=settings.GOOGLE_CLIENT_ID,
+        certs_url=settings.GOOGLE_CERTS_URL,
+    )
+    if idinfo.get('iss') not in GOOGLE_ISSUERS:
+        raise ValueError(f"Wrong issuer: {idinfo.get('iss')}")
+
+    # トークンの有効期限を超えて保持しない
+    timeout = min(settings.GOOGLE_TOKEN_CACHE_TIMEOUT, int(idinfo['exp'] - time.time()))
+    if timeout > 0:
+        cache.set(key, idinfo, timeout)
+    return idinfo
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from backend_app.metrics import SerializerTimingMixin
 from .models import UserProfile
 
 
@@ -12,7 +13,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """User のシリアライザー"""
     profile = UserProfileSerializer(read_only=True)
     
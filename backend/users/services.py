@@ -0,0 +1,66 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .authentication import invalidate_user
+from .models import UserProfile
+
+
+def _split_name(name):
+    parts = name.split()
+    return (parts[0] if parts else '', ' '.join(parts[1:]))
+
+
+@transaction.atomic
+def login_google_user(idinfo):
+    """
+    Googleのクレームからユーザーとプロフィールを作成・更新し、ログイン日時を記録する
+
+    1トランザクションで実行し、書き込みは変更のあった列だけにする。
+    既存ユーザーでプロフィールに変更が無ければ SELECT 1回と last_login の UPDATE 1回で済む。
+    """
+    email = idinfo['email']
+    picture = idinfo.get('picture', '')
+    locale = idinfo.get('locale', 'ja')
+    now = timezone.now()
+
+    # プロフィールもJOINで同時に取得
+    user = User.objects.select_related('profile').filter(email=email).first()
+
+    if user is None:
+        # 同時ログインでも重複しないよう INSERT ... ON CONFLICT で作成
+        first_name, last_name = _split_name(idinfo.get('name', ''))
+        user = User.objects.bulk_create(
+            [User(username=email, email=email, first_name=first_name, last_name=last_name, last_login=now)],
+            update_conflicts=True,
+            unique_fields=['username'],
+            update_fields=['last_login'],
+        )[0]
+        profile = None
+    else:
+        profile = getattr(user, 'profile', None)
+        user.last_login = now
+        user.save(update_fields=['last_login'])
+
+    if profile is None:
+        profile = UserProfile.objects.bulk_create(
+            [UserProfile(user=user, google_user_id=idinfo.get('sub'), picture_url=picture, locale=locale)],
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['picture_url', 'locale', 'updated_at'],
+        )[0]
+        # bulk_create(既存ユーザーへの ON CONFLICT を含む)は post_save を送らないため、
+        # プロフィール無しでキャッシュされた認証ユーザーをここで破棄する
+        invalidate_user(user.pk)
+    else:
+        changed = [
+            field for field, value in (('picture_url', picture), ('locale', locale))
+            if getattr(profile, field) != value
+        ]
+        if changed:
+            profile.picture_url = picture
+            profile.locale = locale
+            profile.save(update_fields=[*changed, 'updated_at'])
+
+    user.profile = profile
+    return user
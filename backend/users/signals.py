@@ -0,0 +1,15 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .authentication import invalidate_user
+from .models import UserProfile
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    """ユーザーの変更で認証キャッシュを破棄"""
+    invalidate_user(instance.pk)
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def profile_changed(sender, instance, **kwargs):
+    """プロフィールの変更で認証キャッシュを破棄"""
+    invalidate_user(instance.user_id)
@@ -0,0 +1,50 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.services import login_google_user
+
+def count_user_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        res = client.get(url)
+    assert res.status_code == 200
+    return len([q for q in queries if 'FROM "auth_user"' in q['sql']])
+
+@pytest.mark.django_db
+def test_user_is_cached(jwt_client):
+    """2回目以降はユーザーをDBから取得しない"""
+    assert count_user_queries(jwt_client, '/api/tasks/') == 1
+    assert count_user_queries(jwt_client, '/api/tasks/') == 0
+
+@pytest.mark.django_db
+def test_user_cache_invalidation(jwt_client, test_user):
+    """ユーザーの変更でキャッシュが破棄される"""
+    jwt_client.get('/api/auth/me/')
+
+    test_user.first_name = 'Hanako'
+    test_user.save()
+    res = jwt_client.get('/api/auth/me/')
+    assert res.data['first_name'] == 'Hanako'
+
+    test_user.is_active = False
+    test_user.save()
+    res = jwt_client.get('/api/auth/me/')
+    assert res.status_code == 401
+
+@pytest.mark.django_db
+def test_google_login_upsert_invalidates_user_cache():
+    """
+    既存ユーザーへの INSERT ... ON CONFLICT(同時の初回ログイン)とプロフィールの作成は
+    bulk_create でシグナルが送られないが、キャッシュは破棄される
+    """
+    user = User.objects.create_user(username='race@example.com', password='testpass123')
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    assert client.get('/api/auth/me/').data['profile'] is None
+
+    # メールアドレスでは見つからず、ユーザー名の衝突で既存の行を更新する
+    login_google_user({'sub': 'google-1', 'email': 'race@example.com', 'locale': 'en'})
+    res = client.get('/api/auth/me/')
+    assert res.data['profile']['locale'] == 'en'
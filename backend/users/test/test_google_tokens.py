@@ -0,0 +1,123 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+
+import pytest
+import rsa
+from google.auth import crypt, jwt
+from google.auth.exceptions import TransportError
+from users.google_tokens import certs_request, verify_google_id_token
+
+CLIENT_ID = 'test-client-id'
+
+@pytest.fixture(scope='module')
+def keys():
+    """テスト用のRSA鍵(生成に時間がかかるのでモジュールで共有)"""
+    public_key, private_key = rsa.newkeys(1024)
+    return public_key.save_pkcs1().decode(), private_key.save_pkcs1().decode()
+
+@pytest.fixture
+def cert_server(keys, settings):
+    """Googleの証明書エンドポイントのスタブ"""
+    public_pem, _ = keys
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            body = json.dumps({'test-key': public_pem}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'public, max-age=3600')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.GOOGLE_CERTS_URL = f'http://127.0.0.1:{server.server_port}/certs'
+    settings.GOOGLE_CLIENT_ID = CLIENT_ID
+    certs_request.clear()
+    yield hits
+    server.shutdown()
+    certs_request.clear()
+
+def make_token(keys, **claims):
+    _, private_pem = keys
+    now = int(time.time())
+    payload = {
+        'iss': 'https://accounts.google.com',
+        'aud': CLIENT_ID,
+        'sub': '1234567890',
+        'email': 'google@example.com',
+        'name': 'Taro Yamada',
+        'iat': now,
+        'exp': now + 3600,
+        **claims,
+    }
+    signer = crypt.RSASigner.from_string(private_pem, key_id='test-key')
+    return jwt.encode(signer, payload).decode()
+
+def test_certs_are_cached(keys, cert_server):
+    """証明書は max-age の間は再取得しない"""
+    assert verify_google_id_token(make_token(keys, sub='1'))['sub'] == '1'
+    assert verify_google_id_token(make_token(keys, sub='2'))['sub'] == '2'
+    assert len(cert_server) == 1
+
+def test_verified_token_is_memoized(keys, cert_server, monkeypatch):
+    """検証済みのトークンは署名検証を繰り返さない"""
+    token = make_token(keys)
+    verify_google_id_token(token)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('verified twice')
+
+    monkeypatch.setattr('google.oauth2.id_token.verify_token', fail)
+    assert verify_google_id_token(token)['email'] == 'google@example.com'
+
+def test_wrong_issuer(keys, cert_server):
+    """発行者がGoogleでないトークン"""
+    with pytest.raises(ValueError):
+        verify_google_id_token(make_token(keys, iss='https://example.com'))
+
+@pytest.mark.django_db
+def test_google_auth(keys, cert_server, api_client):
+    """スタブの証明書でログインできる"""
+    res = api_client.post('/api/auth/google/', {'id_token': make_token(keys)}, format='json')
+    assert res.status_code == 200
+    assert res.data['user']['email'] == 'google@example.com'
+    assert res.data['user']['profile']['google_user_id'] == '1234567890'
+    assert res.data['access']
+
+    res = api_client.post('/api/auth/google/', {'id_token': 'invalid'}, format='json')
+    assert res.status_code == 400
+
+def test_slow_certs_time_out(keys, settings):
+    """証明書エンドポイントが応答しなければ GOOGLE_CERTS_TIMEOUT で打ち切る"""
+    release = threading.Event()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            release.wait(5)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.GOOGLE_CERTS_URL = f'http://127.0.0.1:{server.server_port}/certs'
+    settings.GOOGLE_CLIENT_ID = CLIENT_ID
+    settings.GOOGLE_CERTS_TIMEOUT = 0.2
+    certs_request.clear()
+    started = time.monotonic()
+    try:
+        with pytest.raises(TransportError):
+            verify_google_id_token(make_token(keys))
+    finally:
+        release.set()
+        server.shutdown()
+    assert time.monotonic() - started < 2
@@ -0,0 +1,57 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from users.models import UserProfile
+from users.services import login_google_user
+
+IDINFO = {
+    'sub': 'google-123',
+    'email': 'login@example.com',
+    'name': 'Taro Yamada',
+    'picture': 'https://example.com/a.png',
+    'locale': 'ja',
+}
+
+def login(idinfo):
+    """SAVEPOINT などを除いたSQLを記録しながらログイン"""
+    with CaptureQueriesContext(connection) as queries:
+        user = login_google_user(idinfo)
+    statements = [
+        q['sql'].split()[0] for q in queries
+        if not q['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))
+    ]
+    return user, statements
+
+@pytest.mark.django_db
+def test_first_login_creates_user_and_profile():
+    """初回ログインは SELECT 1回と INSERT 2回"""
+    user, statements = login(IDINFO)
+    assert statements == ['SELECT', 'INSERT', 'INSERT']
+    assert user.username == 'login@example.com'
+    assert (user.first_name, user.last_name) == ('Taro', 'Yamada')
+    assert user.last_login is not None
+    assert user.profile.google_user_id == 'google-123'
+    assert UserProfile.objects.get(user=user).picture_url == 'https://example.com/a.png'
+
+@pytest.mark.django_db
+def test_repeat_login_writes_only_last_login():
+    """変更が無ければプロフィールは書き込まない"""
+    user, _ = login(IDINFO)
+    last_login = user.last_login
+    profile_updated_at = UserProfile.objects.get(user=user).updated_at
+
+    user, statements = login(IDINFO)
+    assert statements == ['SELECT', 'UPDATE']
+    assert User.objects.get(pk=user.pk).last_login > last_login
+    assert UserProfile.objects.get(user=user).updated_at == profile_updated_at
+
+@pytest.mark.django_db
+def test_login_updates_changed_profile_fields():
+    """変更された列だけ更新する"""
+    login(IDINFO)
+    user, statements = login({**IDINFO, 'locale': 'en'})
+    assert statements == ['SELECT', 'UPDATE', 'UPDATE']
+    profile = UserProfile.objects.get(user=user)
+    assert profile.locale == 'en'
+    assert profile.picture_url == 'https://example.com/a.png'
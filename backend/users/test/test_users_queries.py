@@ -0,0 +1,18 @@
+import pytest
+from users.models import UserProfile
+
+@pytest.mark.django_db
+def test_current_user_query_budget(jwt_client, authenticated_client, test_user, query_budget):
+    """ログインユーザーとプロフィールは1回のJOINで取得する"""
+    UserProfile.objects.create(user_id=test_user.pk, google_user_id='google-1', picture_url='https://example.com/a.png')
+    query_budget(1, lambda: jwt_client.get('/api/auth/me/'))
+    query_budget(1, lambda: authenticated_client.get('/api/auth/me/'))
+
+    res = jwt_client.get('/api/auth/me/')
+    assert res.data['profile']['google_user_id'] == 'google-1'
+
+@pytest.mark.django_db
+def test_current_user_without_profile(jwt_client, query_budget):
+    """プロフィールが無いユーザーも同じクエリ数"""
+    query_budget(1, lambda: jwt_client.get('/api/auth/me/'))
+    assert jwt_client.get('/api/auth/me/').data['profile'] is None
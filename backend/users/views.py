@@ -2,17 +2,12 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from backend_app.projection import load_related
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from google.oauth2 import id_token
-from google.auth.transport import requests
-
-from django.conf import settings
-from django.contrib.auth.models import User
-from django.utils import timezone
-
-from .models import UserProfile
+from .google_tokens import verify_google_id_token
 from .serializers import UserSerializer
+from .services import login_google_user
 
 
 @api_view(['POST'])
@@ -33,55 +28,17 @@ def google_auth(request):
         )
     
     try:
-        # GoogleのIDトークンを検証
-        idinfo = id_token.verify_oauth2_token(
-            google_id_token,
-            requests.Request(),
-            settings.GOOGLE_CLIENT_ID
-        )
+        # GoogleのIDトークンを検証(証明書と検証結果はキャッシュされる)
+        idinfo = verify_google_id_token(google_id_token)
         
-        # ユーザー情報を取得
-        email = idinfo.get('email')
-        name = idinfo.get('name', '')
-        picture = idinfo.get('picture', '')
-        google_user_id = idinfo.get('sub')
-        locale = idinfo.get('locale', 'ja')
-        
-        if not email:
+        if not idinfo.get('email'):
             return Response(
                 {'error': 'Email not found in token'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # ユーザーを作成または取得
-        user, user_created = User.objects.get_or_create(
-            email=email,
-            defaults={
-                'username': email,
-                'first_name': name.split()[0] if name else '',
-                'last_name': ' '.join(name.split()[1:]) if len(name.split()) > 1 else '',
-            }
-        )
-        
-        # プロフィールを作成または取得
-        profile, profile_created = UserProfile.objects.get_or_create(
-            user=user,
-            defaults={
-                'google_user_id': google_user_id,
-                'picture_url': picture,
-                'locale': locale,
-            }
-        )
-        
-        # プロフィール情報を更新（既存ユーザーの場合）
-        if not profile_created:
-            profile.picture_url = picture
-            profile.locale = locale
-            profile.save()
-        
-        # 最終ログイン日時を更新
-        user.last_login = timezone.now()
-        user.save()
+        # ユーザー・プロフィールの作成/更新と最終ログイン日時の記録(1トランザクション)
+        user = login_google_user(idinfo)
         
         # Django JWTを発行
         refresh = RefreshToken.for_user(user)
@@ -134,5 +91,6 @@ def current_user(request):
     
     GET /api/auth/me/
     """
-    serializer = UserSerializer(request.user)
+    # JWT認証ではプロフィールも取得済み。それ以外(セッションなど)は1回のJOINで取り直す
+    serializer = UserSerializer(load_related(request.user, UserSerializer))
     return Response(serializer.data)
\ No newline at end of file
@@ -2,6 +2,7 @@ import { Bookmark } from '@/types';
 import { useEffect, useState } from 'react';
 import { useSession } from 'next-auth/react';
 import { useRouter } from 'next/navigation';
+import { fetchAllPages } from '@/lib/pagination';
 
 /**
  * ブックマークを管理するカスタムフック(Django API連携)
@@ -53,7 +54,8 @@ export const useBookmark = () => {
 		setError(null);
 
 		try {
-			const response = await fetch(
+			// 1ページ(既定100件)で終わらないよう、次ページのカーソルをたどって全件取得する
+			const { response, items } = await fetchAllPages<Bookmark>(
 				`${process.env.NEXT_PUBLIC_API_BASE_URL}/bookmarks/`,
 				{
 					headers: getHeaders(),
@@ -68,9 +70,7 @@ export const useBookmark = () => {
 				// throw new Error(`HTTP error! status: ${response.status}`);
 			}
 
-			const data = await response.json();
-			const list = Array.isArray(data) ? data : data.results ?? [];
-			setBookmarks(list);
+			setBookmarks(items);
 		} catch (error) {
 			console.error('ブックマーク取得エラー:', error);
 			setError(
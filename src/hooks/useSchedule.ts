@@ -2,6 +2,7 @@ import { Schedule } from '@/types';
 import { useSession } from 'next-auth/react';
 import { useRouter } from 'next/navigation';
 import { useState, useEffect } from 'react';
+import { fetchAllPages } from '@/lib/pagination';
 
 /**
  * スケジュールとカレンダーを管理するカスタムフック(Django API連携)
@@ -63,7 +64,8 @@ export const useSchedule = () => {
 		setError(null);
 
 		try {
-			const response = await fetch(
+			// 1ページ(既定100件)で終わらないよう、次ページのカーソルをたどって全件取得する
+			const { response, items } = await fetchAllPages<Schedule>(
 				`${process.env.NEXT_PUBLIC_API_BASE_URL}/schedules/`,
 				{
 					headers: getHeaders(),
@@ -78,8 +80,7 @@ export const useSchedule = () => {
 				// throw new Error(`HTTP error! status: ${response.status}`);
 			}
 
-			const data = await response.json();
-			setTodaySchedules(Array.isArray(data) ? data : data.results ?? []);
+			setTodaySchedules(items);
 		} catch (error) {
 			console.error('Failed to fetch schedules:', error);
 			setError(
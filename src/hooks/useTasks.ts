@@ -2,6 +2,7 @@ import { Task } from '@/types';
 import { useSession } from 'next-auth/react';
 import { useState, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
+import { fetchAllPages } from '@/lib/pagination';
 
 /**
  * タスクを管理するカスタムフック(Django API連携)
@@ -54,7 +55,8 @@ export const useTasks = () => {
 		setError(null);
 
 		try {
-			const response = await fetch(
+			// 1ページ(既定100件)で終わらないよう、次ページのカーソルをたどって全件取得する
+			const { response, items } = await fetchAllPages<Task>(
 				`${process.env.NEXT_PUBLIC_API_BASE_URL}/tasks/`,
 				{
 					headers: getHeaders(),
@@ -69,8 +71,7 @@ export const useTasks = () => {
 				// throw new Error(`HTTP error! status: ${response.status}`);
 			}
 
-			const data = await response.json();
-			setTasks(data);
+			setTasks(items);
 		} catch (error) {
 			console.error('Failed to fetch tasks:', error);
 			setError(
@@ -0,0 +1,35 @@
+/**
+ * 一覧APIのページを X-Next-Cursor が無くなるまでたどる
+ *
+ * 一覧APIは1ページ(既定100件)ずつ配列で返し、続きがあれば
+ * X-Next-Cursor ヘッダーに次ページのカーソルを入れる。
+ *
+ * @param {string} url - 一覧APIのURL(クエリパラメータなし)
+ * @param {RequestInit} init - fetch のオプション(認証ヘッダーなど)
+ * @returns {Promise<{ response: Response; items: T[] }>} 最後に取得したレスポンスと全ページの行
+ *   (途中で失敗した場合は失敗したレスポンスと、それまでの行)
+ */
+export const fetchAllPages = async <T>(
+	url: string,
+	init?: RequestInit
+): Promise<{ response: Response; items: T[] }> => {
+	const items: T[] = [];
+	const pageUrl = new URL(url);
+	// 往復の回数を減らすため、サーバーの上限(LIST_MAX_PAGE_SIZE)まで1ページに詰める
+	pageUrl.searchParams.set('page_size', '500');
+
+	while (true) {
+		const response = await fetch(pageUrl.toString(), init);
+		if (!response.ok) {
+			return { response, items };
+		}
+		const data = await response.json();
+		items.push(...(Array.isArray(data) ? data : data.results ?? []));
+
+		const cursor = response.headers.get('X-Next-Cursor');
+		if (!cursor) {
+			return { response, items };
+		}
+		pageUrl.searchParams.set('cursor', cursor);
+	}
+};